@@ -9,7 +9,8 @@ DEEPSEEK_API_KEY = "sk-c8fbfadab4184b23b6122829ae44114d"  # DeepSeek API密钥
 # API配置字典 - 用于导入
 API_CONFIG = {
     "alpha_vantage_api_key": ALPHA_VANTAGE_API_KEY,
-    "deepseek_api_key": DEEPSEEK_API_KEY
+    "deepseek_api_key": DEEPSEEK_API_KEY,
+    "alpha_vantage_base_url": "https://www.alphavantage.co"  # Alpha Vantage服务地址，可指向本地桩服务器
 }
 
 # 模型配置
@@ -18,10 +19,15 @@ MODEL_CONFIG = {
         "model_path": "TinyLlama/TinyLlama-1.1B-Chat-v1.0",  # 使用开放访问的TinyLlama模型
         "max_length": 512,
         "temperature": 0.2,  # 控制输出稳定性
-        "precision": "fp16"  # GPU推理优化
+        "precision": "auto",  # auto：有GPU时fp16，否则fp32；也可指定fp16、bf16或fp32，没有GPU时fp16自动改用fp32
+        "max_new_tokens": 128,  # 每条新闻最多生成的token数，与提示词一起计入max_length
+        "num_threads": 0,  # CPU推理线程数，0表示使用全部CPU核心
+        "int8_dynamic": False  # 在CPU上对线性层做动态int8量化，速度更快、内存更少，精度略有下降
     },
     "use_ollama": True,  # 是否使用Ollama API
-    "ollama_model": "fingpt"  # Ollama中的模型名称，使用我们创建的FinGPT模型
+    "ollama_model": "fingpt",  # Ollama中的模型名称，使用我们创建的FinGPT模型
+    "ollama_url": "http://localhost:11434",  # Ollama服务地址，可指向scripts/ollama_stub_server.py
+    "ollama_max_tokens": 256  # 每条新闻评分最多生成的token数
 }
 
 # 路径配置
@@ -29,21 +35,186 @@ LOGS_DIR = "logs"
 DATA_DIR = "data"
 REPORTS_DIR = "reports"
 
+# 日志配置
+LOGGING_CONFIG = {
+    "log_dir": LOGS_DIR,  # 日志目录，每天一个news_fetcher_YYYYMMDD.log
+    "level": "INFO",  # 写入日志文件的最低级别
+    "console_level": "WARNING",  # 控制台的最低级别；低于该级别的进度消息用print输出、日志只写入文件，-v时进度以INFO日志输出，每条只出现一次
+    "format": "text",  # 日志文件格式：text，或json（每行一个JSON对象，便于日志系统收集）
+    "queue": True  # 日志文件由后台线程写入，调用线程不等待磁盘I/O
+}
+
 # 评分配置
 SCORING_CONFIG = {
     "sentiment_weight": 0.6,  # 情绪分数权重
     "importance_weight": 0.4,  # 重要性分数权重
     "min_importance_threshold": 20.0,  # 最低重要性阈值
-    "top_news_count": 10  # 保留的顶级新闻数量
+    "top_news_count": 10,  # 保留的顶级新闻数量
+    "sentiment_scale": 100.0  # 情绪分数（-1到1）乘以该系数后与重要性分数（0到100）加权
 }
 
 # 系统配置
 SYSTEM_CONFIG = {
     "retry_count": 3,  # API调用失败重试次数
     "retry_delay": 15,  # 重试间隔（秒）
-    "news_timeout": 30,  # 单条新闻处理超时（秒）
+    "news_timeout": 30,  # 单条新闻处理超时（秒），同时作为HTTP读取超时
+    "connect_timeout": 5,  # HTTP连接超时（秒）
+    "http_pool_size": 10,  # 每个主机的HTTP连接池大小
+    "circuit_failure_threshold": 5,  # 连续失败多少次后熔断
+    "circuit_reset_timeout": 60,  # 熔断后的冷却时间（秒）
     "batch_size": 8,  # 批处理大小
-    "execution_time": "00:05"  # 每日执行时间（UTC）
+    "execution_time": "00:05",  # 每日执行时间（UTC）
+    "max_workers": 5,  # 多资产并发获取的最大线程数
+    "dedup_max_distance": 6  # SimHash汉明距离不超过该值的新闻视为近似重复
+}
+
+# 流水线配置：获取、预排序、评分、报告各阶段并行执行
+PIPELINE_CONFIG = {
+    "queue_size": 4,  # 阶段之间队列的最大长度，下游处理不过来时上游阻塞等待
+    "fetch_workers": 5,  # 获取阶段的线程数
+    "score_workers": 1,  # 评分阶段的线程数（每个线程内部仍按batch_size并发请求）
+    "report_workers": 1,  # 报告阶段的线程数
+    "deadline": 0  # 整个流水线的最长运行时间（秒），0表示不限制
+}
+
+# 常驻模式配置
+DAEMON_CONFIG = {
+    "poll_interval_minutes": 0,  # 日内增量获取的间隔（分钟），0表示只在每日执行时间运行
+    "catchup_days": 3,  # 停机后最多补跑最近多少天错过的每日任务
+    "lock_file": "data/daemon.lock",  # 单实例锁文件
+    "state_file": "data/daemon_state.json",  # 已完成的每日任务，重启后据此补跑
+    "status_file": "data/daemon_status.json",  # 运行状态文件，供健康检查读取
+    "heartbeat_seconds": 30  # 空闲时更新状态文件的间隔（秒）
+}
+
+# HTTP服务配置：多个客户端的相同请求合并为一次上游调用
+SERVER_CONFIG = {
+    "host": "127.0.0.1",  # 监听地址
+    "port": 8080,  # 端口
+    "workers": 8,  # 执行获取和分析的线程数，同时进行的上游调用不超过该值
+    "result_ttl": 60,  # 已完成结果在内存中保留的时间（秒），期间相同请求直接返回，0表示不保留
+    "backlog": 1024,  # 等待接受的连接队列长度
+    "keepalive_timeout": 15,  # 空闲长连接的保持时间（秒）
+    "max_header_bytes": 16384  # 请求行和请求头的最大长度
+}
+
+# 运行指标配置：各阶段耗时、上游延迟、字节数和条数等
+METRICS_CONFIG = {
+    "enabled": False,  # 是否记录指标，也可以用命令行参数--metrics开启；关闭时几乎没有开销
+    "namespace": "market_news",  # 指标名称前缀
+    "textfile": "data/metrics/market_news_analyzer.prom",  # 指标文本文件，可由node_exporter的textfile收集器读取，为空时不写
+    "format": "prometheus",  # 文本文件格式：prometheus或openmetrics
+    "summary_dir": "data/metrics/runs",  # 每次运行的JSON汇总目录，为空时不写
+    "buckets": [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]  # 耗时直方图的分桶上界（秒）
+}
+
+# 性能分析配置：命令行参数--profile开启，结果保存到LOGS_DIR下的profile_<时间>目录
+PROFILE_CONFIG = {
+    "sample_interval": 0.005,  # 调用栈采样间隔（秒）
+    "max_stack_depth": 64,  # 每个采样最多保留的栈深度
+    "tracemalloc_frames": 1,  # 内存分配记录的栈帧数，越大越慢
+    "top_allocators": 25,  # 每个阶段列出的内存增量最大的分配位置数
+    "top_functions": 50  # profile.txt中列出的函数数
+}
+
+# 合成新闻配置：压力测试和基准测试使用的新闻分布
+SYNTHETIC_CONFIG = {
+    "seed": 42,  # 随机种子，相同的种子和参数生成完全相同的新闻
+    "time_profile": "intraday",  # 发布时间分布：uniform均匀，intraday集中在美股交易时段且周末较少
+    "weekend_weight": 0.3,  # intraday分布下周末每天的新闻量相对工作日的比例
+    "sources": {  # 来源及其占比
+        "Reuters": 0.18,
+        "Bloomberg": 0.15,
+        "CNBC": 0.1,
+        "Financial Times": 0.08,
+        "Wall Street Journal": 0.08,
+        "MarketWatch": 0.1,
+        "Benzinga": 0.14,
+        "Motley Fool": 0.09,
+        "Zacks Commentary": 0.08
+    },
+    "sentiment_mean": 0.05,  # Alpha Vantage情绪分数的均值
+    "sentiment_std": 0.2,  # Alpha Vantage情绪分数的标准差，结果截断到-1到1
+    "content_words_median": 60,  # 正文词数的中位数，词数服从对数正态分布
+    "content_words_sigma": 0.8,  # 正文词数的对数标准差，越大长短差异越大
+    "content_words_max": 2000,  # 正文最多词数
+    "languages": {"en": 0.9, "zh": 0.1},  # 语言及其占比
+    "keyword_rate": 0.8,  # 标题中包含资产关键词的比例
+    "duplicate_rate": 0.03,  # 完全相同的转载（其他来源、其他URL）的比例
+    "near_duplicate_rate": 0.05,  # 改写少量词语的近似重复报道的比例
+    "duplicate_window": 1000  # 从最近多少条新闻中挑选被转载的原文
+}
+
+# 请求配额配置（Alpha Vantage免费版）
+RATE_LIMIT_CONFIG = {
+    "requests_per_minute": 5,  # 每分钟最大请求数
+    "requests_per_day": 25,  # 每日最大请求数，0表示不限制
+    "max_backoff": 120,  # 单次退避的最大间隔（秒）
+    "state_file": "data/quota_state.json"  # 每日用量状态文件，多次运行共享配额
+}
+
+# 缓存配置
+CACHE_CONFIG = {
+    "response_cache_dir": "data/cache/responses",  # Alpha Vantage响应缓存目录
+    "response_cache_ttl": 3600,  # 响应缓存默认有效期（秒），已结束的历史时间窗口永久有效
+    "response_cache_max_mb": 200  # 响应缓存总大小上限（MB），超出后按LRU淘汰
+}
+
+# 评分缓存配置
+SCORE_CACHE_CONFIG = {
+    "path": "data/score_cache.db",  # 模型评分缓存库路径，多个进程可共享
+    "max_entries": 200000  # 最多缓存的评分条数，超出后按最近最少使用淘汰
+}
+
+# 预排序配置：模型评分前用本地特征筛选候选新闻
+PRERANK_CONFIG = {
+    "top_m": 30,  # 每个资产送入模型评分的候选条数，0表示不筛选
+    "sentiment_weight": 0.35,  # Alpha Vantage情绪分数绝对值的权重
+    "keyword_weight": 0.35,  # 关键词命中密度的权重
+    "source_weight": 0.15,  # 来源权重的权重
+    "recency_weight": 0.15,  # 时效性的权重
+    "sentiment_saturation": 0.35,  # 情绪分数绝对值达到该值时记满分（Alpha Vantage以0.35为明显利好/利空）
+    "keyword_saturation": 3,  # 关键词命中次数达到该值时记满分
+    "recency_half_life_hours": 12,  # 时效性半衰期（小时），以批次中最新的新闻为基准
+    "default_source_weight": 0.5,  # 未列出来源的权重
+    "source_weights": {  # 来源权重（0到1），按小写名称匹配
+        "reuters": 1.0,
+        "bloomberg": 1.0,
+        "financial times": 0.9,
+        "wall street journal": 0.9,
+        "cnbc": 0.8,
+        "marketwatch": 0.7,
+        "benzinga": 0.5,
+        "motley fool": 0.3,
+        "zacks commentary": 0.3
+    }
+}
+
+# 存储配置
+STORAGE_CONFIG = {
+    "backend": "sqlite",  # 新闻存储后端：sqlite（带索引的新闻库）或json（按天保存的JSON文件）
+    "sqlite_path": "data/news.db"  # SQLite新闻库路径
+}
+
+# 按资产获取配置
+FETCH_CONFIG = {
+    "limit": 1000,  # 每页请求的最大条数（Alpha Vantage上限为1000），按EARLIEST排序分页
+    "max_pages": 10  # 每次获取最多请求的页数，达到后高水位只推进到完整获取的部分
+}
+
+# 历史回填配置
+BACKFILL_CONFIG = {
+    "limit": 1000,  # 每个时间窗口请求的最大条数（Alpha Vantage上限为1000）
+    "min_window_minutes": 15,  # 返回条数达到limit时拆分窗口，直到窗口小于该分钟数
+    "sort": "EARLIEST",  # 窗口内的排序方式
+    "checkpoint_file": "data/backfill_checkpoint.json"  # 检查点文件，用于断点续传
+}
+
+# 单次请求本地分类配置
+CLASSIFIER_CONFIG = {
+    "topics": "",  # 宽泛请求的topics参数，为空时不按主题过滤
+    "limit": 1000,  # 宽泛请求返回的最大条数（Alpha Vantage上限为1000）
+    "min_keyword_hits": 1  # 标题和摘要中至少命中该资产的关键词次数才归入该资产
 }
 
 # 标的配置
@@ -14,9 +14,21 @@ from typing import Optional, List, Dict, Any
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # 导入配置和模块
-from config.config import ASSET_CONFIG
+from config.config import ASSET_CONFIG, SYSTEM_CONFIG
 from src.models import NewsItem, PriceItem, NewsScore, AnalysisReport
-from src.news_fetcher import fetch_news, generate_test_news, setup_logging
+from src.logging_setup import echo
+from src.news_fetcher import (
+    fetch_news, fetch_news_broad, fetch_news_multi, generate_test_news, parse_asset_list, setup_logging
+)
+from src.dedup import DedupIndex
+from src.local_inference import create_scorer
+from src.prerank import PreRanker
+from src.pipeline import print_pipeline_stats, run_analysis_pipeline
+from src.daemon import Daemon
+from src.server import run_server
+from src.scoring import ScoringEngine
+from src.metrics import MetricsRegistry, get_default_metrics, set_default_metrics
+from src.profiling import Profiler, get_default_profiler, set_default_profiler
 
 
 def parse_arguments():
@@ -28,8 +40,8 @@ def parse_arguments():
         "-a", "--asset", 
         type=str, 
         default="oil",
-        choices=list(ASSET_CONFIG.keys()),
-        help="要分析的资产类型"
+        help=f"要分析的资产类型，可选: {', '.join(ASSET_CONFIG.keys())}；"
+             f"使用all表示全部资产，或用逗号分隔多个资产，如oil,gold"
     )
     
     # 添加日期参数
@@ -59,7 +71,97 @@ def parse_arguments():
     parser.add_argument(
         "-v", "--verbose", 
         action="store_true",
-        help="显示详细输出"
+        help="显示详细输出（控制台显示INFO级别的日志）"
+    )
+    
+    # 添加并发线程数参数
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=SYSTEM_CONFIG.get("max_workers", 5),
+        help="多资产模式下的最大并发线程数"
+    )
+    
+    # 添加缓存控制参数
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="不使用响应缓存和评分缓存"
+    )
+    
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="忽略已有缓存，强制重新请求并更新缓存"
+    )
+    
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="忽略高水位，全量获取目标日期的新闻"
+    )
+    
+    parser.add_argument(
+        "--single-fetch",
+        action="store_true",
+        help="多资产模式下只发送一次宽泛请求，在本地按关键词把新闻分配到各资产"
+    )
+    
+    parser.add_argument(
+        "--score",
+        action="store_true",
+        help="调用模型为新闻评分（MODEL_CONFIG中use_ollama决定使用Ollama还是本地模型），并输出综合分数最高的新闻"
+    )
+    
+    parser.add_argument(
+        "--prerank-m",
+        type=int,
+        default=None,
+        help="评分前预排序保留的候选条数，0表示全部评分（默认使用PRERANK_CONFIG中的top_m）"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="以流水线方式获取、评分并生成报告，先完成的资产先出报告"
+    )
+    
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="流水线的最长运行时间（秒），到时取消剩余任务（默认使用PIPELINE_CONFIG中的deadline）"
+    )
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻运行，每天在execution_time（UTC）分析前一天的新闻，参见DAEMON_CONFIG"
+    )
+    
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="以HTTP服务方式运行，提供/news和/analysis接口，相同的并发请求只调用一次上游，参见SERVER_CONFIG"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="HTTP服务的端口（默认使用SERVER_CONFIG中的port）"
+    )
+    
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="记录各阶段耗时、上游延迟、字节数和条数，写入指标文本文件和本次运行的JSON汇总，参见METRICS_CONFIG"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="记录cProfile统计、采样调用栈（可生成火焰图）和各阶段的内存分配，保存到logs/profile_<时间>/，参见PROFILE_CONFIG"
     )
     
     return parser.parse_args()
@@ -136,6 +238,9 @@ def interactive_mode():
     """交互模式"""
     print("\n欢迎使用市场新闻分析器!")
     
+    # 设置日志
+    logger = setup_logging()
+    
     while True:
         # 选择资产类型
         asset_type = display_asset_menu()
@@ -156,12 +261,9 @@ def interactive_mode():
         if confirm.lower() != "y":
             continue
         
-        # 设置日志
-        logger = setup_logging()
-        
         # 获取新闻数据
         print(f"\n开始获取{asset_name}相关新闻...")
-        news_items = fetch_news(asset_type, target_date, logger)
+        news_items = fetch_news(asset_type, target_date, logger, dedup=DedupIndex())
         
         # 如果没有找到新闻，询问是否使用测试数据
         if not news_items:
@@ -187,66 +289,345 @@ def interactive_mode():
             break
 
 
-def main():
-    """主函数"""
-    # 解析命令行参数
-    args = parse_arguments()
+def score_and_rank(news_items: List[NewsItem], asset_type: str, scorer,
+                   logger: logging.Logger, top_m: Optional[int] = None) -> List[NewsScore]:
+    """
+    为新闻评分并输出综合分数最高的新闻
     
-    # 如果没有提供命令行参数，进入交互模式
-    if len(sys.argv) == 1:
-        interactive_mode()
-        return
+    新闻较多时先用预排序器筛选出top_m条候选，只对候选新闻调用模型。
     
-    # 设置日志
-    logger = setup_logging()
+    Args:
+        news_items: 新闻项列表
+        asset_type: 资产类型
+        scorer: 评分器（OllamaScorer或LocalScorer）
+        logger: 日志记录器
+        top_m: 送入模型评分的候选条数，默认使用PRERANK_CONFIG中的top_m，0表示不筛选
+        
+    Returns:
+        List[NewsScore]: 评分成功的新闻评分
+    """
+    asset_name = ASSET_CONFIG[asset_type]["asset_name"]
+    candidates = PreRanker().select(news_items, asset_type, top_m)
+    if len(candidates) < len(news_items):
+        echo(logger, f"\n预排序: 从{len(news_items)}条{asset_name}新闻中选出{len(candidates)}条候选")
+        news_items = candidates
     
-    # 获取资产类型和日期
-    asset_type = args.asset
-    target_date = args.date
+    echo(logger, f"\n开始为{len(news_items)}条{asset_name}新闻评分（模型 {scorer.model}）...")
+    start_time = datetime.now()
+    scores = [score for score in scorer.score_batch(news_items) if score is not None]
+    elapsed = (datetime.now() - start_time).total_seconds()
+    get_default_metrics().observe("stage_seconds", elapsed, stage="score")
+    echo(logger, f"{asset_name}新闻评分完成: 成功 {len(scores)}/{len(news_items)} 条，耗时 {elapsed:.2f} 秒")
+    if scorer.cache is not None:
+        cache_stats = scorer.cache.stats()
+        print(f"评分缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，"
+              f"共 {cache_stats['entries']} 条")
     
-    # 验证日期格式
-    try:
-        datetime.strptime(target_date, "%Y%m%d")
-    except ValueError:
-        print(f"错误：日期格式不正确，应为YYYYMMDD，例如20250307")
-        return
+    print_ranking(scores, asset_name)
+    return scores
+
+
+def print_ranking(scores: List[NewsScore], asset_name: str):
+    """按综合分数输出重要新闻排名"""
+    ranked = ScoringEngine().rank(scores)
+    print(f"\n{asset_name}重要新闻排名:")
+    for i, (score, value) in enumerate(ranked, 1):
+        print(f"{i}. {score.title} (综合: {value:.1f}, 情绪: {score.sentiment_score:.2f}, "
+              f"重要性: {score.impact_score:.0f})")
+
+
+def score_unique(results: Dict[str, List[NewsItem]], dedup: DedupIndex, scorer,
+                 logger: logging.Logger, top_m: Optional[int] = None) -> Dict[str, List[NewsScore]]:
+    """
+    为多个资产的新闻评分，跨资产的同一报道只调用一次模型
     
-    # 检查资产类型是否有效
-    if asset_type not in ASSET_CONFIG:
-        print(f"错误：无效的资产类型: {asset_type}")
-        print(f"有效的资产类型: {', '.join(ASSET_CONFIG.keys())}")
-        return
+    各资产先用预排序器选出候选，候选按去重索引合并为规范报道，对每篇规范报道（首次出现的版本）评分一次，
+    再按索引记录的所属资产把评分分配回各资产。
+    
+    Args:
+        results: 资产类型到新闻项列表的映射，新闻项都已加入dedup
+        dedup: 去重索引
+        scorer: 评分器（OllamaScorer或LocalScorer）
+        logger: 日志记录器
+        top_m: 每个资产送入模型评分的候选条数，默认使用PRERANK_CONFIG中的top_m，0表示不筛选
+        
+    Returns:
+        Dict[str, List[NewsScore]]: 资产类型到评分成功的新闻评分的映射
+    """
+    unique: Dict[str, NewsItem] = {}
+    candidate_count = 0
+    for asset_type, news_items in results.items():
+        candidates = PreRanker().select(news_items, asset_type, top_m)
+        candidate_count += len(candidates)
+        for item in candidates:
+            canonical_id = dedup.canonical_id(item)
+            if canonical_id is None:
+                canonical_id, _ = dedup.add(item, asset_type)
+            unique.setdefault(canonical_id, dedup.canonical_item(canonical_id))
+    
+    echo(logger, f"\n开始为{len(unique)}篇唯一报道评分（各资产候选共{candidate_count}条，模型 {scorer.model}）...")
+    start_time = datetime.now()
+    scores = dict(zip(unique, scorer.score_batch(list(unique.values()))))
+    elapsed = (datetime.now() - start_time).total_seconds()
+    get_default_metrics().observe("stage_seconds", elapsed, stage="score")
+    succeeded = sum(1 for score in scores.values() if score is not None)
+    echo(logger, f"评分完成: 成功 {succeeded}/{len(unique)} 篇，耗时 {elapsed:.2f} 秒")
+    if scorer.cache is not None:
+        cache_stats = scorer.cache.stats()
+        print(f"评分缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，"
+              f"共 {cache_stats['entries']} 条")
+    
+    scores_by_asset: Dict[str, List[NewsScore]] = {asset_type: [] for asset_type in results}
+    for canonical_id, score in scores.items():
+        if score is None:
+            continue
+        for asset_type in dedup.assets_of(canonical_id):
+            if asset_type in scores_by_asset:
+                scores_by_asset[asset_type].append(score)
+    return scores_by_asset
+
+
+def run_multi_asset(asset_types: List[str], target_date: str, args, logger: logging.Logger):
+    """
+    多资产模式：并发获取新闻并输出汇总
+    
+    Args:
+        asset_types: 资产类型列表
+        target_date: 目标日期，格式为YYYYMMDD
+        args: 命令行参数
+        logger: 日志记录器
+    """
+    asset_names = "、".join(ASSET_CONFIG[asset_type]["asset_name"] for asset_type in asset_types)
+    echo(logger, f"开始并发获取{asset_names}相关新闻，日期: {target_date}...")
+    
+    start_time = datetime.now()
+    dedup = DedupIndex()
+    
+    # 获取新闻数据
+    with get_default_profiler().stage("fetch"):
+        if args.test:
+            echo(logger, f"使用测试数据")
+            results = {asset_type: dedup.filter(generate_test_news(asset_type), asset_type)
+                       for asset_type in asset_types}
+        elif args.single_fetch:
+            results = fetch_news_broad(asset_types, target_date, logger, dedup=dedup,
+                                       use_cache=not args.no_cache, refresh=args.refresh)
+        else:
+            results = fetch_news_multi(asset_types, target_date, logger, max_workers=args.workers, dedup=dedup,
+                                       use_cache=not args.no_cache, refresh=args.refresh,
+                                       incremental=not args.full)
+    
+    elapsed = (datetime.now() - start_time).total_seconds()
+    get_default_metrics().observe("stage_seconds", elapsed, stage="fetch")
+    
+    # 汇总输出
+    summary = []
+    for asset_type, news_items in results.items():
+        asset_name = ASSET_CONFIG[asset_type]["asset_name"]
+        source = "真实"
+        if not news_items and not args.test:
+            logger.warning(f"没有找到真实的{asset_name}新闻，使用测试数据")
+            news_items = results[asset_type] = dedup.filter(generate_test_news(asset_type), asset_type)
+            source = "测试"
+        elif args.test:
+            source = "测试"
+        
+        print(f"\n获取到的{asset_name}相关新闻标题:")
+        for i, item in enumerate(news_items, 1):
+            print(f"{i}. {item.title} (来源: {item.source}, 情感分数: {item.alpha_sentiment:.2f})")
+        
+        avg_sentiment = (
+            sum(item.alpha_sentiment for item in news_items) / len(news_items)
+            if news_items else 0.0
+        )
+        summary.append((asset_name, asset_type, len(news_items), avg_sentiment, source))
+    
+    # 跨资产的同一报道只评分一次
+    if args.score:
+        with create_scorer(use_cache=not args.no_cache) as scorer, get_default_profiler().stage("score"):
+            scores_by_asset = score_unique(results, dedup, scorer, logger, args.prerank_m)
+        for asset_type, scores in scores_by_asset.items():
+            print_ranking(scores, ASSET_CONFIG[asset_type]["asset_name"])
+    
+    print("\n" + "="*50)
+    print(f"多资产新闻汇总 - 日期: {target_date}")
+    print("="*50)
+    for asset_name, asset_type, count, avg_sentiment, source in summary:
+        print(f"{asset_name} ({asset_type}): {count} 条新闻, 平均情感分数: {avg_sentiment:.2f}, 数据: {source}")
+    print("="*50)
+    print(f"总计 {sum(row[2] for row in summary)} 条新闻, 耗时 {elapsed:.2f} 秒")
+    if len(dedup):
+        cross_asset = sum(1 for _, assets in dedup.unique_items() if len(assets) > 1)
+        print(f"唯一报道 {len(dedup)} 篇，其中 {cross_asset} 篇同时属于多个资产"
+              f"（完全重复 {dedup.exact_duplicates} 条，近似重复 {dedup.near_duplicates} 条）")
+    logger.info(f"多资产新闻获取完成，共 {len(summary)} 个资产，耗时 {elapsed:.2f} 秒")
+
+
+def run_single_asset(asset_type: str, target_date: str, args, logger: logging.Logger):
+    """
+    单资产模式：获取新闻并输出标题，可选评分
     
+    Args:
+        asset_type: 资产类型
+        target_date: 目标日期，格式为YYYYMMDD
+        args: 命令行参数
+        logger: 日志记录器
+    """
     # 获取资产名称
     asset_name = ASSET_CONFIG[asset_type]["asset_name"]
     
-    print(f"开始获取{asset_name}相关新闻，日期: {target_date}...")
-    logger.info(f"开始获取{asset_name}相关新闻，日期: {target_date}...")
+    echo(logger, f"开始获取{asset_name}相关新闻，日期: {target_date}...")
     
     # 获取新闻数据
     if args.test:
-        print(f"使用测试数据")
-        logger.info(f"使用测试数据")
+        echo(logger, f"使用测试数据")
         news_items = generate_test_news(asset_type)
     else:
-        news_items = fetch_news(asset_type, target_date, logger)
+        with get_default_metrics().time("stage_seconds", stage="fetch"), get_default_profiler().stage("fetch"):
+            news_items = fetch_news(asset_type, target_date, logger,
+                                    use_cache=not args.no_cache, refresh=args.refresh,
+                                    incremental=not args.full, dedup=DedupIndex())
         
         # 如果没有找到新闻，使用测试数据
         if not news_items:
-            print(f"没有找到真实新闻，使用测试数据")
             logger.warning(f"没有找到真实新闻，使用测试数据")
             news_items = generate_test_news(asset_type)
     
-    print(f"新闻项数量: {len(news_items)}")
-    logger.info(f"新闻项数量: {len(news_items)}")
+    echo(logger, f"新闻项数量: {len(news_items)}")
     
     # 显示新闻标题
     print(f"\n获取到的{asset_name}相关新闻标题:")
     for i, item in enumerate(news_items, 1):
         print(f"{i}. {item.title} (来源: {item.source}, 情感分数: {item.alpha_sentiment:.2f})")
     
-    print(f"\n{asset_name}新闻获取完成")
-    logger.info(f"{asset_name}新闻获取完成")
+    if args.score:
+        with create_scorer(use_cache=not args.no_cache) as scorer, get_default_profiler().stage("score"):
+            score_and_rank(news_items, asset_type, scorer, logger, args.prerank_m)
+    
+    echo(logger, f"\n{asset_name}新闻获取完成")
+
+
+def run_pipeline_mode(asset_types: List[str], target_date: str, args, logger: logging.Logger):
+    """
+    流水线模式：获取、预排序、评分和报告并行执行，每个资产的报告生成后立即输出
+    
+    Args:
+        asset_types: 资产类型列表
+        target_date: 目标日期，格式为YYYYMMDD
+        args: 命令行参数
+        logger: 日志记录器
+    """
+    asset_names = "、".join(ASSET_CONFIG[asset_type]["asset_name"] for asset_type in asset_types)
+    echo(logger, f"以流水线方式分析{asset_names}新闻，日期: {target_date}...")
+    
+    def on_report(result: Dict[str, Any]):
+        asset_name = ASSET_CONFIG[result["asset_type"]]["asset_name"]
+        echo(logger, f"[{result['elapsed']:.1f}秒] {asset_name}报告已生成: {result['path']}"
+                     f"（新闻 {result['news_count']} 条，评分 {result['scored_count']} 条）")
+    
+    # 各阶段同时运行，内存分配只能按整个流水线统计；采样调用栈按线程名区分各阶段
+    with get_default_profiler().stage("pipeline"):
+        result = run_analysis_pipeline(asset_types, target_date, logger, use_cache=not args.no_cache,
+                                       refresh=args.refresh, incremental=not args.full, test=args.test,
+                                       top_m=args.prerank_m, deadline=args.deadline, on_report=on_report)
+    
+    print("\n" + "="*50)
+    print(f"流水线统计 - 日期: {target_date}")
+    print("="*50)
+    print_pipeline_stats(result["stages"])
+    print("="*50)
+    print(f"生成 {len(result['reports'])}/{len(asset_types)} 份报告, 耗时 {result['elapsed']:.2f} 秒")
+    if result["timed_out"]:
+        logger.warning("流水线已到截止时间，部分资产的报告未生成")
+
+
+def run_command(args, logger: logging.Logger):
+    """
+    按命令行参数运行服务、常驻模式或一次分析
+    
+    Args:
+        args: 命令行参数
+        logger: 日志记录器
+    """
+    if args.serve:
+        run_server(logger, port=args.port, use_cache=not args.no_cache, test=args.test)
+        return
+    
+    # 获取资产类型和日期
+    asset_types = parse_asset_list(args.asset)
+    target_date = args.date
+    
+    # 验证日期格式
+    try:
+        datetime.strptime(target_date, "%Y%m%d")
+    except ValueError:
+        print(f"错误：日期格式不正确，应为YYYYMMDD，例如20250307")
+        return
+    
+    # 检查资产类型是否有效
+    invalid_assets = [asset_type for asset_type in asset_types if asset_type not in ASSET_CONFIG]
+    if not asset_types or invalid_assets:
+        print(f"错误：无效的资产类型: {', '.join(invalid_assets) or args.asset}")
+        print(f"有效的资产类型: {', '.join(ASSET_CONFIG.keys())}")
+        return
+    
+    # 开启指标时，本次运行结束后（常驻模式为每次任务后）写入指标文本文件和JSON汇总
+    if args.metrics:
+        set_default_metrics(MetricsRegistry(enabled=True))
+    metrics = get_default_metrics()
+    metrics.info.update({"argv": sys.argv[1:], "asset_types": asset_types, "target_date": target_date})
+    
+    if args.daemon:
+        daemon = Daemon(asset_types, logger, use_cache=not args.no_cache, test=args.test, top_m=args.prerank_m)
+        daemon.install_signal_handlers()
+        print(f"常驻模式启动，状态文件: {daemon.status_file}，按Ctrl+C停止")
+        try:
+            daemon.run_forever()
+        except RuntimeError as e:
+            logger.error(f"错误：{str(e)}")
+        return
+    
+    mode = "pipeline" if args.pipeline else "multi" if len(asset_types) > 1 else "single"
+    with metrics.time("run_seconds", mode=mode):
+        if args.pipeline:
+            run_pipeline_mode(asset_types, target_date, args, logger)
+        elif len(asset_types) > 1:
+            # 多个资产时使用并发模式
+            run_multi_asset(asset_types, target_date, args, logger)
+        else:
+            run_single_asset(asset_types[0], target_date, args, logger)
+    
+    textfile, summary_path = metrics.write()
+    if summary_path:
+        echo(logger, f"运行指标已写入 {textfile}，汇总: {summary_path}")
+
+
+def main():
+    """主函数"""
+    # 解析命令行参数
+    args = parse_arguments()
+    
+    # 如果没有提供命令行参数，进入交互模式
+    if len(sys.argv) == 1:
+        interactive_mode()
+        return
+    
+    # 设置日志；常驻模式和服务模式的进度只写日志，控制台显示INFO级别
+    logger = setup_logging(console_level="INFO" if args.verbose or args.daemon or args.serve else None)
+    
+    if not args.profile:
+        run_command(args, logger)
+        return
+    
+    # 性能分析覆盖整次运行，出错退出时同样保存已记录的结果
+    profiler = Profiler()
+    set_default_profiler(profiler)
+    try:
+        with profiler:
+            run_command(args, logger)
+    finally:
+        set_default_profiler(None)
+        echo(logger, f"性能分析结果已保存到 {profiler.out_dir}")
 
 
 if __name__ == "__main__":
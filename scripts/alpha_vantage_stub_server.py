@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Alpha Vantage桩服务器
+模拟NEWS_SENTIMENT接口（function、keywords、time_from、time_to、sort、limit），
+返回确定的合成新闻或录制的真实响应，可配置延迟分布、带宽、错误率、截断响应和限流提示，
+用于离线、可复现地测试获取、缓存、配额和服务的性能
+"""
+
+import os
+import sys
+import json
+import time
+import gzip
+import math
+import bisect
+import random
+import argparse
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.synthetic import SyntheticNewsGenerator
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+# 与Alpha Vantage实际返回的提示一致：频率限制的提示不含"per day"，每日配额的提示包含
+MINUTE_LIMIT_NOTE = ("Thank you for using Alpha Vantage! Please consider spreading out your free API requests "
+                     "more sparingly (1 request per second).")
+DAILY_LIMIT_NOTE = ("Thank you for using Alpha Vantage! Our standard API rate limit is {per_day} requests per day. "
+                    "Please subscribe to any of the premium plans to instantly remove all daily rate limits.")
+
+# Alpha Vantage单次请求最多返回的条数
+MAX_LIMIT = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+class LatencyModel:
+    """
+    延迟分布
+
+    constant：固定为mean；uniform：mean±spread均匀分布；normal：均值mean、标准差spread；
+    lognormal：中位数mean、对数标准差spread，长尾；exponential：均值mean。结果不小于0。
+    """
+
+    def __init__(self, kind: str = "constant", mean: float = 0.5, spread: float = 0.0):
+        """
+        Args:
+            kind: 分布类型，见LATENCY_DISTRIBUTIONS
+            mean: 平均（lognormal为中位数）延迟（秒）
+            spread: 分布宽度，含义取决于分布类型
+        """
+        if kind not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"未知的延迟分布: {kind}，可选: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+
+    def sample(self, rng: random.Random) -> float:
+        """抽取一次延迟（秒）"""
+        if self.mean <= 0:
+            return 0.0
+        if self.kind == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            value = self.mean * math.exp(rng.gauss(0.0, self.spread))
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.mean)
+        else:
+            value = self.mean
+        return max(0.0, value)
+
+
+def parse_time(value: Optional[str], default: datetime) -> datetime:
+    """解析YYYYMMDDTHHMM（允许带秒）格式的时间参数"""
+    if not value:
+        return default
+    return datetime.strptime(value[:13], "%Y%m%dT%H%M")
+
+
+@lru_cache(maxsize=256)
+def synthetic_day(keywords: str, day: str, items_per_day: int) -> Tuple[Dict[str, Any], ...]:
+    """
+    生成某组关键词某一天的合成新闻，按发布时间升序
+
+    同一组关键词同一天的新闻是固定的，时间窗口重叠的请求得到相同的条目，增量获取可以正常衔接。
+    """
+    start = datetime.strptime(day, "%Y%m%d")
+    return tuple(SyntheticNewsGenerator().iter_feed_entries(items_per_day, start, start + timedelta(days=1),
+                                                           keywords=keywords.split(",")))
+
+
+def relevance(item: Dict[str, Any], keywords: List[str]) -> int:
+    """RELEVANCE排序使用的相关度：关键词在标题和摘要中出现的次数"""
+    text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
+    return sum(text.count(keyword) for keyword in keywords)
+
+
+def generate_feed(params: Dict[str, str], items_per_day: int = 200) -> List[Dict[str, Any]]:
+    """
+    按请求参数返回合成新闻中落在时间窗口内的条目（尚未排序和截断）
+
+    Args:
+        params: 查询参数
+        items_per_day: 每组关键词每天的新闻条数
+
+    Returns:
+        List[Dict[str, Any]]: NEWS_SENTIMENT格式的feed条目
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    time_from = parse_time(params.get("time_from"), now - timedelta(days=1))
+    time_to = parse_time(params.get("time_to"), now)
+    low, high = time_from.strftime("%Y%m%dT%H%M00"), time_to.strftime("%Y%m%dT%H%M59")
+    keywords = params.get("keywords", "market")
+
+    feed = []
+    day = time_from.replace(hour=0, minute=0)
+    while day <= time_to:
+        feed.extend(item for item in synthetic_day(keywords, day.strftime("%Y%m%d"), items_per_day)
+                    if low <= item["time_published"] <= high)
+        day += timedelta(days=1)
+    return feed
+
+
+class RecordedFeed:
+    """
+    录制的新闻
+
+    读取目录下所有包含feed的JSON文件（例如响应缓存目录或alpha_vantage_response_*.json），
+    按URL去重后按发布时间排序，请求时按时间窗口和关键词筛选。
+    """
+
+    def __init__(self, feed_dir: str):
+        """
+        Args:
+            feed_dir: 录制的响应所在目录，递归查找.json文件
+        """
+        items: Dict[str, Dict[str, Any]] = {}
+        for root, _, files in os.walk(feed_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(data, dict) and isinstance(data.get("feed"), list):
+                    for item in data["feed"]:
+                        items.setdefault(item.get("url") or json.dumps(item, sort_keys=True), item)
+        self.items = sorted(items.values(), key=lambda item: item.get("time_published", ""))
+        self._times = [item.get("time_published", "") for item in self.items]
+        self._text = [f"{item.get('title', '')} {item.get('summary', '')}".lower() for item in self.items]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def select(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """按时间窗口和关键词（任一关键词出现在标题或摘要中）筛选"""
+        low = params["time_from"][:13] + "00" if params.get("time_from") else ""
+        high = params["time_to"][:13] + "59" if params.get("time_to") else "99999999T999999"
+        keywords = [k.strip().lower() for k in params.get("keywords", "").split(",") if k.strip()]
+        start = bisect.bisect_left(self._times, low)
+        end = bisect.bisect_right(self._times, high)
+        return [self.items[i] for i in range(start, end)
+                if not keywords or any(keyword in self._text[i] for keyword in keywords)]
+
+
+class StubServer(ThreadingHTTPServer):
+    """桩服务器，客户端超时断开时不打印异常"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def draw(self) -> Tuple[float, float]:
+        """抽取(延迟, 0到1之间的随机数)，随机数用于决定错误注入"""
+        with self.lock:
+            return self.latency.sample(self.rng), self.rng.random()
+
+    def admit(self) -> Optional[str]:
+        """
+        按频率和每日配额登记一次请求
+
+        Returns:
+            Optional[str]: 超出配额时返回限流提示，否则返回None
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self.per_day and self.day_count >= self.per_day:
+                return DAILY_LIMIT_NOTE.format(per_day=self.per_day)
+            if self.per_minute:
+                while self.window and now - self.window[0] >= 60:
+                    self.window.popleft()
+                if len(self.window) >= self.per_minute:
+                    return MINUTE_LIMIT_NOTE
+                self.window.append(now)
+            self.day_count += 1
+            return None
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.stats[name] += value
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """请求处理器，配置保存在server对象上"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Any, truncate: bool = False):
+        server = self.server
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        compress = server.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            data = gzip.compress(data, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        if truncate:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        # 截断时只发送一半后断开，模拟响应传输中途失败
+        end = len(data) // 2 if truncate else len(data)
+        for start in range(0, end, CHUNK_SIZE):
+            chunk = data[start:min(end, start + CHUNK_SIZE)]
+            self.wfile.write(chunk)
+            if server.bandwidth:
+                time.sleep(len(chunk) / server.bandwidth)
+        server.count("bytes_sent", end)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            with server.lock:
+                self._send_json(200, {**server.stats, "requests": server.requests})
+            return
+        if url.path != "/query":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        with server.lock:
+            server.requests += 1
+        delay, roll = server.draw()
+        time.sleep(delay)
+
+        if params.get("function") != "NEWS_SENTIMENT" or not params.get("apikey"):
+            server.count("invalid")
+            self._send_json(200, {"Error Message": "Invalid API call. Please retry or visit the documentation "
+                                                   "(https://www.alphavantage.co/documentation/) for NEWS_SENTIMENT."})
+            return
+
+        note = server.admit()
+        if note is None and roll < server.note_rate:
+            note = MINUTE_LIMIT_NOTE
+        if note is not None:
+            server.count("rate_limited")
+            self._send_json(200, {"Information": note})
+            return
+
+        roll -= server.note_rate
+        if roll < server.error_rate:
+            server.count("errors")
+            self._send_json(500 if roll < server.error_rate / 2 else 503, {"error": "stub error"})
+            return
+
+        try:
+            limit = min(int(params.get("limit", 50)), MAX_LIMIT)
+            feed = server.recorded.select(params) if server.recorded is not None \
+                else generate_feed(params, server.items_per_day)
+        except ValueError:
+            server.count("invalid")
+            self._send_json(200, {"Error Message": "Invalid inputs. time_from/time_to must be YYYYMMDDTHHMM."})
+            return
+
+        sort = params.get("sort", "LATEST").upper()
+        if server.replay and server.recorded is not None:
+            # 原样返回录制的全部条目，由客户端按日期过滤
+            feed, limit = server.recorded.items, len(server.recorded.items)
+        elif sort == "EARLIEST":
+            feed = sorted(feed, key=lambda item: item.get("time_published", ""))
+        elif sort == "RELEVANCE":
+            keywords = [k.strip().lower() for k in params.get("keywords", "").split(",") if k.strip()]
+            feed = sorted(feed, key=lambda item: relevance(item, keywords), reverse=True)
+        else:
+            feed = sorted(feed, key=lambda item: item.get("time_published", ""), reverse=True)
+        feed = feed[:limit]
+
+        truncate = roll - server.error_rate < server.truncate_rate
+        server.count("truncated" if truncate else "served")
+        server.count("items", len(feed))
+        self._send_json(200, {
+            "items": str(len(feed)),
+            "sentiment_score_definition": "x <= -0.35: Bearish; -0.35 < x <= -0.15: Somewhat-Bearish; "
+                                          "-0.15 < x < 0.15: Neutral; 0.15 <= x < 0.35: Somewhat_Bullish; "
+                                          "x >= 0.35: Bullish",
+            "relevance_score_definition": "0 < x <= 1, with a higher score indicating higher relevance.",
+            "feed": feed,
+        }, truncate)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8090, latency: float = 0.5,
+                  latency_dist: str = "constant", latency_spread: float = 0.0, bandwidth: float = 0.0,
+                  error_rate: float = 0.0, truncate_rate: float = 0.0, note_rate: float = 0.0,
+                  per_minute: int = 0, per_day: int = 0, items_per_day: int = 200,
+                  feed_dir: Optional[str] = None, compress: bool = False, seed: Optional[int] = None,
+                  verbose: bool = False, replay: bool = False) -> StubServer:
+    """
+    创建桩服务器
+
+    Args:
+        host: 监听地址
+        port: 端口，0表示随机端口
+        latency: 平均（lognormal为中位数）响应延迟（秒）
+        latency_dist: 延迟分布，见LATENCY_DISTRIBUTIONS
+        latency_spread: 延迟分布宽度
+        bandwidth: 响应体的发送速度（字节/秒），0表示不限制
+        error_rate: 返回HTTP 5xx的比例
+        truncate_rate: 响应体只发送一半就断开的比例
+        note_rate: 随机返回频率限制提示的比例
+        per_minute: 每分钟最多处理的请求数，超出时返回频率限制提示，0表示不限制
+        per_day: 最多处理的请求数，超出后一直返回每日配额提示，0表示不限制
+        items_per_day: 合成新闻中每组关键词每天的条数，分布参见SYNTHETIC_CONFIG
+        feed_dir: 录制的响应所在目录，指定时返回其中的新闻而不是合成新闻
+        compress: 客户端接受gzip时是否压缩响应
+        seed: 延迟和错误注入的随机种子
+        verbose: 是否打印访问日志
+        replay: 忽略时间窗口、关键词、排序和limit，原样返回录制的全部条目（需要feed_dir），用于基准测试大型响应
+
+    Returns:
+        StubServer: 服务器，调用serve_forever()开始服务
+    """
+    server = StubServer((host, port), StubHandler)
+    server.replay = replay
+    server.latency = LatencyModel(latency_dist, latency, latency_spread)
+    server.bandwidth = bandwidth
+    server.error_rate = error_rate
+    server.truncate_rate = truncate_rate
+    server.note_rate = note_rate
+    server.per_minute = per_minute
+    server.per_day = per_day
+    server.items_per_day = items_per_day
+    server.recorded = RecordedFeed(feed_dir) if feed_dir else None
+    server.gzip = compress
+    server.verbose = verbose
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.window = deque()
+    server.day_count = 0
+    server.requests = 0
+    server.stats = {key: 0 for key in ("served", "items", "bytes_sent", "errors", "truncated", "rate_limited",
+                                       "invalid")}
+    return server
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模拟Alpha Vantage NEWS_SENTIMENT接口的桩服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8090, help="端口")
+    parser.add_argument("--latency", type=float, default=0.5, help="平均（lognormal为中位数）响应延迟（秒）")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="constant", help="延迟分布")
+    parser.add_argument("--latency-spread", type=float, default=0.0,
+                        help="延迟分布宽度：uniform为半宽，normal为标准差，lognormal为对数标准差（秒）")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="响应体发送速度（MB/秒），0表示不限制")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回HTTP 5xx的比例")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="响应体只发送一半就断开的比例")
+    parser.add_argument("--note-rate", type=float, default=0.0, help="随机返回频率限制提示（Information）的比例")
+    parser.add_argument("--per-minute", type=int, default=0, help="每分钟最多处理的请求数，0表示不限制")
+    parser.add_argument("--per-day", type=int, default=0, help="最多处理的请求数，超出后返回每日配额提示，0表示不限制")
+    parser.add_argument("--items-per-day", type=int, default=200, help="合成新闻中每组关键词每天的条数")
+    parser.add_argument("--feed-dir", default=None,
+                        help="录制的响应所在目录（例如data/cache/responses），指定时返回其中的新闻")
+    parser.add_argument("--gzip", action="store_true", help="客户端接受gzip时压缩响应")
+    parser.add_argument("--seed", type=int, default=None, help="延迟和错误注入的随机种子")
+    parser.add_argument("--verbose", action="store_true", help="打印访问日志")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency, args.latency_dist, args.latency_spread,
+                           args.bandwidth * 1024 * 1024, args.error_rate, args.truncate_rate, args.note_rate,
+                           args.per_minute, args.per_day, args.items_per_day, args.feed_dir, args.gzip,
+                           args.seed, args.verbose)
+    source = f"录制的 {len(server.recorded)} 条新闻" if server.recorded is not None \
+        else f"合成新闻（每组关键词每天 {args.items_per_day} 条）"
+    print(f"Alpha Vantage桩服务器运行在 http://{args.host}:{server.server_address[1]}，数据: {source}，"
+          f"延迟: {args.latency_dist} {args.latency}±{args.latency_spread} 秒")
+    print("将API_CONFIG中的alpha_vantage_base_url指向该地址即可，/stats返回请求统计")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志性能测试
+模拟交互模式或常驻进程：每轮先调用一次setup_logging，再记录若干条日志，
+对比旧实现（每次调用都添加新的处理器）与当前实现每条日志的耗时和写入日志文件的行数随轮数的变化
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import LOGGING_CONFIG
+from src.logging_setup import setup_logging, shutdown_logging
+
+
+def legacy_setup_logging(log_dir: str = "logs") -> logging.Logger:
+    """改动前的setup_logging：每次调用都添加一个文件处理器和一个控制台处理器"""
+    os.makedirs(log_dir, exist_ok=True)
+    logger = logging.getLogger("news_fetcher")
+    logger.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(
+        os.path.join(log_dir, f'news_fetcher_{datetime.now().strftime("%Y%m%d")}.log'),
+        encoding='utf-8'
+    )
+    console_handler = logging.StreamHandler(sys.stdout)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    return logger
+
+
+def reset_logger():
+    """移除news_fetcher上的全部处理器"""
+    shutdown_logging()
+    logger = logging.getLogger("news_fetcher")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def count_lines(log_dir: str) -> int:
+    total = 0
+    for name in os.listdir(log_dir):
+        with open(os.path.join(log_dir, name), "rb") as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def run_session(name: str, setup: Callable[[str], logging.Logger], rounds: int, messages: int,
+                workdir: str) -> Dict[str, object]:
+    """
+    模拟一次长会话
+
+    Returns:
+        Dict[str, object]: 每轮每条日志的平均耗时（微秒）和日志文件中每条日志的行数
+    """
+    reset_logger()
+    log_dir = os.path.join(workdir, name)
+    per_round: List[float] = []
+    for i in range(rounds):
+        logger = setup(log_dir)
+        start = time.perf_counter()
+        for n in range(messages):
+            logger.info("获取原油相关新闻，日期: %s，第 %d 轮第 %d 条", "20250307", i, n)
+        per_round.append((time.perf_counter() - start) / messages * 1e6)
+    handlers = len(logging.getLogger("news_fetcher").handlers)
+    reset_logger()
+    return {
+        "per_round": per_round,
+        "handlers": handlers,
+        "lines_per_message": count_lines(log_dir) / (rounds * messages),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对比旧的和当前的setup_logging在长会话中每条日志的耗时")
+    parser.add_argument("--rounds", type=int, default=200, help="会话轮数，每轮调用一次setup_logging")
+    parser.add_argument("--messages", type=int, default=50, help="每轮记录的日志条数")
+    args = parser.parse_args()
+
+    # 日志文件放在临时目录，控制台输出丢弃
+    workdir = tempfile.mkdtemp(prefix="benchmark_logging_")
+    devnull = open(os.devnull, "w", encoding="utf-8")
+
+    def current(queue_enabled: bool, json_format: bool = False) -> Callable[[str], logging.Logger]:
+        def setup(log_dir: str) -> logging.Logger:
+            LOGGING_CONFIG["queue"] = queue_enabled
+            return setup_logging(log_dir, json_format=json_format)
+        return setup
+
+    queue_default = LOGGING_CONFIG["queue"]
+    sessions = [
+        ("旧实现", legacy_setup_logging),
+        ("当前（同步写文件）", current(False)),
+        ("当前（队列）", current(True)),
+        ("当前（队列，JSON）", current(True, True)),
+    ]
+    results = {}
+    try:
+        with contextlib.redirect_stdout(devnull):
+            for index, (name, setup) in enumerate(sessions):
+                results[name] = run_session(f"session_{index}", setup, args.rounds, args.messages, workdir)
+    finally:
+        LOGGING_CONFIG["queue"] = queue_default
+        devnull.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    checkpoints = sorted({1, 10, args.rounds // 4, args.rounds // 2, args.rounds} - {0})
+    print("\n" + "=" * 60)
+    print(f"日志性能测试 - {args.rounds} 轮 × {args.messages} 条，每轮调用一次setup_logging")
+    print("=" * 60)
+    print(f"{'实现':<16}" + "".join(f"{f'第{c}轮':>10}" for c in checkpoints) + f"{'处理器':>8}{'行/条':>8}")
+    for name, result in results.items():
+        per_round = result["per_round"]
+        row = "".join(f"{per_round[c - 1]:>9.1f}µs" for c in checkpoints)
+        print(f"{name:<16}{row}{result['handlers']:>8}{result['lines_per_message']:>8.1f}")
+    print("=" * 60)
+    print("每列为该轮每条日志的平均耗时（调用线程）；行/条为日志文件中每条日志平均写入的行数")
+
+
+if __name__ == "__main__":
+    main()
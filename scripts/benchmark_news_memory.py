@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+新闻内存占用基准测试
+对比NewsItem列表和NewsBatch保存相同新闻时每条新闻占用的内存
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import ASSET_CONFIG
+from src.models import NewsItem
+from src.news_batch import NewsBatch
+
+SOURCES = ["Reuters", "Bloomberg", "CNBC", "Financial Times", "Wall Street Journal", "Benzinga", "Motley Fool"]
+WORDS = ["prices", "demand", "supply", "rates", "policy", "outlook", "investors", "market", "growth", "inflation"]
+
+
+def generate_json(count: int, days: int, seed: int = 42) -> str:
+    """生成与按天JSON文件格式一致的新闻文本"""
+    rng = random.Random(seed)
+    assets = list(ASSET_CONFIG.keys())
+    start = datetime(2025, 1, 1)
+    records = []
+    for i in range(count):
+        asset = assets[i % len(assets)]
+        published = start + timedelta(seconds=rng.randrange(days * 86400))
+        title = f"{asset} " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+        item = NewsItem(
+            title=title,
+            original_title=title,
+            content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 60))),
+            publish_time=published.strftime("%Y%m%dT%H%M%S"),
+            source=rng.choice(SOURCES),
+            url=f"https://example.com/{asset}/{published:%Y/%m/%d}/{i}",
+            alpha_sentiment=round(rng.uniform(-1, 1), 4),
+        )
+        records.append(item.to_dict())
+    return json.dumps(records, ensure_ascii=False)
+
+
+def measure(build: Callable[[], object]):
+    """返回(构建耗时, 构建结果保留的内存字节数, 结果)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, size, result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对比不同新闻表示方式的内存占用")
+    parser.add_argument("--count", type=int, default=60000, help="新闻条数（默认约为全部资产一个月的新闻量）")
+    parser.add_argument("--days", type=int, default=30, help="新闻分布的天数")
+    args = parser.parse_args()
+
+    print(f"生成 {args.count} 条合成新闻，分布在 {args.days} 天...")
+    text = generate_json(args.count, args.days)
+
+    # 与从日文件加载时相同，每个字段都是独立的字符串对象
+    _, item_bytes, news_items = measure(lambda: [NewsItem.from_dict(data) for data in json.loads(text)])
+    results = [("NewsItem列表", item_bytes)]
+
+    _, batch_bytes, batch = measure(lambda: NewsBatch.from_items(news_items))
+    results.append(("NewsBatch", batch_bytes))
+    numeric_bytes = sum(getattr(batch, name).nbytes for name in NewsBatch._NUMERIC_COLUMNS)
+    results.append(("NewsBatch数值列", numeric_bytes))
+
+    assert batch.to_items() == news_items, "NewsBatch转换结果与原始新闻不一致"
+
+    print("\n" + "=" * 50)
+    print(f"新闻内存占用 - {args.count} 条，{args.days} 天")
+    print("=" * 50)
+    for name, size in results:
+        print(f"{name:<20} {size / 1024 / 1024:8.1f} MB {size / args.count:8.0f} 字节/条 "
+              f"{item_bytes / size:6.1f}x")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+新闻存储基准测试
+对比按天JSON文件与SQLite新闻库在写入、按时间范围查询和按列读取上的耗时及占用空间
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import ASSET_CONFIG
+from src.models import NewsItem
+from src.news_store import NewsStore
+
+SOURCES = ["Reuters", "Bloomberg", "CNBC", "Financial Times", "Wall Street Journal", "Benzinga", "Motley Fool"]
+
+
+def generate_items(count: int, days: int, seed: int = 42) -> Dict[str, Dict[str, List[NewsItem]]]:
+    """按资产和日期生成合成新闻"""
+    rng = random.Random(seed)
+    assets = list(ASSET_CONFIG.keys())
+    start = datetime(2025, 1, 1)
+    layout: Dict[str, Dict[str, List[NewsItem]]] = {asset: {} for asset in assets}
+    for i in range(count):
+        asset = assets[i % len(assets)]
+        published = start + timedelta(seconds=rng.randrange(days * 86400))
+        publish_time = published.strftime("%Y%m%dT%H%M%S")
+        title = f"{asset} market update {i}"
+        item = NewsItem(
+            title=title,
+            original_title=title,
+            content=" ".join(rng.choice(("prices", "demand", "supply", "rates", "policy", "outlook"))
+                             for _ in range(rng.randint(20, 60))),
+            publish_time=publish_time,
+            source=rng.choice(SOURCES),
+            url=f"https://example.com/{asset}/{i}",
+            alpha_sentiment=round(rng.uniform(-1, 1), 4),
+        )
+        layout[asset].setdefault(publish_time[:8], []).append(item)
+    return layout
+
+
+def dir_size(path: str) -> int:
+    """目录或文件占用的字节数"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对比JSON文件布局与SQLite新闻库的性能")
+    parser.add_argument("--count", type=int, default=1_000_000, help="新闻条数")
+    parser.add_argument("--days", type=int, default=90, help="新闻分布的天数")
+    parser.add_argument("--query-days", type=int, default=7, help="范围查询的天数")
+    parser.add_argument("--workdir", type=str, default=None, help="工作目录，默认使用临时目录并在结束后删除")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="news_store_bench_")
+    json_root = os.path.join(workdir, "json")
+    db_path = os.path.join(workdir, "news.db")
+
+    print(f"生成 {args.count} 条合成新闻，分布在 {args.days} 天...")
+    layout = generate_items(args.count, args.days)
+    asset = next(iter(ASSET_CONFIG))
+    query_start = "20250101"
+    query_end = (datetime(2025, 1, 1) + timedelta(days=args.query_days - 1)).strftime("%Y%m%d")
+
+    results = []
+    try:
+        # 写入：JSON按天文件（与fetch_news原有格式一致）
+        def write_json():
+            for asset_type, days in layout.items():
+                data_dir = os.path.join(json_root, ASSET_CONFIG[asset_type]["data_dir"])
+                os.makedirs(data_dir, exist_ok=True)
+                for date_str, items in days.items():
+                    with open(os.path.join(data_dir, f"{asset_type}_news_{date_str}.json"), "w", encoding="utf-8") as f:
+                        json.dump([item.to_dict() for item in items], f, ensure_ascii=False, indent=2)
+
+        # 写入：SQLite按资产批量upsert
+        def write_sqlite():
+            with NewsStore(db_path) as store:
+                for asset_type, days in layout.items():
+                    store.upsert(asset_type, [item for items in days.values() for item in items])
+
+        elapsed, _ = timed(write_json)
+        results.append(("写入", "JSON", elapsed))
+        elapsed, _ = timed(write_sqlite)
+        results.append(("写入", "SQLite", elapsed))
+
+        # 范围查询：单个资产query_days天的完整新闻
+        def query_json():
+            data_dir = os.path.join(json_root, ASSET_CONFIG[asset]["data_dir"])
+            items = []
+            for path in sorted(glob.glob(os.path.join(data_dir, f"{asset}_news_*.json"))):
+                date_str = path[-13:-5]
+                if query_start <= date_str <= query_end:
+                    with open(path, "r", encoding="utf-8") as f:
+                        items.extend(NewsItem.from_dict(data) for data in json.load(f))
+            return len(items)
+
+        store = NewsStore(db_path)
+
+        elapsed, json_count = timed(query_json)
+        results.append((f"{args.query_days}天范围查询", "JSON", elapsed))
+        elapsed, sqlite_count = timed(lambda: len(store.query(asset, query_start, query_end)))
+        results.append((f"{args.query_days}天范围查询", "SQLite", elapsed))
+        assert json_count == sqlite_count, f"查询结果不一致: {json_count} != {sqlite_count}"
+
+        # 按列读取：单个资产全部时间的发布时间和情感分数
+        def columns_json():
+            data_dir = os.path.join(json_root, ASSET_CONFIG[asset]["data_dir"])
+            times, sentiments = [], []
+            for path in glob.glob(os.path.join(data_dir, f"{asset}_news_*.json")):
+                with open(path, "r", encoding="utf-8") as f:
+                    for data in json.load(f):
+                        times.append(data["publish_time"])
+                        sentiments.append(data["alpha_sentiment"])
+            return len(times)
+
+        elapsed, _ = timed(columns_json)
+        results.append(("全量按列读取", "JSON", elapsed))
+        elapsed, _ = timed(lambda: len(store.query_columns(("publish_time", "alpha_sentiment"), asset)["publish_time"]))
+        results.append(("全量按列读取", "SQLite", elapsed))
+        store.close()
+
+        print("\n" + "=" * 50)
+        print(f"新闻存储基准测试 - {args.count} 条，{args.days} 天，查询资产: {asset}")
+        print("=" * 50)
+        for name, backend, elapsed in results:
+            print(f"{name:<12} {backend:<8} {elapsed:10.3f} 秒")
+        print(f"{'占用空间':<12} {'JSON':<8} {dir_size(json_root) / 1024 / 1024:10.1f} MB")
+        print(f"{'占用空间':<12} {'SQLite':<8} {dir_size(db_path) / 1024 / 1024:10.1f} MB")
+        print("=" * 50)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
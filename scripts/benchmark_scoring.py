@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+评分基准测试
+测量综合分数计算、阈值过滤和Top-N选择的吞吐量，并与完整排序和逐条Python计算对比
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import NewsScore
+from src.scoring import ScoringEngine, StreamingTopK, scores_to_arrays
+
+
+def timed(func, repeat: int = 3):
+    """多次运行取最短耗时"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="评分与Top-N选择基准测试")
+    parser.add_argument("--count", type=int, default=5_000_000, help="评分条数")
+    parser.add_argument("--top", type=int, default=None, help="Top-N数量，默认使用SCORING_CONFIG")
+    parser.add_argument("--chunk", type=int, default=100_000, help="流式模式每批的条数")
+    parser.add_argument("--objects", type=int, default=200_000, help="NewsScore对象路径的条数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sentiment = rng.uniform(-1, 1, args.count)
+    impact = rng.uniform(0, 100, args.count)
+    impact[rng.random(args.count) < 0.01] = np.nan  # 少量未评分
+    engine = ScoringEngine()
+    top_n = engine.top_n if args.top is None else args.top
+
+    results = []
+
+    # 向量化：综合分数 + 阈值过滤 + argpartition
+    elapsed, (indices, values) = timed(lambda: engine.rank_arrays(sentiment, impact, top_n))
+    results.append(("向量化 argpartition", args.count, elapsed))
+
+    # 对照：综合分数 + 阈值过滤 + 完整排序
+    def full_sort():
+        candidates = np.flatnonzero(impact >= engine.min_importance)
+        composite = engine.composite(sentiment[candidates], impact[candidates])
+        order = np.argsort(-composite, kind="stable")[:top_n]
+        return candidates[order]
+
+    elapsed, sorted_indices = timed(full_sort)
+    results.append(("向量化 完整排序", args.count, elapsed))
+    assert np.array_equal(indices, sorted_indices), "argpartition结果与完整排序不一致"
+
+    # 流式：分批加入有界堆
+    def streaming():
+        topk = StreamingTopK(top_n, engine)
+        for start in range(0, args.count, args.chunk):
+            end = start + args.chunk
+            topk.push_arrays(sentiment[start:end], impact[start:end], items=range(start, end))
+        return topk.results()
+
+    elapsed, stream_results = timed(streaming)
+    results.append((f"流式 每批{args.chunk}", args.count, elapsed))
+    assert [index for index, _ in stream_results] == indices.tolist(), "流式结果与批量结果不一致"
+
+    # NewsScore对象：转换为数组后排名
+    count = min(args.objects, args.count)
+    scores = [NewsScore(f"news {i}", float(sentiment[i]), float(impact[i])) for i in range(count)]
+    elapsed, _ = timed(lambda: engine.rank(scores, top_n))
+    results.append(("NewsScore列表", count, elapsed))
+    convert_elapsed, _ = timed(lambda: scores_to_arrays(scores))
+
+    # 对照：逐条Python计算
+    def pure_python():
+        ranked = [
+            (engine.sentiment_weight * abs(score.sentiment_score) * engine.sentiment_scale
+             + engine.importance_weight * score.impact_score, i)
+            for i, score in enumerate(scores) if score.impact_score >= engine.min_importance
+        ]
+        ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+        return ranked[:top_n]
+
+    elapsed, _ = timed(pure_python)
+    results.append(("逐条Python 排序", count, elapsed))
+
+    print("\n" + "=" * 60)
+    print(f"评分基准测试 - Top {top_n}，阈值 {engine.min_importance}")
+    print("=" * 60)
+    for name, n, elapsed in results:
+        print(f"{name:<22} {n:>10} 条 {elapsed * 1000:10.1f} 毫秒 {n / elapsed / 1e6:8.2f} 百万条/秒")
+    print(f"（NewsScore列表中对象转数组耗时 {convert_elapsed * 1000:.1f} 毫秒）")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
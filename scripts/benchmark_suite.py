@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基准测试套件
+测量获取（流式解析和日期过滤，包括经本地桩服务器的完整获取）、模型序列化、评分、报告渲染和命令行启动时间，
+结果保存为JSON，可以与之前的结果对比，变慢超过阈值时以非零状态码退出
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import threading
+import subprocess
+import contextlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.append(ROOT_DIR)
+sys.path.append(SCRIPTS_DIR)
+
+from src.models import NewsItem, NewsScore
+from src.feed_stream import FeedStreamParser
+from src.http_client import HttpClient
+from src.rate_limiter import QuotaScheduler
+from src.news_fetcher import fetch_news, fetch_news_iter, iter_feed_items
+from src.dedup import DedupIndex
+from src.prerank import PreRanker
+from src.scoring import ScoringEngine
+from src.report import build_report
+from src.synthetic import SyntheticNewsGenerator, write_feed
+import alpha_vantage_stub_server
+
+# 默认结果目录
+RESULTS_DIR = os.path.join("data", "benchmarks")
+
+# 录制feed覆盖的天数，获取时只保留中间一天
+FEED_DAYS = 3
+
+
+class Benchmark:
+    """
+    单个基准测试
+
+    func每次调用处理items条数据；每个样本连续调用number次取平均，共采集repeat个样本，以中位数为准。
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], items: int = 1, number: int = 1,
+                 description: str = ""):
+        """
+        Args:
+            name: 名称，对比时按名称匹配
+            func: 被测函数
+            items: 每次调用处理的数据条数，用于计算吞吐量
+            number: 每个样本调用的次数
+            description: 说明
+        """
+        self.name = name
+        self.func = func
+        self.items = items
+        self.number = number
+        self.description = description
+
+    def run(self, repeat: int, warmup: int = 1) -> Dict[str, Any]:
+        """运行并返回统计结果（秒）"""
+        for _ in range(warmup):
+            self.func()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(self.number):
+                self.func()
+            samples.append((time.perf_counter() - start) / self.number)
+        median = statistics.median(samples)
+        return {
+            "description": self.description,
+            "items": self.items,
+            "number": self.number,
+            "samples": samples,
+            "min": min(samples),
+            "median": median,
+            "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "items_per_second": self.items / median if median > 0 else 0.0,
+        }
+
+
+def quiet(func: Callable[[], Any]) -> Callable[[], Any]:
+    """屏蔽被测函数的控制台输出"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+def build_benchmarks(workdir: str, scale: float) -> List[Benchmark]:
+    """
+    准备数据并创建所有基准测试
+
+    Args:
+        workdir: 临时工作目录，录制的feed、桩服务器和保存的新闻都在其中
+        scale: 数据规模系数
+
+    Returns:
+        List[Benchmark]: 基准测试列表
+    """
+    generator = SyntheticNewsGenerator(seed=42)
+    start = datetime(2025, 3, 3)
+    target_date = (start + timedelta(days=FEED_DAYS // 2)).strftime("%Y%m%d")
+    feed_items = max(100, int(30000 * scale))
+
+    # 录制的feed：三天的合成新闻，以Alpha Vantage响应的格式保存
+    feed_dir = os.path.join(workdir, "feeds")
+    os.makedirs(feed_dir)
+    feed_path = os.path.join(feed_dir, "oil.json")
+    with open(feed_path, "w", encoding="utf-8") as f:
+        write_feed(f, generator.iter_feed_entries(feed_items, start, start + timedelta(days=FEED_DAYS), "oil",
+                                                  descending=True), feed_items)
+    with open(feed_path, "rb") as f:
+        feed_bytes = f.read()
+    chunks = [feed_bytes[i:i + 65536] for i in range(0, len(feed_bytes), 65536)]
+
+    def parse_feed():
+        return sum(1 for _ in iter_feed_items(FeedStreamParser(chunks), target_date))
+
+    # 本地桩服务器原样返回录制的全部三天新闻，由fetch_news按日期过滤
+    stub = alpha_vantage_stub_server.create_server(port=0, latency=0.0, feed_dir=feed_dir, replay=True)
+    threading.Thread(target=stub.serve_forever, name="alpha-vantage-stub", daemon=True).start()
+    client = HttpClient(base_url=f"http://127.0.0.1:{stub.server_address[1]}")
+    scheduler = QuotaScheduler(per_minute=10 ** 6, per_day=0)
+    logger = logging.getLogger("news_fetcher.benchmark")
+    kept = parse_feed()
+
+    def fetch_iter():
+        return sum(1 for _ in fetch_news_iter("oil", target_date, logger, client, scheduler, use_cache=False))
+
+    if quiet(fetch_iter)() != kept:
+        raise RuntimeError("桩服务器返回的新闻与录制的feed不一致")
+
+    def fetch_full():
+        return fetch_news("oil", target_date, logger, client, scheduler, use_cache=False, incremental=False,
+                          dedup=DedupIndex())
+
+    # 模型序列化
+    news_count = max(100, int(100000 * scale))
+    news_items = list(generator.iter_news_items(news_count, start, start + timedelta(days=1), "gold"))
+    news_dicts = [item.to_dict() for item in news_items]
+    scores = [NewsScore(title=item.title, sentiment_score=item.alpha_sentiment, impact_score=50.0,
+                        relevance_score=0.8, summary=item.content[:80]) for item in news_items]
+    score_dicts = [score.to_dict() for score in scores]
+
+    # 评分与预排序
+    rank_count = max(1000, int(1_000_000 * scale))
+    rng = np.random.default_rng(42)
+    sentiment = rng.uniform(-1, 1, rank_count)
+    impact = rng.uniform(0, 100, rank_count)
+    engine = ScoringEngine()
+    ranker = PreRanker()
+    prerank_items = news_items[:max(100, int(10000 * scale))]
+
+    # 报告渲染
+    ranked = [(item, score, 50.0 + i) for i, (item, score) in enumerate(zip(news_items[:10], scores[:10]))]
+    report = build_report("gold", start.strftime("%Y%m%d"), news_items[:200], ranked, len(ranked))
+    renders = 2000
+
+    def render():
+        for _ in range(renders):
+            report.to_markdown()
+
+    def cli_startup():
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, "market_news_analyzer.py"), "--help"],
+                       cwd=workdir, stdout=subprocess.DEVNULL, check=True)
+
+    return [
+        Benchmark("fetch.parse_filter", parse_feed, feed_items,
+                  description=f"流式解析 {feed_items} 条、{len(feed_bytes) // 1024} KB的feed并按日期过滤（保留 {kept} 条）"),
+        Benchmark("fetch.iter_http", quiet(fetch_iter), feed_items,
+                  description="fetch_news_iter经本地桩服务器获取整个feed并按日期过滤"),
+        Benchmark("fetch.full", quiet(fetch_full), feed_items,
+                  description="fetch_news：获取、去重并保存到新闻库"),
+        Benchmark("models.news_to_dict", lambda: [item.to_dict() for item in news_items], news_count,
+                  description="NewsItem.to_dict"),
+        Benchmark("models.news_from_dict", lambda: [NewsItem.from_dict(data) for data in news_dicts], news_count,
+                  description="NewsItem.from_dict"),
+        Benchmark("models.news_json_roundtrip",
+                  lambda: [NewsItem.from_dict(data) for data in json.loads(
+                      json.dumps([item.to_dict() for item in news_items], ensure_ascii=False))],
+                  news_count, description="NewsItem经JSON文本往返"),
+        Benchmark("models.score_roundtrip",
+                  lambda: [NewsScore.from_dict(score.to_dict()) for score in scores], news_count,
+                  description="NewsScore.to_dict/from_dict往返"),
+        Benchmark("models.score_from_dict", lambda: [NewsScore.from_dict(data) for data in score_dicts],
+                  news_count, description="NewsScore.from_dict"),
+        Benchmark("scoring.rank_arrays", lambda: engine.rank_arrays(sentiment, impact), rank_count,
+                  description="ScoringEngine.rank_arrays综合分数与Top-N"),
+        Benchmark("scoring.prerank_select", lambda: ranker.select(prerank_items, "gold"), len(prerank_items),
+                  description="PreRanker.select预排序"),
+        Benchmark("report.to_markdown", render, renders,
+                  description="AnalysisReport.to_markdown渲染（10条重要新闻）"),
+        Benchmark("cli.startup", cli_startup, 1,
+                  description="python market_news_analyzer.py --help的启动时间"),
+    ]
+
+
+def git_revision() -> Optional[str]:
+    """当前提交，不在git仓库中时返回None"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    对比两次结果并打印
+
+    Args:
+        baseline: 基准结果
+        current: 本次结果
+        threshold: 允许的变慢比例，例如0.1表示中位数变慢超过10%视为退化
+
+    Returns:
+        List[str]: 退化的基准测试名称
+    """
+    regressions = []
+    print(f"\n与基准对比（{baseline['meta'].get('revision')} @ {baseline['meta'].get('timestamp')}，阈值 {threshold:.0%}）")
+    print(f"{'基准测试':<28} {'基准中位数':>9} {'本次中位数':>9} {'变化':>6}")
+    for name, result in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<32} {'-':>14} {result['median'] * 1000:>12.3f}ms {'新增':>8}")
+            continue
+        change = result["median"] / base["median"] - 1 if base["median"] > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  退化"
+        print(f"{name:<32} {base['median'] * 1000:>12.3f}ms {result['median'] * 1000:>12.3f}ms "
+              f"{change:>+8.1%}{flag}")
+    for name in baseline["benchmarks"]:
+        if name not in current["benchmarks"]:
+            print(f"{name:<32} 本次未运行")
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="基准测试套件，结果保存为JSON并可与之前的结果对比")
+    parser.add_argument("--scale", type=float, default=1.0, help="数据规模系数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个基准测试的样本数")
+    parser.add_argument("--quick", action="store_true", help="快速模式：数据规模为十分之一，3个样本")
+    parser.add_argument("-k", "--filter", type=str, default=None, help="只运行名称包含该字符串的基准测试")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help=f"结果文件，默认保存到{RESULTS_DIR}/<时间>.json")
+    parser.add_argument("--compare", type=str, default=None, help="与该结果文件对比")
+    parser.add_argument("--threshold", type=float, default=0.1, help="中位数变慢超过该比例视为退化")
+    parser.add_argument("--load", type=str, default=None, help="不运行，直接读取该结果文件与--compare对比")
+    args = parser.parse_args()
+
+    if args.load:
+        with open(args.load, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        scale, repeat = (args.scale * 0.1, min(args.repeat, 3)) if args.quick else (args.scale, args.repeat)
+        output = os.path.abspath(args.output or os.path.join(
+            RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+
+        # 被测代码写入的新闻库、响应和日志都放在临时目录中
+        workdir = tempfile.mkdtemp(prefix="benchmark_suite_")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            print(f"准备数据（规模系数 {scale}）...")
+            benchmarks = build_benchmarks(workdir, scale)
+            if args.filter:
+                benchmarks = [benchmark for benchmark in benchmarks if args.filter in benchmark.name]
+            results = {}
+            for benchmark in benchmarks:
+                result = benchmark.run(repeat)
+                results[benchmark.name] = result
+                print(f"{benchmark.name:<28} 中位数 {result['median'] * 1000:>10.3f} ms  "
+                      f"±{result['stdev'] * 1000:>8.3f}  {result['items_per_second']:>14,.0f} 条/秒  "
+                      f"{benchmark.description}")
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        current = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "scale": scale,
+                "repeat": repeat,
+            },
+            "benchmarks": results,
+        }
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("scale") != current["meta"].get("scale"):
+            print(f"警告：数据规模不同（基准 {baseline['meta'].get('scale')}，本次 {current['meta'].get('scale')}），"
+                  f"结果不可直接比较")
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 个基准测试变慢超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n没有发现退化")
+
+
+if __name__ == "__main__":
+    main()
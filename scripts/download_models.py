@@ -8,7 +8,6 @@ FinGPT模型下载脚本
 
 import os
 import sys
-import requests
 import json
 import shutil
 import zipfile
@@ -17,6 +16,11 @@ from tqdm import tqdm
 import logging
 from pathlib import Path
 
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.http_client import HttpClient
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -50,14 +54,17 @@ def ensure_directories():
     TEMP_DIR.mkdir(parents=True, exist_ok=True)
     logger.info(f"模型将被下载到: {MODELS_DIR}")
 
-def download_from_huggingface():
+def download_from_huggingface(client=None):
     """从Hugging Face下载模型文件"""
     logger.info(f"开始从Hugging Face下载{MODEL_INFO['name']}模型...")
     
-    base_url = f"https://huggingface.co/{MODEL_INFO['huggingface_repo']}/resolve/main"
+    if client is None:
+        client = HttpClient(base_url="https://huggingface.co")
+    
+    base_path = f"/{MODEL_INFO['huggingface_repo']}/resolve/main"
     
     for file in MODEL_INFO["files"]:
-        file_url = f"{base_url}/{file}"
+        file_url = f"{base_path}/{file}"
         output_path = MODELS_DIR / file
         
         if output_path.exists():
@@ -66,7 +73,7 @@ def download_from_huggingface():
         
         logger.info(f"下载文件: {file}")
         try:
-            response = requests.get(file_url, stream=True)
+            response = client.get(file_url, stream=True)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
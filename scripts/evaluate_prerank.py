@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+预排序召回率评估
+在带模型评分的样本上，统计预排序保留M条候选时，完整模型排名的前N条新闻有多少被保留下来
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import ASSET_CONFIG
+from src.models import NewsItem, NewsScore
+from src.news_fetcher import load_news_items, parse_asset_list
+from src.ollama_client import OllamaScorer
+from src.prerank import PreRanker
+from src.scoring import ScoringEngine, scores_to_arrays
+
+# (资产类型, 日期) -> [(新闻, 模型评分)]
+LabeledGroups = Dict[Tuple[str, str], List[Tuple[NewsItem, NewsScore]]]
+
+
+def load_labels(path: str) -> LabeledGroups:
+    """
+    读取带模型评分的样本文件
+
+    文件为JSON列表，每条记录包含NewsItem的字段、asset_type以及sentiment_score、impact_score、relevance_score。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    groups: LabeledGroups = defaultdict(list)
+    for record in records:
+        item = NewsItem.from_dict(record)
+        score = NewsScore(item.title, record["sentiment_score"], record["impact_score"],
+                          record.get("relevance_score", 0.8))
+        groups[(record["asset_type"], item.publish_time[:8])].append((item, score))
+    return groups
+
+
+def label_saved_news(asset_types: List[str], start_date: str, end_date: str, scorer: OllamaScorer) -> LabeledGroups:
+    """用模型为已保存的新闻评分，作为样本"""
+    groups: LabeledGroups = {}
+    day = datetime.strptime(start_date, "%Y%m%d")
+    end = datetime.strptime(end_date, "%Y%m%d")
+    while day <= end:
+        target_date = day.strftime("%Y%m%d")
+        for asset_type in asset_types:
+            news_items = load_news_items(asset_type, target_date)
+            if not news_items:
+                continue
+            print(f"为{target_date} {ASSET_CONFIG[asset_type]['asset_name']}的{len(news_items)}条新闻评分...")
+            scores = scorer.score_batch(news_items)
+            labeled = [(item, score) for item, score in zip(news_items, scores) if score is not None]
+            if labeled:
+                groups[(asset_type, target_date)] = labeled
+        day += timedelta(days=1)
+    return groups
+
+
+def save_labels(groups: LabeledGroups, path: str):
+    """保存样本，之后可以用--labels直接评估"""
+    records = []
+    for (asset_type, _), labeled in groups.items():
+        for item, score in labeled:
+            records.append({
+                **item.to_dict(), "asset_type": asset_type, "sentiment_score": score.sentiment_score,
+                "impact_score": score.impact_score, "relevance_score": score.relevance_score,
+            })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    print(f"已保存 {len(records)} 条样本到 {path}")
+
+
+def evaluate(groups: LabeledGroups, m_values: List[int], ranker: PreRanker, engine: ScoringEngine):
+    """
+    计算各M值下的召回率
+
+    评分比例即随机选取M条时的期望召回率，可作为对照。
+
+    Returns:
+        List[Tuple[int, float, float]]: (M, 平均召回率, 平均评分比例)
+    """
+    # 每组模型排名前top_n的下标只需计算一次
+    targets = []
+    for (asset_type, _), labeled in groups.items():
+        indices, _ = engine.rank_arrays(*scores_to_arrays([score for _, score in labeled]))
+        if len(indices):
+            targets.append((asset_type, [item for item, _ in labeled], set(indices.tolist())))
+
+    rows = []
+    for m in m_values:
+        recalls, fractions = [], []
+        for asset_type, news_items, relevant in targets:
+            kept = set(ranker.rank_indices(news_items, asset_type, m).tolist())
+            recalls.append(len(relevant & kept) / len(relevant))
+            fractions.append(min(m, len(news_items)) / len(news_items))
+        if recalls:
+            rows.append((m, sum(recalls) / len(recalls), sum(fractions) / len(fractions)))
+    return rows
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="评估预排序相对完整模型排名的召回率")
+    parser.add_argument("--labels", type=str, help="带模型评分的样本文件，不提供时用模型为已保存的新闻评分")
+    parser.add_argument("-a", "--asset", type=str, default="all", help="资产类型，多个用逗号分隔，或all")
+    parser.add_argument("--start", type=str, default=datetime.now().strftime("%Y%m%d"), help="开始日期，格式为YYYYMMDD")
+    parser.add_argument("--end", type=str, default=None, help="结束日期，格式为YYYYMMDD，默认与开始日期相同")
+    parser.add_argument("--save-labels", type=str, help="把模型评分保存为样本文件")
+    parser.add_argument("--m", type=str, default="10,20,30,50,100", help="要评估的候选条数，逗号分隔")
+    args = parser.parse_args()
+
+    if args.labels:
+        groups = load_labels(args.labels)
+    else:
+        with OllamaScorer() as scorer:
+            groups = label_saved_news(parse_asset_list(args.asset), args.start, args.end or args.start, scorer)
+        if args.save_labels:
+            save_labels(groups, args.save_labels)
+    if not groups:
+        print("没有可评估的样本")
+        return
+
+    engine = ScoringEngine()
+    m_values = [int(value) for value in args.m.split(",") if value.strip()]
+    rows = evaluate(groups, m_values, PreRanker(), engine)
+    total = sum(len(labeled) for labeled in groups.values())
+
+    print("\n" + "=" * 60)
+    print(f"预排序召回率 - {len(groups)} 组（资产×日期），共 {total} 条新闻，"
+          f"目标为模型排名前 {engine.top_n} 条")
+    print("=" * 60)
+    print(f"{'M':>6} {'召回率':>10} {'评分比例（随机选取的召回率）':>16}")
+    for m, recall, fraction in rows:
+        print(f"{m:>6} {recall:>10.1%} {fraction:>16.1%}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
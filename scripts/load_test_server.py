@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+新闻服务压力测试
+在临时目录中启动Alpha Vantage桩服务器和新闻服务，用大量并发长连接客户端请求相同的几组(资产, 日期)，
+统计延迟分布、吞吐量，以及实际发到上游的请求数
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到系统路径
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPTS_DIR))
+sys.path.append(SCRIPTS_DIR)
+
+from src.http_client import HttpClient, set_default_client
+from src.rate_limiter import QuotaScheduler, set_default_scheduler
+from src.response_cache import ResponseCache, set_default_cache
+from src.news_fetcher import parse_asset_list
+from src.ollama_client import OllamaScorer
+from src.score_cache import ScoreCache
+from src.server import NewsServer, NewsService
+import alpha_vantage_stub_server
+import ollama_stub_server
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str) -> Tuple[int, bytes]:
+    """在已有的长连接上发送一个GET请求"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def run_client(port: int, paths: List[str], latencies: List[float], statuses: Dict[int, int]):
+    """一个客户端：建立一条长连接，依次发送请求"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                status, _ = await request(reader, writer, path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                statuses[-1] = statuses.get(-1, 0) + 1
+                return
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_clients(port: int, plans: List[List[str]]) -> Tuple[List[float], Dict[int, int], float]:
+    """所有客户端同时开始，返回(延迟列表, 各状态码次数, 总耗时)"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(port, paths, latencies, statuses) for paths in plans))
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def fetch_stats(port: int) -> dict:
+    """读取服务统计"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        _, body = await request(reader, writer, "/stats")
+    finally:
+        writer.close()
+    return json.loads(body)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """取第q百分位数（最近秩）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def start_thread(target, name: str) -> threading.Thread:
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对新闻服务做并发压力测试")
+    parser.add_argument("--clients", type=int, default=300, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=5, help="每个客户端发送的请求数")
+    parser.add_argument("--asset", default="oil,gold", help="请求的资产类型，逗号分隔")
+    parser.add_argument("--days", type=int, default=2, help="请求的日期数（从昨天往前）")
+    parser.add_argument("--endpoint", choices=["news", "analysis"], default="news", help="压测的接口")
+    parser.add_argument("--upstream-latency", type=float, default=0.5, help="Alpha Vantage桩服务器的延迟（秒）")
+    parser.add_argument("--scoring-latency", type=float, default=0.05, help="Ollama桩服务器的延迟（秒），仅analysis接口")
+    parser.add_argument("--result-ttl", type=float, default=None, help="服务保留已完成结果的时间（秒），默认使用SERVER_CONFIG")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--keep", action="store_true", help="保留临时目录（新闻、缓存和报告）")
+    args = parser.parse_args()
+
+    # 服务写入的新闻、缓存和报告都放在临时目录中
+    workdir = tempfile.mkdtemp(prefix="news_server_load_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    av_server = alpha_vantage_stub_server.create_server(port=0, latency=args.upstream_latency)
+    start_thread(av_server.serve_forever, "alpha-vantage-stub")
+    set_default_client(HttpClient(base_url=f"http://127.0.0.1:{av_server.server_address[1]}"))
+    set_default_scheduler(QuotaScheduler(per_minute=100000, per_day=0))
+    set_default_cache(ResponseCache(cache_dir=os.path.join(workdir, "cache")))
+
+    scorer = None
+    ollama_server = None
+    if args.endpoint == "analysis":
+        ollama_server = ollama_stub_server.create_server(port=0, latency=args.scoring_latency, parallel=8)
+        start_thread(ollama_server.serve_forever, "ollama-stub")
+        scorer = OllamaScorer(base_url=f"http://127.0.0.1:{ollama_server.server_address[1]}",
+                              cache=ScoreCache(os.path.join(workdir, "score_cache.db")))
+
+    config = {"result_ttl": args.result_ttl} if args.result_ttl is not None else None
+    service = NewsService(logging.getLogger("news_fetcher.load_test"), config=config, scorer=scorer)
+    server = NewsServer(service, "127.0.0.1", 0, config)
+    started = threading.Event()
+    server_thread = start_thread(lambda: asyncio.run(server.serve(lambda _: started.set())), "news-server")
+    started.wait()
+
+    rng = random.Random(args.seed)
+    yesterday = datetime.now() - timedelta(days=1)
+    keys = [(asset_type, (yesterday - timedelta(days=offset)).strftime("%Y%m%d"))
+            for asset_type in parse_asset_list(args.asset) for offset in range(args.days)]
+    plans = [[f"/{args.endpoint}?asset={asset_type}&date={date}" for asset_type, date in
+              (rng.choice(keys) for _ in range(args.requests))] for _ in range(args.clients)]
+
+    try:
+        latencies, statuses, elapsed = asyncio.run(run_clients(server.port, plans))
+        stats = asyncio.run(fetch_stats(server.port))
+    finally:
+        server.stop()
+        server_thread.join()
+        service.close()
+        av_server.shutdown()
+        if ollama_server is not None:
+            ollama_server.shutdown()
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    total = len(latencies)
+    flight = stats["flight"]
+    print("\n" + "=" * 60)
+    print(f"新闻服务压力测试 - /{args.endpoint}，{args.clients} 个并发客户端 × {args.requests} 个请求，"
+          f"{len(keys)} 组(资产, 日期)")
+    print("=" * 60)
+    print(f"完成请求: {total}，耗时 {elapsed:.2f} 秒，吞吐量 {total / elapsed:.0f} 请求/秒")
+    print(f"状态码: {', '.join(f'{status}×{count}' for status, count in sorted(statuses.items()))}")
+    print(f"延迟: p50 {percentile(latencies, 50) * 1000:.1f} ms，p95 {percentile(latencies, 95) * 1000:.1f} ms，"
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms，最大 {max(latencies, default=0) * 1000:.1f} ms")
+    print(f"上游调用: {flight['upstream']}，合并到进行中的调用: {flight['coalesced']}，"
+          f"直接返回已完成结果: {flight['memo_hits']}")
+    print(f"Alpha Vantage桩服务器收到请求: {av_server.requests}")
+    if ollama_server is not None:
+        print(f"Ollama桩服务器收到请求: {ollama_server.requests}")
+    if args.keep:
+        print(f"临时目录: {workdir}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ollama桩服务器
+模拟Ollama的/api/generate和/api/tags接口，按提示词哈希返回确定的评分，
+可配置延迟、抖动、错误率和并行度，用于离线测试评分吞吐量
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import MODEL_CONFIG
+
+
+def stub_score(prompt: str) -> dict:
+    """根据提示词哈希生成确定的评分"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return {
+        "sentiment": round(int.from_bytes(digest[0:2], "big") / 65535 * 2 - 1, 3),
+        "impact": round(int.from_bytes(digest[2:4], "big") / 65535 * 100, 1),
+        "relevance": round(int.from_bytes(digest[4:6], "big") / 65535, 3),
+        "summary": "桩服务器生成的摘要",
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    """桩服务器，客户端超时断开时不打印异常"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """请求处理器，配置保存在server对象上"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.model}]})
+        elif self.path == "/":
+            self._send_json(200, {"status": "Ollama is running"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid json"})
+            return
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        server = self.server
+        start = time.monotonic()
+        # 与Ollama的OLLAMA_NUM_PARALLEL一样，超出并行度的请求排队等待
+        with server.slots:
+            delay = max(0.0, random.gauss(server.latency, server.jitter))
+            time.sleep(delay)
+        with server.lock:
+            server.requests += 1
+
+        if random.random() < server.error_rate:
+            self._send_json(500, {"error": "stub error"})
+            return
+
+        prompt = request.get("prompt", "")
+        if random.random() < server.garbage_rate:
+            text = "Sorry, I cannot rate this news."
+        else:
+            text = json.dumps(stub_score(prompt), ensure_ascii=False)
+        self._send_json(200, {
+            "model": request.get("model", server.model),
+            "response": text,
+            "done": True,
+            "total_duration": int((time.monotonic() - start) * 1e9),
+        })
+
+
+def create_server(host: str = "127.0.0.1", port: int = 11434, latency: float = 0.2, jitter: float = 0.0,
+                  parallel: int = 4, error_rate: float = 0.0, garbage_rate: float = 0.0,
+                  verbose: bool = False) -> StubServer:
+    """
+    创建桩服务器
+
+    Args:
+        host: 监听地址
+        port: 端口，0表示随机端口
+        latency: 每个请求的平均处理时间（秒）
+        jitter: 处理时间的标准差（秒）
+        parallel: 同时处理的请求数
+        error_rate: 返回500错误的比例
+        garbage_rate: 返回无法解析的文字的比例
+        verbose: 是否打印访问日志
+
+    Returns:
+        StubServer: 服务器，调用serve_forever()开始服务
+    """
+    server = StubServer((host, port), StubHandler)
+    server.model = MODEL_CONFIG.get("ollama_model", "fingpt")
+    server.latency = latency
+    server.jitter = jitter
+    server.slots = threading.Semaphore(max(1, parallel))
+    server.error_rate = error_rate
+    server.garbage_rate = garbage_rate
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模拟Ollama接口的桩服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=11434, help="端口")
+    parser.add_argument("--latency", type=float, default=0.2, help="平均处理时间（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="处理时间的标准差（秒）")
+    parser.add_argument("--parallel", type=int, default=4, help="同时处理的请求数")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回500错误的比例")
+    parser.add_argument("--garbage-rate", type=float, default=0.0, help="返回无法解析的文字的比例")
+    parser.add_argument("--verbose", action="store_true", help="打印访问日志")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency, args.jitter, args.parallel,
+                           args.error_rate, args.garbage_rate, args.verbose)
+    print(f"Ollama桩服务器运行在 http://{args.host}:{server.server_address[1]}"
+          f"（延迟 {args.latency}±{args.jitter} 秒，并行 {args.parallel}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
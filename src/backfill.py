@@ -0,0 +1,389 @@
+"""
+历史回填模块 - 按时间窗口批量获取历史新闻，支持断点续传
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模块
+from config.config import ASSET_CONFIG, BACKFILL_CONFIG
+from src.http_client import HttpClient, get_default_client
+from src.rate_limiter import QuotaExceededError, QuotaScheduler, get_default_scheduler
+from src.response_cache import ResponseCache, get_default_cache
+from src.watermarks import get_default_watermarks
+from src.dedup import DedupIndex
+from src.news_fetcher import (
+    build_news_params, day_window, iter_feed_items, open_news_feed,
+    parse_asset_list, save_news_items, setup_logging
+)
+
+WINDOW_FORMAT = "%Y%m%dT%H%M"
+
+# 时间窗口：(资产类型, time_from, time_to)
+Window = Tuple[str, str, str]
+
+
+@dataclass
+class BackfillStats:
+    """回填统计"""
+    windows_done: int = 0
+    windows_failed: int = 0
+    splits: int = 0
+    api_calls: int = 0
+    cache_hits: int = 0
+    items: int = 0
+    elapsed: float = 0.0
+    quota_exhausted: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BackfillStats':
+        """从字典创建实例"""
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+
+def split_window(window: Window) -> Tuple[Window, Window]:
+    """
+    将时间窗口对半拆分
+
+    Args:
+        window: 时间窗口
+
+    Returns:
+        Tuple[Window, Window]: 前半段和后半段，两段不重叠
+    """
+    asset_type, time_from, time_to = window
+    start = datetime.strptime(time_from, WINDOW_FORMAT)
+    end = datetime.strptime(time_to, WINDOW_FORMAT)
+    middle = start + timedelta(minutes=(end - start) // timedelta(minutes=1) // 2)
+    return (
+        (asset_type, time_from, middle.strftime(WINDOW_FORMAT)),
+        (asset_type, (middle + timedelta(minutes=1)).strftime(WINDOW_FORMAT), time_to),
+    )
+
+
+def window_minutes(window: Window) -> int:
+    """时间窗口的分钟数"""
+    start = datetime.strptime(window[1], WINDOW_FORMAT)
+    end = datetime.strptime(window[2], WINDOW_FORMAT)
+    return (end - start) // timedelta(minutes=1)
+
+
+class BackfillEngine:
+    """
+    历史回填引擎
+
+    为每个资产的每一天生成一个时间窗口并依次请求；当某个窗口返回的条数达到limit时，
+    说明结果可能被截断，将窗口对半拆分后重新请求，直到窗口小于min_window_minutes。
+    被拆分的窗口在两个子窗口都完成后才算完成，完成窗口数只统计实际保存了结果的窗口。
+    每处理一个窗口都会写入检查点，进程崩溃或配额用尽后可从检查点继续。
+    """
+
+    def __init__(self, asset_types: List[str], start_date: str, end_date: str,
+                 checkpoint_file: Optional[str] = None, limit: Optional[int] = None,
+                 min_window_minutes: Optional[int] = None,
+                 client: Optional[HttpClient] = None, scheduler: Optional[QuotaScheduler] = None,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            asset_types: 资产类型列表
+            start_date: 开始日期，格式为YYYYMMDD
+            end_date: 结束日期（包含），格式为YYYYMMDD
+            checkpoint_file: 检查点文件路径
+            limit: 每次请求的最大条数
+            min_window_minutes: 最小窗口长度（分钟），小于该长度不再拆分
+            client: HTTP客户端
+            scheduler: 配额调度器
+            cache: 响应缓存
+            use_cache: 是否使用响应缓存
+            logger: 日志记录器
+        """
+        self.asset_types = asset_types
+        self.start_date = start_date
+        self.end_date = end_date
+        self.checkpoint_file = checkpoint_file or BACKFILL_CONFIG["checkpoint_file"]
+        self.limit = limit or BACKFILL_CONFIG["limit"]
+        self.min_window_minutes = min_window_minutes or BACKFILL_CONFIG["min_window_minutes"]
+        self.client = client or get_default_client()
+        self.scheduler = scheduler or get_default_scheduler()
+        self.use_cache = use_cache
+        self.cache = cache or (get_default_cache() if use_cache else None)
+        self.logger = logger or setup_logging()
+        self.dedup = DedupIndex()
+
+        self.pending: Deque[Window] = deque()
+        self.failed: List[Window] = []
+        # 已拆分但尚未完成的窗口 -> 未完成的子窗口数；子窗口 -> 父窗口
+        self.open_splits: Dict[Window, int] = {}
+        self.parents: Dict[Window, Window] = {}
+        self.stats = BackfillStats()
+
+    def _job_config(self) -> Dict[str, Any]:
+        return {
+            "asset_types": self.asset_types,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "limit": self.limit,
+        }
+
+    def initial_windows(self) -> List[Window]:
+        """按天生成初始时间窗口，最近的日期优先"""
+        start = datetime.strptime(self.start_date, "%Y%m%d")
+        end = datetime.strptime(self.end_date, "%Y%m%d")
+        windows = []
+        day = end
+        while day >= start:
+            date_str = day.strftime("%Y%m%d")
+            for asset_type in self.asset_types:
+                windows.append((asset_type, *day_window(date_str)))
+            day -= timedelta(days=1)
+        return windows
+
+    def load_checkpoint(self) -> bool:
+        """
+        从检查点恢复进度
+
+        Returns:
+            bool: 是否成功恢复；检查点不存在或任务参数不同时返回False
+        """
+        if not os.path.exists(self.checkpoint_file):
+            return False
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取检查点失败，重新开始: {str(e)}")
+            return False
+
+        if checkpoint.get("job") != self._job_config():
+            self.logger.warning("检查点对应的任务参数不同，重新开始")
+            return False
+
+        # 上次失败的窗口放回队列末尾重试
+        self.pending = deque(tuple(window) for window in checkpoint.get("pending", []))
+        self.pending.extend(tuple(window) for window in checkpoint.get("failed", []))
+        self.open_splits = {tuple(window): left for window, left in checkpoint.get("open_splits", [])}
+        self.parents = {tuple(child): tuple(parent) for child, parent in checkpoint.get("parents", [])}
+        self.stats = BackfillStats.from_dict(checkpoint.get("stats", {}))
+        self.stats.quota_exhausted = False
+        return True
+
+    def save_checkpoint(self):
+        """原子写入检查点"""
+        os.makedirs(os.path.dirname(self.checkpoint_file) or ".", exist_ok=True)
+        checkpoint = {
+            "job": self._job_config(),
+            "pending": list(self.pending),
+            "failed": self.failed,
+            "open_splits": [[window, left] for window, left in self.open_splits.items()],
+            "parents": [[child, parent] for child, parent in self.parents.items()],
+            "stats": self.stats.to_dict(),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = f"{self.checkpoint_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    def process_window(self, window: Window) -> bool:
+        """
+        请求并保存一个时间窗口
+
+        Args:
+            window: 时间窗口
+
+        Returns:
+            bool: 是否已保存该窗口的结果；窗口被拆分时返回False
+        """
+        asset_type, time_from, time_to = window
+        params = build_news_params(asset_type, time_from, time_to, sort=BACKFILL_CONFIG["sort"], limit=self.limit)
+        parser, from_cache = open_news_feed(params, self.client, self.scheduler, self.cache, self.use_cache)
+        if from_cache:
+            self.stats.cache_hits += 1
+        else:
+            self.stats.api_calls += 1
+
+        with parser:
+            if not parser.has_feed:
+                raise ValueError(f"响应中没有feed: {str(parser.meta)[:100]}")
+            # 流式解析，不在内存中保留完整的响应体
+            news_items = list(iter_feed_items(parser, logger=self.logger))
+
+        # 结果被截断时拆分窗口，两个子窗口放到队首优先处理
+        if parser.count >= self.limit:
+            if window_minutes(window) > self.min_window_minutes:
+                first, second = split_window(window)
+                self.pending.appendleft(second)
+                self.pending.appendleft(first)
+                self.open_splits[window] = 2
+                self.parents[first] = self.parents[second] = window
+                self.stats.splits += 1
+                self.logger.info(f"{asset_type} {time_from}-{time_to} 返回 {parser.count} 条，拆分窗口")
+                return False
+            self.logger.warning(f"{asset_type} {time_from}-{time_to} 已达最小窗口仍返回 {parser.count} 条，可能有遗漏")
+
+        # 按发布日期分组合并到对应的日文件
+        by_date: Dict[str, list] = {}
+        for item in self.dedup.filter(news_items, asset_type):
+            by_date.setdefault(item.publish_time[:8], []).append(item)
+        for date_str, items in by_date.items():
+            save_news_items(asset_type, date_str, items, merge=True)
+            self.stats.items += len(items)
+        # 回填到今天的新闻也要推进高水位，避免之后增量获取时重复追加
+        get_default_watermarks().advance(
+            asset_type, [(item.publish_time, item.url) for items in by_date.values() for item in items]
+        )
+        return True
+
+    def complete_window(self, window: Window):
+        """
+        记录窗口完成，子窗口全部完成时父窗口也随之完成
+
+        Args:
+            window: 已保存结果的窗口
+        """
+        self.stats.windows_done += 1
+        parent = self.parents.pop(window, None)
+        while parent is not None:
+            self.open_splits[parent] -= 1
+            if self.open_splits[parent] > 0:
+                break
+            del self.open_splits[parent]
+            self.logger.info(f"{parent[0]} {parent[1]}-{parent[2]} 的全部子窗口已完成")
+            parent = self.parents.pop(parent, None)
+
+    def run(self, resume: bool = True) -> BackfillStats:
+        """
+        执行回填
+
+        Args:
+            resume: 是否从检查点继续
+
+        Returns:
+            BackfillStats: 统计信息（包含之前运行的累计值）
+        """
+        if not (resume and self.load_checkpoint()):
+            self.pending = deque(self.initial_windows())
+            self.open_splits = {}
+            self.parents = {}
+            self.stats = BackfillStats()
+        self.failed = []
+
+        self.logger.info(f"开始回填 {self.start_date}-{self.end_date}，待处理窗口: {len(self.pending)}")
+        self.save_checkpoint()
+
+        start_time = time.monotonic()
+        elapsed_before = self.stats.elapsed
+        try:
+            while self.pending:
+                window = self.pending.popleft()
+                try:
+                    if self.process_window(window):
+                        self.complete_window(window)
+                except QuotaExceededError as e:
+                    # 配额用尽时把窗口放回队首，等待下次续传
+                    self.pending.appendleft(window)
+                    self.stats.quota_exhausted = True
+                    self.logger.warning(f"配额已用尽，停止回填，可稍后续传: {str(e)}")
+                    break
+                except Exception as e:
+                    self.failed.append(window)
+                    self.stats.windows_failed += 1
+                    self.logger.error(f"回填窗口 {window} 失败: {str(e)}")
+                finally:
+                    self.stats.elapsed = elapsed_before + time.monotonic() - start_time
+                    self.save_checkpoint()
+        except KeyboardInterrupt:
+            self.logger.info("回填已中断，进度已保存到检查点")
+            raise
+
+        if not self.pending and not self.failed:
+            self.logger.info("回填完成")
+        return self.stats
+
+    def report(self) -> str:
+        """生成吞吐量和配额使用报告"""
+        stats = self.stats
+        throughput = stats.items / stats.elapsed if stats.elapsed > 0 else 0.0
+        remaining = self.scheduler.remaining_today()
+        lines = [
+            "=" * 50,
+            f"回填报告 {self.start_date} - {self.end_date} ({', '.join(self.asset_types)})",
+            "=" * 50,
+            f"完成窗口: {stats.windows_done}，失败窗口: {stats.windows_failed}，拆分次数: {stats.splits}",
+            f"剩余窗口: {len(self.pending) + len(self.failed)}，未完成的拆分窗口: {len(self.open_splits)}",
+            f"新闻条数: {stats.items}，耗时: {stats.elapsed:.1f} 秒，吞吐量: {throughput:.1f} 条/秒",
+            f"API请求: {stats.api_calls}，缓存命中: {stats.cache_hits}",
+            f"今日已用配额: {self.scheduler.used_today}，剩余: {'不限' if remaining is None else remaining}",
+            f"限流次数: {self.scheduler.rate_limited}，重试次数: {self.scheduler.retries}",
+        ]
+        if stats.quota_exhausted:
+            lines.append("配额已用尽，再次运行相同命令即可从检查点继续")
+        lines.append("=" * 50)
+        return "\n".join(lines)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="历史新闻回填 - 按时间窗口获取一段日期内的新闻")
+    parser.add_argument("--start", type=str, required=True, help="开始日期，格式为YYYYMMDD")
+    parser.add_argument("--end", type=str, default=datetime.now().strftime("%Y%m%d"),
+                        help="结束日期（包含），格式为YYYYMMDD")
+    parser.add_argument("-a", "--asset", type=str, default="all",
+                        help="资产类型，all或逗号分隔的多个资产")
+    parser.add_argument("--checkpoint", type=str, default=BACKFILL_CONFIG["checkpoint_file"],
+                        help="检查点文件路径")
+    parser.add_argument("--limit", type=int, default=BACKFILL_CONFIG["limit"], help="每次请求的最大条数")
+    parser.add_argument("--min-window", type=int, default=BACKFILL_CONFIG["min_window_minutes"],
+                        help="最小窗口长度（分钟）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用响应缓存")
+    parser.add_argument("--restart", action="store_true", help="忽略已有检查点，重新开始")
+    args = parser.parse_args()
+
+    try:
+        start = datetime.strptime(args.start, "%Y%m%d")
+        end = datetime.strptime(args.end, "%Y%m%d")
+    except ValueError:
+        print(f"错误：日期格式不正确，应为YYYYMMDD，例如20250307")
+        return
+    if start > end:
+        print(f"错误：开始日期不能晚于结束日期")
+        return
+
+    asset_types = parse_asset_list(args.asset)
+    invalid_assets = [asset_type for asset_type in asset_types if asset_type not in ASSET_CONFIG]
+    if not asset_types or invalid_assets:
+        print(f"错误：无效的资产类型: {', '.join(invalid_assets) or args.asset}")
+        print(f"有效的资产类型: {', '.join(ASSET_CONFIG.keys())}")
+        return
+
+    # 回填进度只写日志，控制台显示INFO级别
+    setup_logging(console_level="INFO")
+    engine = BackfillEngine(
+        asset_types, args.start, args.end,
+        checkpoint_file=args.checkpoint, limit=args.limit,
+        min_window_minutes=args.min_window, use_cache=not args.no_cache
+    )
+    try:
+        engine.run(resume=not args.restart)
+    finally:
+        print(engine.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+常驻模块 - 按SYSTEM_CONFIG中的execution_time每日运行分析流水线，进程常驻以保持连接池、缓存和模型
+"""
+
+import os
+import sys
+import json
+import signal
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模块
+from config.config import DAEMON_CONFIG, SYSTEM_CONFIG
+from src.news_fetcher import setup_logging
+from src.local_inference import create_scorer
+from src.pipeline import run_analysis_pipeline
+from src.metrics import get_default_metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger("news_fetcher.daemon")
+
+
+class DaemonLock:
+    """
+    单实例锁
+
+    对锁文件加操作系统级的排他锁，进程退出（包括崩溃）时锁自动释放，不会留下需要手动删除的锁。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 锁文件路径
+        """
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        """
+        获取锁
+
+        Returns:
+            bool: 是否获取成功，已有其他实例在运行时返回False
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        """释放锁"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _parse_execution_time(value: str) -> timedelta:
+    """把HH:MM转换为当天零点之后的时长"""
+    hours, minutes = value.split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+
+class Daemon:
+    """
+    常驻调度器
+
+    每天在execution_time（UTC）运行一次每日任务，分析前一天（UTC）完整的新闻；
+    可选按poll_interval_minutes对当天做日内增量获取。所有任务在同一个线程中依次执行，不会重叠。
+    已完成的每日任务记录在状态文件中，停机后重启时按时间顺序补跑错过的任务（最多catchup_days天）。
+    评分器在启动时创建并在各次运行之间复用，HTTP连接池、配额调度器和缓存本来就是进程内共享的。
+    """
+
+    def __init__(self, asset_types: List[str], logger: Optional[logging.Logger] = None,
+                 config: Optional[Dict[str, Any]] = None, scorer=None, use_cache: bool = True,
+                 test: bool = False, top_m: Optional[int] = None):
+        """
+        Args:
+            asset_types: 资产类型列表
+            logger: 日志记录器，如果为None则创建新的
+            config: 常驻配置，默认使用DAEMON_CONFIG，缺少的键取DAEMON_CONFIG中的值
+            scorer: 评分器，如果为None则按MODEL_CONFIG创建
+            use_cache: 是否使用响应缓存和评分缓存
+            test: 是否使用测试数据
+            top_m: 送入模型评分的候选条数，默认使用PRERANK_CONFIG中的top_m
+        """
+        config = {**DAEMON_CONFIG, **(config or {})}
+        self.asset_types = asset_types
+        self.logger = logger or setup_logging()
+        self.execution_time = _parse_execution_time(SYSTEM_CONFIG.get("execution_time", "00:05"))
+        self.poll_interval = timedelta(minutes=config["poll_interval_minutes"])
+        self.catchup_days = max(1, int(config["catchup_days"]))
+        self.heartbeat = float(config["heartbeat_seconds"])
+        self.lock = DaemonLock(config["lock_file"])
+        self.state_file = config["state_file"]
+        self.status_file = config["status_file"]
+        self.use_cache = use_cache
+        self.test = test
+        self.top_m = top_m
+        self.scorer = scorer
+
+        self.stop_event = threading.Event()
+        self.state = self._load_state()
+        self.started_at = datetime.now(timezone.utc)
+        self.current_job: Optional[Dict[str, Any]] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.runs = 0
+        self.failures = 0
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取常驻状态文件失败: {str(e)}")
+            return {}
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def scheduled_at(self, run_day: datetime) -> datetime:
+        """某一天的每日任务计划时间"""
+        return run_day.replace(hour=0, minute=0, second=0, microsecond=0) + self.execution_time
+
+    def due_runs(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        计算到期但尚未完成的每日任务
+
+        Args:
+            now: 当前时间（UTC），默认使用当前时间
+
+        Returns:
+            List[str]: 任务所在日期（YYYYMMDD），从旧到新；首次运行时只包含最近一次
+        """
+        now = now or datetime.now(timezone.utc)
+        latest = self.scheduled_at(now)
+        if latest > now:
+            latest -= timedelta(days=1)
+        last_done = self.state.get("last_daily_run")
+        if last_done is None:
+            return [latest.strftime("%Y%m%d")]
+
+        due = []
+        for offset in range(self.catchup_days - 1, -1, -1):
+            run_day = (latest - timedelta(days=offset)).strftime("%Y%m%d")
+            if run_day > last_done:
+                due.append(run_day)
+        return due
+
+    def next_run_time(self, now: Optional[datetime] = None) -> datetime:
+        """下一次任务（每日任务或日内增量）的时间"""
+        now = now or datetime.now(timezone.utc)
+        next_daily = self.scheduled_at(now)
+        if next_daily <= now:
+            next_daily += timedelta(days=1)
+        if not self.poll_interval:
+            return next_daily
+        last_poll = self.state.get("last_poll")
+        next_poll = datetime.fromisoformat(last_poll) + self.poll_interval if last_poll else now
+        return min(next_daily, max(next_poll, now))
+
+    def write_status(self, state: str):
+        """写入运行状态文件"""
+        now = datetime.now(timezone.utc)
+        self._write_json(self.status_file, {
+            "pid": os.getpid(),
+            "state": state,
+            "updated_at": now.isoformat(timespec="seconds"),
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "assets": self.asset_types,
+            "current_job": self.current_job,
+            "last_run": self.last_run,
+            "next_run": self.next_run_time(now).isoformat(timespec="seconds"),
+            "last_daily_run": self.state.get("last_daily_run"),
+            "runs": self.runs,
+            "failures": self.failures,
+            "scorer": type(self.scorer).__name__ if self.scorer is not None else None,
+        })
+
+    def _run_job(self, kind: str, target_date: str, incremental: bool):
+        self.current_job = {
+            "kind": kind, "target_date": target_date,
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.write_status("running")
+        self.logger.info(f"开始{kind}任务，日期: {target_date}")
+        result = {"kind": kind, "target_date": target_date, "started_at": self.current_job["started_at"]}
+        try:
+            outcome = run_analysis_pipeline(self.asset_types, target_date, self.logger, scorer=self.scorer,
+                                            use_cache=self.use_cache, incremental=incremental, test=self.test,
+                                            top_m=self.top_m)
+            result.update({
+                "ok": True,
+                "reports": [report["path"] for report in outcome["reports"]],
+                "timed_out": outcome["timed_out"],
+                "elapsed": round(outcome["elapsed"], 2),
+            })
+            self.logger.info(f"{kind}任务完成，生成 {len(outcome['reports'])} 份报告，耗时 {outcome['elapsed']:.1f} 秒")
+        except Exception as e:
+            self.failures += 1
+            result.update({"ok": False, "error": str(e)})
+            self.logger.error(f"{kind}任务失败: {str(e)}")
+        self.runs += 1
+        try:
+            # 指标在进程内累计，每次任务后更新文本文件和汇总
+            get_default_metrics().write()
+        except OSError as e:
+            self.logger.error(f"写入运行指标失败: {str(e)}")
+        result["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.last_run = result
+        self.current_job = None
+
+    def run_daily(self, run_day: str):
+        """
+        运行某一天的每日任务：分析前一天的完整新闻
+
+        失败的任务同样记为已完成，避免反复重试耗尽配额；失败记录在状态文件中。
+
+        Args:
+            run_day: 任务所在日期（YYYYMMDD）
+        """
+        target_date = (datetime.strptime(run_day, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+        self._run_job("每日", target_date, incremental=False)
+        self.state["last_daily_run"] = run_day
+        self._write_json(self.state_file, self.state)
+
+    def run_poll(self):
+        """对当天（UTC）做日内增量获取"""
+        now = datetime.now(timezone.utc)
+        self._run_job("日内增量", now.strftime("%Y%m%d"), incremental=True)
+        self.state["last_poll"] = now.isoformat()
+        self._write_json(self.state_file, self.state)
+
+    def _poll_due(self, now: datetime) -> bool:
+        if not self.poll_interval:
+            return False
+        last_poll = self.state.get("last_poll")
+        return last_poll is None or now - datetime.fromisoformat(last_poll) >= self.poll_interval
+
+    def run_forever(self):
+        """
+        运行调度循环，直到stop()被调用
+
+        Raises:
+            RuntimeError: 已有其他实例在运行
+        """
+        if not self.lock.acquire():
+            raise RuntimeError(f"已有常驻实例在运行（锁文件 {self.lock.path}）")
+        try:
+            if self.scorer is None:
+                self.scorer = create_scorer(use_cache=self.use_cache)
+            # 本地模型在启动时加载，之后各次运行直接复用
+            if hasattr(self.scorer, "load"):
+                self.scorer.load()
+
+            self.logger.info(f"常驻模式启动，每日执行时间 {SYSTEM_CONFIG.get('execution_time')} UTC，"
+                             f"日内增量间隔 {self.poll_interval}")
+            while not self.stop_event.is_set():
+                now = datetime.now(timezone.utc)
+                due = self.due_runs(now)
+                if due:
+                    if len(due) > 1:
+                        self.logger.info(f"补跑错过的每日任务: {', '.join(due)}")
+                    self.run_daily(due[0])
+                    continue
+                if self._poll_due(now):
+                    self.run_poll()
+                    continue
+
+                self.write_status("idle")
+                wait = (self.next_run_time(now) - now).total_seconds()
+                self.stop_event.wait(max(0.0, min(wait, self.heartbeat)))
+        finally:
+            self.write_status("stopped")
+            if self.scorer is not None:
+                self.scorer.close()
+            self.lock.release()
+            self.logger.info("常驻模式已停止")
+
+    def stop(self, *_):
+        """停止调度循环，正在运行的任务完成后退出"""
+        self.stop_event.set()
+
+    def install_signal_handlers(self):
+        """收到SIGINT或SIGTERM时停止"""
+        signal.signal(signal.SIGINT, self.stop)
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, self.stop)
@@ -0,0 +1,231 @@
+"""
+去重模块 - 基于URL/内容哈希和SimHash的跨资产新闻去重索引
+"""
+
+import os
+import sys
+import re
+import hashlib
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import SYSTEM_CONFIG
+from src.models import NewsItem
+
+logger = logging.getLogger("news_fetcher.dedup")
+
+SIMHASH_BITS = 64
+
+# 英文单词、数字，或单个中日韩字符
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[一-鿿぀-ヿ가-힯]")
+
+# 不影响文章内容的跟踪参数
+_TRACKING_PARAMS = {"ref", "fbclid", "gclid", "cmpid", "mod"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL：小写协议和主机，去掉片段、跟踪参数和末尾斜杠
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ))
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return urlunsplit(("", netloc, parts.path.rstrip("/"), query, ""))
+
+
+def tokenize(text: str) -> List[str]:
+    """将文本切分为小写单词和单个中日韩字符"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def content_hash(item: NewsItem) -> str:
+    """标题和正文规范化后的哈希，用于识别内容完全相同的转载"""
+    text = " ".join(tokenize(f"{item.title} {item.content}"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def simhash(tokens: List[str], bits: int = SIMHASH_BITS) -> int:
+    """
+    计算SimHash指纹
+
+    以单词和相邻单词对作为特征，相似文本的指纹只有少数位不同。
+
+    Args:
+        tokens: 分词结果
+        bits: 指纹位数
+
+    Returns:
+        int: 指纹
+    """
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    if not features:
+        return 0
+
+    # 每个特征的哈希展开成二进制字符串并按权重重复，逐列统计1的个数，
+    # 避免在Python中对每个特征逐位循环
+    rows = []
+    for feature, weight in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        rows.extend([format(value, f"0{bits}b")] * weight)
+
+    half = len(rows) / 2
+    fingerprint = 0
+    for position, column in enumerate(zip(*rows)):
+        if column.count("1") > half:
+            fingerprint |= 1 << (bits - 1 - position)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个指纹的汉明距离"""
+    return bin(a ^ b).count("1")
+
+
+class DedupIndex:
+    """
+    新闻去重索引
+
+    依次用规范化URL、内容哈希和SimHash判断新闻是否为已知报道的重复。
+    SimHash指纹被分成max_distance+1段，两个指纹距离不超过max_distance时至少有一段完全相同，
+    因此只需比较同段相同的候选。每篇规范报道记录其所属的资产，多资产模式据此对每篇规范报道只评分一次。
+    """
+
+    def __init__(self, max_distance: Optional[int] = None):
+        """
+        Args:
+            max_distance: 判定为近似重复的最大汉明距离，默认使用SYSTEM_CONFIG中的dedup_max_distance
+        """
+        if max_distance is None:
+            max_distance = SYSTEM_CONFIG.get("dedup_max_distance", 6)
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+
+        self._by_url: Dict[str, str] = {}
+        self._by_content: Dict[str, str] = {}
+        self._band_tables: List[Dict[int, List[str]]] = [{} for _ in range(self.bands)]
+        self._fingerprints: Dict[str, int] = {}
+        self._items: Dict[str, NewsItem] = {}
+        self._assets: Dict[str, Set[str]] = {}
+        # (规范报道, 资产) -> 该资产下代表这篇报道的URL
+        self._members: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def _bands_of(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [fingerprint >> (i * self.band_bits) & mask for i in range(self.bands)]
+
+    def _find_near(self, fingerprint: int) -> Optional[str]:
+        for table, band in zip(self._band_tables, self._bands_of(fingerprint)):
+            for canonical_id in table.get(band, ()):
+                if hamming_distance(fingerprint, self._fingerprints[canonical_id]) <= self.max_distance:
+                    return canonical_id
+        return None
+
+    def add(self, item: NewsItem, asset_type: str) -> Tuple[str, bool]:
+        """
+        将新闻加入索引
+
+        Args:
+            item: 新闻项
+            asset_type: 新闻所属的资产类型
+
+        Returns:
+            Tuple[str, bool]: (规范报道ID, 是否应保留在该资产的列表中)；
+            同一资产下已有另一篇URL不同的同一报道时返回False
+        """
+        url = normalize_url(item.url)
+        digest = content_hash(item)
+
+        with self._lock:
+            canonical_id = self._by_url.get(url) or self._by_content.get(digest)
+            if canonical_id is not None:
+                self.exact_duplicates += 1
+            else:
+                fingerprint = simhash(tokenize(f"{item.title} {item.content}"))
+                canonical_id = self._find_near(fingerprint)
+                if canonical_id is not None:
+                    self.near_duplicates += 1
+                else:
+                    # 新的报道，以其规范化URL作为ID
+                    canonical_id = url
+                    self._fingerprints[canonical_id] = fingerprint
+                    self._items[canonical_id] = item
+                    self._assets[canonical_id] = set()
+                    for table, band in zip(self._band_tables, self._bands_of(fingerprint)):
+                        table.setdefault(band, []).append(canonical_id)
+
+            self._by_url.setdefault(url, canonical_id)
+            self._by_content.setdefault(digest, canonical_id)
+            self._assets[canonical_id].add(asset_type)
+
+            member = self._members.setdefault((canonical_id, asset_type), url)
+            return canonical_id, member == url
+
+    def canonical_id(self, item: NewsItem) -> Optional[str]:
+        """已加入索引的新闻对应的规范报道ID，未加入时返回None"""
+        url = normalize_url(item.url)
+        with self._lock:
+            return self._by_url.get(url)
+
+    def assets_of(self, canonical_id: str) -> Set[str]:
+        """规范报道所属的资产"""
+        with self._lock:
+            return set(self._assets.get(canonical_id, ()))
+
+    def canonical_item(self, canonical_id: str) -> Optional[NewsItem]:
+        """规范报道对应的新闻项（首次出现的版本）"""
+        with self._lock:
+            return self._items.get(canonical_id)
+
+    def unique_items(self) -> List[Tuple[NewsItem, Set[str]]]:
+        """
+        获取全部规范报道
+
+        Returns:
+            List[Tuple[NewsItem, Set[str]]]: (新闻项, 所属资产)列表，按首次出现顺序
+        """
+        with self._lock:
+            return [(item, set(self._assets[canonical_id])) for canonical_id, item in self._items.items()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def filter(self, news_items: List[NewsItem], asset_type: str) -> List[NewsItem]:
+        """
+        将一批新闻加入索引，并去掉该资产下的重复报道
+
+        Args:
+            news_items: 新闻项列表
+            asset_type: 资产类型
+
+        Returns:
+            List[NewsItem]: 去重后的新闻项
+        """
+        kept = [item for item in news_items if self.add(item, asset_type)[1]]
+        if len(kept) < len(news_items):
+            logger.info(f"{asset_type} 去掉 {len(news_items) - len(kept)} 条重复报道")
+        return kept
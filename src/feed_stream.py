@@ -0,0 +1,201 @@
+"""
+流式解析模块 - 从响应字节流中增量解析NEWS_SENTIMENT的feed数组
+"""
+
+import re
+import json
+import time
+import codecs
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+# 每次从响应或文件读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(" \t\n\r,]}")
+
+# 解析到feed数组开头时产生的标记
+_FEED_START = object()
+
+
+def iter_file_chunks(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """按块读取文件"""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class FeedStreamParser:
+    """
+    feed数组流式解析器
+
+    逐块读取响应体，顶层对象中除feed以外的字段解析后放入meta，
+    feed数组中的条目每解析完一条就产出一条，内存占用只与单条新闻和块大小相关。
+    可选地把读到的原始字节原样写入spool文件，不需要再次序列化。
+    """
+
+    def __init__(self, chunks: Iterable[bytes], spool: Optional[BinaryIO] = None,
+                 on_close: Optional[Callable[["FeedStreamParser"], None]] = None,
+                 closers: Optional[List[Callable[[], None]]] = None):
+        """
+        Args:
+            chunks: 响应体字节块
+            spool: 原始字节的落盘文件，解析结束后由close关闭
+            on_close: close时调用的回调，可根据complete决定是否保留spool文件
+            closers: close时依次调用的清理函数，如关闭响应或文件
+        """
+        self._chunks = iter(chunks)
+        self._spool = spool
+        self._on_close = on_close
+        self._closers = closers or []
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._closed = False
+        self._primed: Optional[bool] = None
+        self._events = self._parse()
+
+        self.meta: Dict[str, Any] = {}
+        self.has_feed = False
+        self.count = 0
+        self.bytes_read = 0
+        # 等待下一块字节和写入spool文件的累计耗时（秒），其余时间用于解析
+        self.read_seconds = 0.0
+        self.spool_seconds = 0.0
+        # 响应体是否已完整读取并解析
+        self.complete = False
+
+    def _fill(self) -> bool:
+        """读取下一块，流结束时返回False"""
+        if self._eof:
+            return False
+        start = time.perf_counter()
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buffer += self._decoder.decode(b"", final=True)
+            return False
+        finally:
+            self.read_seconds += time.perf_counter() - start
+        if self._spool is not None:
+            start = time.perf_counter()
+            self._spool.write(chunk)
+            self.spool_seconds += time.perf_counter() - start
+        self.bytes_read += len(chunk)
+        # 丢弃已解析的部分，避免缓冲区随响应体增长
+        if self._pos > CHUNK_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _skip_whitespace(self) -> bool:
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return True
+            if not self._fill():
+                return False
+
+    def _expect(self, chars: str) -> str:
+        if not self._skip_whitespace():
+            raise ValueError(f"响应不完整，期望 {chars!r}")
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise ValueError(f"无效的JSON，位置 {self.bytes_read}，期望 {chars!r}，实际为 {char!r}")
+        self._pos += 1
+        return char
+
+    def _decode_value(self) -> Any:
+        """解析下一个完整的JSON值，缓冲区中的内容不完整时继续读取"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+                # 数字等标量在缓冲区末尾可能还没读完，只有后面紧跟分隔符时才算完整
+                if self._eof or (end < len(self._buffer) and self._buffer[end] in _DELIMITERS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def _parse(self) -> Iterator[Any]:
+        self._expect("{")
+        self._skip_whitespace()
+        if self._buffer[self._pos:self._pos + 1] == "}":
+            self._pos += 1
+        else:
+            while True:
+                key = self._decode_value()
+                self._expect(":")
+                if key == "feed":
+                    self._expect("[")
+                    self.has_feed = True
+                    yield _FEED_START
+                    self._skip_whitespace()
+                    if self._buffer[self._pos:self._pos + 1] == "]":
+                        self._pos += 1
+                    else:
+                        while True:
+                            value = self._decode_value()
+                            self.count += 1
+                            yield value
+                            if self._expect(",]") == "]":
+                                break
+                else:
+                    self.meta[key] = self._decode_value()
+                if self._expect(",}") == "}":
+                    break
+
+        # 读完剩余字节，保证spool文件完整
+        while self._fill():
+            pass
+        self.complete = True
+
+    def prime(self) -> bool:
+        """
+        解析到feed数组开头或响应结束
+
+        Returns:
+            bool: 响应中是否包含feed；为False时meta即为完整的响应内容
+        """
+        if self._primed is None:
+            self._primed = False
+            for event in self._events:
+                if event is _FEED_START:
+                    self._primed = True
+                    break
+        return self._primed
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """依次产出feed中的条目，迭代结束后自动关闭"""
+        try:
+            if self.prime():
+                yield from self._events
+        finally:
+            self.close()
+
+    def close(self):
+        """关闭底层资源，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        for closer in self._closers:
+            closer()
+        if self._spool is not None:
+            self._spool.close()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def __enter__(self) -> "FeedStreamParser":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
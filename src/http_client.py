@@ -0,0 +1,229 @@
+"""
+HTTP客户端模块 - 提供带连接池、超时和熔断的可复用请求客户端
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import API_CONFIG, SYSTEM_CONFIG
+
+logger = logging.getLogger("news_fetcher.http_client")
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态时抛出的异常"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败次数达到阈值后进入打开状态，在reset_timeout秒内直接拒绝请求；
+    冷却结束后进入半开状态，放行一次试探请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """是否允许发送请求；半开状态下只放行第一个请求作为试探，结果记录之前其他请求仍被拒绝"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """试探请求没有得到结果（如请求参数错误）时放弃本次试探，下一个请求可以重新试探"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        """记录一次成功请求"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败请求"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"连续失败 {self._failures} 次，熔断器打开 {self.reset_timeout} 秒")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    可复用的HTTP客户端
+
+    基于requests.Session维护keep-alive连接池，默认启用gzip压缩和连接/读取超时，
+    并通过熔断器避免在上游持续故障时反复阻塞。可以注入base_url指向本地桩服务器。
+    """
+
+    def __init__(self, base_url: str = "", timeout: Optional[float] = None,
+                 connect_timeout: Optional[float] = None, pool_size: Optional[int] = None,
+                 failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None,
+                 session: Optional[requests.Session] = None):
+        """
+        初始化客户端
+
+        Args:
+            base_url: 基础URL，相对路径的请求会拼接在其后
+            timeout: 读取超时（秒），默认使用SYSTEM_CONFIG中的news_timeout
+            connect_timeout: 连接超时（秒），默认使用SYSTEM_CONFIG中的connect_timeout
+            pool_size: 每个主机的连接池大小
+            failure_threshold: 熔断器的连续失败阈值
+            reset_timeout: 熔断器打开后的冷却时间（秒）
+            session: 自定义的requests.Session，如果为None则创建新的
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else SYSTEM_CONFIG.get("connect_timeout", 5),
+            timeout if timeout is not None else SYSTEM_CONFIG.get("news_timeout", 30),
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold if failure_threshold is not None else SYSTEM_CONFIG.get("circuit_failure_threshold", 5),
+            reset_timeout if reset_timeout is not None else SYSTEM_CONFIG.get("circuit_reset_timeout", 60),
+        )
+
+        if pool_size is None:
+            pool_size = SYSTEM_CONFIG.get("http_pool_size", 10)
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def resolve(self, url: str) -> str:
+        """将相对路径解析为完整URL"""
+        if url.startswith(("http://", "https://")) or not self.base_url:
+            return url
+        return f"{self.base_url}/{url.lstrip('/')}"
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求
+
+        Args:
+            method: HTTP方法
+            url: 完整URL或相对于base_url的路径
+            **kwargs: 传递给requests的其他参数
+
+        Returns:
+            requests.Response: 响应对象
+
+        Raises:
+            CircuitOpenError: 熔断器处于打开状态
+            requests.RequestException: 网络错误或超时
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"熔断器已打开，暂停请求: {self.resolve(url)}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, self.resolve(url), **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        # 服务端错误计入熔断，客户端错误不计入
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        """发送GET请求"""
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, json: Optional[Any] = None, **kwargs) -> requests.Response:
+        """发送POST请求"""
+        return self.request("POST", url, json=json, **kwargs)
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """
+    获取进程内共享的Alpha Vantage客户端
+
+    Returns:
+        HttpClient: 指向Alpha Vantage的默认客户端
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(base_url=API_CONFIG["alpha_vantage_base_url"])
+        return _default_client
+
+
+def set_default_client(client: Optional[HttpClient]):
+    """
+    替换默认客户端，例如在测试中指向本地桩服务器
+
+    Args:
+        client: 新的默认客户端，为None时在下次获取时重新创建
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
@@ -0,0 +1,149 @@
+"""
+关键词匹配模块 - 用一个编译好的多模式匹配器把新闻分配到各个资产
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import ASSET_CONFIG
+from src.models import NewsItem
+
+
+def _build_trie(keywords: Iterable[str]) -> Dict[str, dict]:
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return trie
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """
+    把前缀树转换为正则表达式
+
+    共享前缀只展开一次（例如"crude oil"和"crypto"共享"cr"），
+    正则引擎在每个位置只需沿前缀树走一遍，效果与Aho-Corasick自动机相当。
+    """
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not alternatives:
+        return ""
+    terminal = "" in node
+    if len(alternatives) == 1 and not terminal:
+        return alternatives[0]
+    # 贪婪的"?"优先尝试更长的关键词，词边界不满足时再回退到较短的关键词
+    return "(?:" + "|".join(alternatives) + ")" + ("?" if terminal else "")
+
+
+class KeywordMatcher:
+    """
+    多资产关键词匹配器
+
+    把所有资产的关键词合并编译成一个按前缀树组织的正则表达式，
+    对标题和摘要只扫描一遍，就能统计每个资产的关键词命中次数。
+    关键词两侧要求为非字母数字字符，避免"oil"匹配到"toil"之类的单词。
+    """
+
+    def __init__(self, keyword_map: Dict[str, Iterable[str]]):
+        """
+        Args:
+            keyword_map: 资产类型到关键词列表的映射
+        """
+        self.keyword_assets: Dict[str, Set[str]] = {}
+        for asset_type, keywords in keyword_map.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    self.keyword_assets.setdefault(keyword, set()).add(asset_type)
+
+        self._keyword_assets = {keyword: tuple(sorted(assets)) for keyword, assets in self.keyword_assets.items()}
+        self.asset_types = list(keyword_map.keys())
+        pattern = _trie_pattern(_build_trie(self.keyword_assets))
+        self.regex = re.compile(rf"(?<![a-z0-9])(?:{pattern})(?![a-z0-9])")
+
+    @classmethod
+    def from_asset_config(cls, asset_config: Optional[Dict[str, Dict]] = None) -> "KeywordMatcher":
+        """
+        根据ASSET_CONFIG中的关键词创建匹配器
+
+        Args:
+            asset_config: 资产配置，默认使用ASSET_CONFIG
+
+        Returns:
+            KeywordMatcher: 匹配器
+        """
+        asset_config = asset_config or ASSET_CONFIG
+        return cls({
+            asset_type: asset_conf["keywords"].split(",")
+            for asset_type, asset_conf in asset_config.items()
+        })
+
+    def match(self, text: str) -> Counter:
+        """
+        统计文本中每个资产的关键词命中次数
+
+        Args:
+            text: 待匹配的文本
+
+        Returns:
+            Counter: 资产类型到命中次数的映射
+        """
+        hits: Counter = Counter()
+        keyword_assets = self._keyword_assets
+        # 先按关键词计数（C实现），再展开到资产，重复出现的关键词只查一次映射
+        for keyword, count in Counter(self.regex.findall(text.lower())).items():
+            for asset_type in keyword_assets[keyword]:
+                hits[asset_type] += count
+        return hits
+
+    def match_item(self, item: NewsItem) -> Counter:
+        """统计新闻标题和摘要中每个资产的关键词命中次数"""
+        return self.match(f"{item.title}\n{item.content}")
+
+    def classify(self, news_items: Iterable[NewsItem], min_hits: int = 1,
+                 asset_types: Optional[List[str]] = None) -> Dict[str, List[NewsItem]]:
+        """
+        把新闻分配到各个资产
+
+        Args:
+            news_items: 新闻项
+            min_hits: 分配到某个资产所需的最少命中次数
+            asset_types: 只分配到这些资产，默认全部资产
+
+        Returns:
+            Dict[str, List[NewsItem]]: 资产类型到新闻项列表的映射，一条新闻可以属于多个资产
+        """
+        asset_types = asset_types or self.asset_types
+        result: Dict[str, List[NewsItem]] = {asset_type: [] for asset_type in asset_types}
+        for item in news_items:
+            for asset_type, count in self.match_item(item).items():
+                if count >= min_hits and asset_type in result:
+                    result[asset_type].append(item)
+        return result
+
+
+_default_matcher: Optional[KeywordMatcher] = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_default_matcher() -> KeywordMatcher:
+    """
+    获取进程内共享的关键词匹配器
+
+    Returns:
+        KeywordMatcher: 根据ASSET_CONFIG创建的匹配器
+    """
+    global _default_matcher
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            _default_matcher = KeywordMatcher.from_asset_config()
+        return _default_matcher
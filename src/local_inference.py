@@ -0,0 +1,401 @@
+"""
+本地推理模块 - 用transformers在本机运行finGPT_params中的模型为新闻评分
+
+按token预算截断正文，把长度相近的新闻分到同一批次以减少填充，支持纯CPU环境。
+torch和transformers是可选依赖，只在加载模型时需要。
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import MODEL_CONFIG, SYSTEM_CONFIG
+from src.models import NewsItem, NewsScore
+from src.ollama_client import PROMPT_TEMPLATE, PROMPT_VERSION, OllamaScorer, ScoreParseError, parse_score_response
+from src.score_cache import ScoreCache, get_default_score_cache, score_key
+
+try:
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+except ImportError:
+    torch = None
+
+logger = logging.getLogger("news_fetcher.local_inference")
+
+# 提示词模板中标题和正文的占位标记，渲染后按标记切分出固定文本段
+_TITLE_MARK = "\x00TITLE\x00"
+_CONTENT_MARK = "\x00CONTENT\x00"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def transformers_available() -> bool:
+    """是否安装了torch和transformers"""
+    return torch is not None
+
+
+def compact_text(text: str) -> str:
+    """合并连续空白，去掉首尾空白，减少被浪费的token"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def content_budget(max_length: int, max_new_tokens: int, overhead: int, title_tokens: int) -> int:
+    """
+    计算正文可用的token数
+
+    Args:
+        max_length: 模型上下文长度
+        max_new_tokens: 生成的最大token数
+        overhead: 提示词固定部分的token数
+        title_tokens: 标题的token数
+
+    Returns:
+        int: 正文token预算，不小于0
+    """
+    return max(0, max_length - max_new_tokens - overhead - title_tokens)
+
+
+def plan_batches(lengths: Sequence[int], batch_size: int,
+                 max_batch_tokens: Optional[int] = None) -> List[List[int]]:
+    """
+    按长度分桶组成批次
+
+    按长度排序后依次装批，同一批次内的长度相近，填充到最长一条时浪费最少。
+    指定max_batch_tokens时，批次的条数乘以最长长度不超过该值，避免长文本批次占用过多内存。
+
+    Args:
+        lengths: 每条输入的token数
+        batch_size: 每批的最大条数
+        max_batch_tokens: 每批填充后的最大token数
+
+    Returns:
+        List[List[int]]: 每个批次包含的输入下标
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        # 按长度升序装批，新加入的一条就是批内最长的
+        padded = (len(current) + 1) * lengths[index]
+        if current and (len(current) >= batch_size or (max_batch_tokens and padded > max_batch_tokens)):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padding_efficiency(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> float:
+    """有效token数占填充后token总数的比例"""
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches if batch)
+    return sum(lengths) / padded if padded else 1.0
+
+
+class LocalScorer:
+    """
+    本地模型评分器
+
+    与OllamaScorer接口相同。每条新闻只分词一次：提示词模板的固定部分在加载时分词，
+    标题和正文批量分词后直接拼接token，正文超出预算时保留开头（新闻导语信息最集中）。
+    拼好的输入按长度分桶成批，左侧填充后一起生成。
+    没有GPU时使用fp32，可选动态int8量化，并按num_threads设置CPU线程数。
+    """
+
+    def __init__(self, model_path: Optional[str] = None, batch_size: Optional[int] = None,
+                 max_length: Optional[int] = None, max_new_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None, precision: Optional[str] = None,
+                 num_threads: Optional[int] = None, int8_dynamic: Optional[bool] = None,
+                 cache: Optional[ScoreCache] = None, use_cache: bool = True):
+        """
+        Args:
+            model_path: 模型路径或Hugging Face模型名，默认使用finGPT_params中的model_path
+            batch_size: 每批的最大条数，默认使用SYSTEM_CONFIG中的batch_size
+            max_length: 上下文长度（提示词加生成），默认使用finGPT_params中的max_length
+            max_new_tokens: 生成的最大token数，默认使用finGPT_params中的max_new_tokens
+            temperature: 采样温度，默认使用finGPT_params中的temperature，0表示贪婪解码
+            precision: auto、fp16、bf16或fp32，默认使用finGPT_params中的precision
+            num_threads: CPU推理线程数，0表示使用全部CPU核心
+            int8_dynamic: 是否在CPU上做动态int8量化
+            cache: 评分缓存，如果为None则使用默认缓存
+            use_cache: 是否使用评分缓存
+        """
+        params = MODEL_CONFIG["finGPT_params"]
+        self.model_path = model_path or params["model_path"]
+        self.batch_size = max(1, batch_size or SYSTEM_CONFIG.get("batch_size", 8))
+        self.max_length = max_length or params.get("max_length", 512)
+        self.max_new_tokens = max_new_tokens or params.get("max_new_tokens", 128)
+        self.temperature = temperature if temperature is not None else params.get("temperature", 0.2)
+        self.precision = precision or params.get("precision", "auto")
+        self.num_threads = num_threads if num_threads is not None else params.get("num_threads", 0)
+        self.int8_dynamic = int8_dynamic if int8_dynamic is not None else params.get("int8_dynamic", False)
+        # 截断预算随上下文长度变化，评分结果也随之变化，因此缓存中的模型名包含上下文长度
+        self.model = f"{self.model_path}@{self.max_length}"
+        if not use_cache:
+            self.cache = None
+        else:
+            self.cache = cache if cache is not None else get_default_score_cache()
+
+        self.tokenizer = None
+        self.llm = None
+        self.device = "cpu"
+        self._segments: Tuple[List[int], List[int], List[int]] = ([], [], [])
+        self._load_lock = threading.Lock()
+        # 推理在同一个模型上串行进行，并行由torch的算子线程完成
+        self._infer_lock = threading.Lock()
+
+        self.items = 0
+        self.failures = 0
+        self.parse_errors = 0
+        self.truncated = 0
+        self.batches = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.generate_time = 0.0
+
+    def _resolve_dtype(self):
+        precision = self.precision.lower()
+        if self.device == "cuda":
+            return {"fp32": torch.float32, "bf16": torch.bfloat16}.get(precision, torch.float16)
+        if precision == "bf16":
+            return torch.bfloat16
+        if precision == "fp16":
+            logger.warning("没有可用的GPU，fp16在CPU上很慢，改用fp32")
+        return torch.float32
+
+    def load(self):
+        """加载分词器和模型，重复调用不会重复加载"""
+        with self._load_lock:
+            if self.llm is not None:
+                return
+            if torch is None:
+                raise ImportError("本地推理需要安装torch和transformers: pip install torch transformers")
+
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            if self.device == "cpu":
+                torch.set_num_threads(self.num_threads or os.cpu_count() or 1)
+            dtype = self._resolve_dtype()
+            logger.info(f"加载本地模型 {self.model_path}（{self.device}，{dtype}）...")
+            start = time.perf_counter()
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+            # 生成时各条输入的末尾对齐，需要在左侧填充
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token_id is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            model = AutoModelForCausalLM.from_pretrained(self.model_path, torch_dtype=dtype)
+            model.to(self.device)
+            model.eval()
+            if self.int8_dynamic:
+                if self.device == "cpu" and dtype == torch.float32:
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                    logger.info("已对线性层做动态int8量化")
+                else:
+                    logger.warning("动态int8量化只支持CPU上的fp32模型，已跳过")
+
+            self.tokenizer = tokenizer
+            self._segments = self._template_segments()
+            self.llm = model
+            logger.info(f"本地模型加载完成，耗时 {time.perf_counter() - start:.1f} 秒，"
+                        f"提示词固定部分 {self.overhead} 个token")
+
+    def _template_segments(self) -> Tuple[List[int], List[int], List[int]]:
+        """把提示词模板（含对话模板）切分为标题前、标题与正文之间、正文后三段并分词"""
+        text = PROMPT_TEMPLATE.format(title=_TITLE_MARK, content=_CONTENT_MARK)
+        if getattr(self.tokenizer, "chat_template", None):
+            text = self.tokenizer.apply_chat_template(
+                [{"role": "user", "content": text}], tokenize=False, add_generation_prompt=True
+            )
+        bos = self.tokenizer.bos_token
+        if bos and not text.startswith(bos):
+            text = bos + text
+        prefix, rest = text.split(_TITLE_MARK)
+        middle, suffix = rest.split(_CONTENT_MARK)
+        encode = lambda segment: self.tokenizer(segment, add_special_tokens=False)["input_ids"]
+        return encode(prefix), encode(middle), encode(suffix)
+
+    @property
+    def overhead(self) -> int:
+        """提示词固定部分的token数"""
+        return sum(len(segment) for segment in self._segments)
+
+    def encode(self, news_items: Sequence[NewsItem]) -> List[List[int]]:
+        """
+        把新闻编码为按预算截断后的输入token
+
+        Args:
+            news_items: 新闻项
+
+        Returns:
+            List[List[int]]: 每条新闻的输入token
+        """
+        self.load()
+        titles = self.tokenizer([compact_text(item.title) for item in news_items],
+                                add_special_tokens=False)["input_ids"]
+        contents = self.tokenizer([compact_text(item.content) for item in news_items],
+                                  add_special_tokens=False)["input_ids"]
+        prefix, middle, suffix = self._segments
+        # 标题本身超长时也要截断，至少给正文留出一半空间
+        title_limit = max(0, self.max_length - self.max_new_tokens - self.overhead) // 2
+        encoded = []
+        for title_ids, content_ids in zip(titles, contents):
+            title_ids = title_ids[:title_limit]
+            budget = content_budget(self.max_length, self.max_new_tokens, self.overhead, len(title_ids))
+            if len(content_ids) > budget:
+                content_ids = content_ids[:budget]
+                self.truncated += 1
+            encoded.append(prefix + title_ids + middle + content_ids + suffix)
+        return encoded
+
+    def _generate(self, batch_ids: List[List[int]]) -> List[str]:
+        longest = max(len(ids) for ids in batch_ids)
+        pad_id = self.tokenizer.pad_token_id
+        input_ids = [[pad_id] * (longest - len(ids)) + ids for ids in batch_ids]
+        attention_mask = [[0] * (longest - len(ids)) + [1] * len(ids) for ids in batch_ids]
+        inputs = {
+            "input_ids": torch.tensor(input_ids, device=self.device),
+            "attention_mask": torch.tensor(attention_mask, device=self.device),
+        }
+        sampling = {"do_sample": True, "temperature": self.temperature} if self.temperature > 0 else {"do_sample": False}
+        with torch.inference_mode():
+            output = self.llm.generate(**inputs, max_new_tokens=self.max_new_tokens,
+                                       pad_token_id=pad_id, **sampling)
+        return self.tokenizer.batch_decode(output[:, longest:], skip_special_tokens=True)
+
+    def _infer(self, news_items: Sequence[NewsItem], deadline: Optional[float] = None) -> List[Optional[NewsScore]]:
+        """对新闻分批推理，不经过缓存"""
+        with self._infer_lock:
+            return self._infer_locked(news_items, deadline)
+
+    def _infer_locked(self, news_items: Sequence[NewsItem],
+                      deadline: Optional[float] = None) -> List[Optional[NewsScore]]:
+        encoded = self.encode(news_items)
+        lengths = [len(ids) for ids in encoded]
+        batches = plan_batches(lengths, self.batch_size)
+        results: List[Optional[NewsScore]] = [None] * len(news_items)
+
+        for batch in batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"已到截止时间，剩余 {sum(1 for r in results if r is None)} 条新闻未评分")
+                break
+            start = time.perf_counter()
+            try:
+                texts = self._generate([encoded[i] for i in batch])
+            except Exception as e:
+                self.failures += len(batch)
+                logger.warning(f"本地推理失败: {str(e)[:100]}")
+                continue
+            self.generate_time += time.perf_counter() - start
+            self.batches += 1
+            self.real_tokens += sum(lengths[i] for i in batch)
+            self.padded_tokens += len(batch) * max(lengths[i] for i in batch)
+
+            for index, text in zip(batch, texts):
+                try:
+                    results[index] = parse_score_response(text, news_items[index].title)
+                except ScoreParseError as e:
+                    self.parse_errors += 1
+                    logger.warning(f"无法解析评分: {str(e)}")
+        self.items += len(news_items)
+        return results
+
+    def cache_key(self, item: NewsItem) -> str:
+        """新闻在当前模型、上下文长度、提示词、温度、最大生成token数和推理精度下的评分缓存键"""
+        return score_key(item, self.model, PROMPT_VERSION, self.temperature, {
+            "max_new_tokens": self.max_new_tokens,
+            "precision": self.precision,
+            "int8_dynamic": self.int8_dynamic,
+        })
+
+    def score(self, item: NewsItem, deadline: Optional[float] = None) -> Optional[NewsScore]:
+        """为单条新闻评分"""
+        return self.score_batch([item], deadline)[0]
+
+    def score_batch(self, news_items: Sequence[NewsItem],
+                    deadline: Optional[float] = None) -> List[Optional[NewsScore]]:
+        """
+        为一批新闻评分
+
+        Args:
+            news_items: 新闻项
+            deadline: 截止时间（time.monotonic()），到期后剩余批次不再推理
+
+        Returns:
+            List[Optional[NewsScore]]: 与news_items一一对应的评分，失败的位置为None
+        """
+        if not news_items:
+            return []
+        keys = [self.cache_key(item) for item in news_items]
+        if self.cache is not None:
+            results = self.cache.get_many(keys, [item.title for item in news_items])
+        else:
+            results = [None] * len(news_items)
+
+        pending: Dict[str, List[int]] = {}
+        for index, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                pending.setdefault(key, []).append(index)
+        if not pending:
+            return results
+
+        scores = self._infer([news_items[indices[0]] for indices in pending.values()], deadline)
+        for (key, indices), score in zip(pending.items(), scores):
+            if score is None:
+                continue
+            for index in indices:
+                results[index] = NewsScore(news_items[index].title, score.sentiment_score, score.impact_score,
+                                           score.relevance_score, score.summary)
+        if self.cache is not None:
+            self.cache.put_many(
+                ((key, score) for key, score in zip(pending, scores) if score is not None),
+                self.model, PROMPT_VERSION,
+            )
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """推理统计"""
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "failures": self.failures,
+            "parse_errors": self.parse_errors,
+            "truncated": self.truncated,
+            "padding_efficiency": self.real_tokens / self.padded_tokens if self.padded_tokens else 1.0,
+            "prompt_tokens_per_second": self.real_tokens / self.generate_time if self.generate_time else 0.0,
+        }
+
+    def close(self):
+        """释放模型"""
+        self.llm = None
+        self.tokenizer = None
+
+    def __enter__(self) -> "LocalScorer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def create_scorer(use_cache: bool = True):
+    """
+    根据MODEL_CONFIG创建评分器
+
+    use_ollama为True时使用Ollama服务，否则在本机加载finGPT_params中的模型。
+
+    Args:
+        use_cache: 是否使用评分缓存
+
+    Returns:
+        OllamaScorer或LocalScorer
+    """
+    if MODEL_CONFIG.get("use_ollama", True):
+        return OllamaScorer(use_cache=use_cache)
+    return LocalScorer(use_cache=use_cache)
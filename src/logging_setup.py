@@ -0,0 +1,174 @@
+"""
+日志模块 - 只配置一次的news_fetcher日志：日志文件在后台线程写入并按日期切换，可选JSON格式
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import LOGGING_CONFIG
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord自带的属性，其余属性来自extra参数，JSON格式中原样输出
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，extra参数中的字段一并输出"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DailyFileHandler(logging.FileHandler):
+    """写入log_dir/<prefix>_<YYYYMMDD>.log，跨过零点后自动切换到新一天的文件，常驻进程同样按天分文件"""
+
+    def __init__(self, log_dir: str, prefix: str = "news_fetcher"):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self._next_day = 0.0
+        super().__init__(self._path_for(time.time()), encoding="utf-8", delay=True)
+
+    def _path_for(self, timestamp: float) -> str:
+        day = datetime.fromtimestamp(timestamp)
+        self._next_day = datetime(day.year, day.month, day.day).timestamp() + timedelta(days=1).total_seconds()
+        return os.path.abspath(os.path.join(self.log_dir, f"{self.prefix}_{day.strftime('%Y%m%d')}.log"))
+
+    def emit(self, record: logging.LogRecord):
+        if record.created >= self._next_day:
+            self.close()
+            self.baseFilename = self._path_for(record.created)
+        super().emit(record)
+
+
+_lock = threading.Lock()
+_console_handler: Optional[logging.Handler] = None
+_queue_handler: Optional[logging.Handler] = None
+_file_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured_key: Optional[tuple] = None
+_atexit_registered = False
+
+
+def _level(value: Any) -> int:
+    return value if isinstance(value, int) else logging.getLevelName(str(value).upper())
+
+
+def setup_logging(log_dir: Optional[str] = None, console_level: Optional[Any] = None,
+                  json_format: Optional[bool] = None) -> logging.Logger:
+    """
+    设置日志，可以重复调用
+
+    第一次调用时为news_fetcher日志记录器添加一个控制台处理器和一个日志文件处理器，之后的调用直接返回同一个记录器，
+    不会重复添加处理器（只有日志目录或格式变化时才重新配置）。开启队列时记录器上只有一个QueueHandler，
+    调用线程只把记录放进队列，日志文件由后台的QueueListener写入；控制台仍然同步输出，保持与print的先后顺序。
+
+    Args:
+        log_dir: 日志目录，默认使用LOGGING_CONFIG中的log_dir
+        console_level: 控制台的最低级别，如"INFO"；为None时首次配置使用LOGGING_CONFIG，之后保持不变
+        json_format: 日志文件是否使用每行一个JSON对象的格式，默认使用LOGGING_CONFIG中的format
+
+    Returns:
+        logging.Logger: 日志记录器
+    """
+    global _console_handler, _queue_handler, _file_handler, _listener, _configured_key, _atexit_registered
+
+    log_dir = log_dir or LOGGING_CONFIG["log_dir"]
+    if json_format is None:
+        json_format = LOGGING_CONFIG["format"] == "json"
+    logger = logging.getLogger("news_fetcher")
+
+    with _lock:
+        key = (os.path.abspath(log_dir), json_format)
+        if _configured_key != key:
+            _shutdown_locked()
+            os.makedirs(log_dir, exist_ok=True)
+            logger.setLevel(_level(LOGGING_CONFIG["level"]))
+
+            _file_handler = DailyFileHandler(log_dir)
+            _file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+            _console_handler = logging.StreamHandler(sys.stdout)
+            _console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+            _console_handler.setLevel(_level(console_level or LOGGING_CONFIG["console_level"]))
+            logger.addHandler(_console_handler)
+
+            if LOGGING_CONFIG["queue"]:
+                log_queue = queue.SimpleQueue()
+                _queue_handler = logging.handlers.QueueHandler(log_queue)
+                _listener = logging.handlers.QueueListener(log_queue, _file_handler)
+                _listener.start()
+                logger.addHandler(_queue_handler)
+            else:
+                logger.addHandler(_file_handler)
+
+            _configured_key = key
+            if not _atexit_registered:
+                # 退出前写完队列中剩余的日志
+                atexit.register(shutdown_logging)
+                _atexit_registered = True
+        elif console_level is not None:
+            _console_handler.setLevel(_level(console_level))
+
+    return logger
+
+
+def echo(logger: logging.Logger, message: str, level: int = logging.INFO):
+    """
+    输出一条进度消息，控制台和日志文件中各只出现一次
+
+    控制台会显示该级别的日志时（如-v、常驻模式）只记录日志；否则用print输出到控制台，日志只写入文件。
+
+    Args:
+        logger: 日志记录器
+        message: 消息，开头的换行只在print时保留
+        level: 日志级别
+    """
+    console = _console_handler
+    if console is None or level < console.level:
+        print(message)
+    logger.log(level, message.lstrip("\n"))
+
+
+def _shutdown_locked():
+    global _console_handler, _queue_handler, _file_handler, _listener, _configured_key
+    logger = logging.getLogger("news_fetcher")
+    if _listener is not None:
+        _listener.stop()
+    for handler in (_queue_handler, _console_handler, _file_handler):
+        if handler is not None:
+            logger.removeHandler(handler)
+            handler.close()
+    _console_handler = _queue_handler = _file_handler = _listener = None
+    _configured_key = None
+
+
+def shutdown_logging():
+    """写完队列中的日志并移除处理器，之后再调用setup_logging会重新配置"""
+    with _lock:
+        _shutdown_locked()
@@ -0,0 +1,337 @@
+"""
+运行指标模块 - 计数器、计时器和直方图，导出为Prometheus/OpenMetrics文本文件和每次运行的JSON汇总
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import METRICS_CONFIG
+
+# 指标说明，导出时写入HELP行；名称不含命名空间前缀
+METRIC_HELP = {
+    "run_seconds": "整次运行的耗时（秒）",
+    "fetch_stream_seconds": "流式获取的耗时（秒）：下载、JSON解析和日期过滤交错进行",
+    "upstream_requests_total": "发到Alpha Vantage的请求数",
+    "upstream_response_seconds": "Alpha Vantage返回响应头的耗时（秒）",
+    "response_cache_requests_total": "响应缓存的查询次数",
+    "feed_bytes_total": "读取的响应体字节数",
+    "feed_read_seconds": "等待响应体字节的耗时（秒），来自网络或缓存文件",
+    "feed_spool_seconds": "把原始响应写入缓存或调试文件的耗时（秒）",
+    "feed_items_parsed_total": "从feed中解析出的条目数",
+    "feed_items_kept_total": "日期过滤后保留的新闻数",
+    "dedup_seconds": "去重的耗时（秒）",
+    "dedup_dropped_total": "去重丢弃的新闻数",
+    "serialize_seconds": "模型序列化和反序列化的耗时（秒）",
+    "file_write_seconds": "写入新闻、报告等文件的耗时（秒）",
+    "news_load_seconds": "读取已保存新闻的耗时（秒）",
+    "stage_seconds": "主程序各阶段的耗时（秒）",
+    "run_timestamp_seconds": "运行结束时的Unix时间戳",
+}
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """累积分桶直方图，额外记录最小值和最大值供JSON汇总使用"""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(上界, 不超过该上界的观测数)，最后一项为+Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float("inf"), self.count))
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+
+
+class _Timer:
+    """计时上下文，退出时把耗时记入直方图"""
+
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    """指标关闭时使用的空计时上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    进程内的指标注册表
+
+    计数器、仪表和直方图按名称和标签组合分别累计，首次使用时自动创建。
+    关闭时所有记录方法在检查enabled后立即返回，time()返回共享的空上下文，调用点不需要额外判断。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            config: 指标配置，默认使用METRICS_CONFIG
+            enabled: 是否记录，默认使用配置中的enabled
+        """
+        self.config = {**METRICS_CONFIG, **(config or {})}
+        self.enabled = self.config["enabled"] if enabled is None else enabled
+        self.namespace = self.config["namespace"]
+        self.buckets = sorted(float(bound) for bound in self.config["buckets"])
+        self.started = time.time()
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.info: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._gauges: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """计数器增加amount，名称应以_total结尾"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        """设置仪表的当前值"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """向直方图记录一个观测值，名称应带单位后缀，如_seconds"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def time(self, name: str, **labels):
+        """
+        计时上下文，退出时把耗时记入直方图name
+
+        Example:
+            with metrics.time("file_write_seconds", kind="report"):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def reset(self):
+        """清空已记录的指标，开始新的一次运行"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started = time.time()
+            self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        导出为文本格式
+
+        Args:
+            openmetrics: 为True时使用OpenMetrics格式（计数器族名不含_total，以# EOF结尾），
+                否则使用node_exporter文本文件收集器读取的Prometheus文本格式
+
+        Returns:
+            str: 指标文本
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = f"{self.namespace}_{name}"
+                family = full[:-len("_total")] if openmetrics and full.endswith("_total") else full
+                lines.append(f"# HELP {family} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {family} counter")
+                sample = full if full.endswith("_total") else f"{full}_total"
+                for key, value in sorted(series.items()):
+                    lines.append(f"{sample}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._gauges.items()):
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', _format_value(bound)))} {count}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        本次运行的JSON汇总
+
+        Returns:
+            Dict[str, Any]: 计数器和仪表的值，以及直方图的次数、总和、均值、最小值和最大值；
+            每个指标下按"标签=值,..."区分，没有标签时为空字符串
+        """
+        def label_text(key: Tuple[Tuple[str, str], ...]) -> str:
+            return ",".join(f"{name}={value}" for name, value in key)
+
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "finished": datetime.now().isoformat(timespec="seconds"),
+                "elapsed": time.time() - self.started,
+                "info": dict(self.info),
+                "counters": {name: {label_text(key): value for key, value in sorted(series.items())}
+                             for name, series in sorted(self._counters.items())},
+                "gauges": {name: {label_text(key): value for key, value in sorted(series.items())}
+                           for name, series in sorted(self._gauges.items())},
+                "histograms": {name: {label_text(key): histogram.summary() for key, histogram in sorted(series.items())}
+                               for name, series in sorted(self._histograms.items())},
+            }
+
+    def write(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        写入指标文本文件和本次运行的JSON汇总，均先写临时文件再替换
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (文本文件路径, JSON汇总路径)，关闭时均为None
+        """
+        if not self.enabled:
+            return None, None
+        self.set("run_timestamp_seconds", time.time())
+
+        textfile = self.config["textfile"]
+        if textfile:
+            os.makedirs(os.path.dirname(textfile) or ".", exist_ok=True)
+            tmp_path = f"{textfile}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render(self.config["format"] == "openmetrics"))
+            os.replace(tmp_path, textfile)
+
+        summary_path = None
+        summary_dir = self.config["summary_dir"]
+        if summary_dir:
+            os.makedirs(summary_dir, exist_ok=True)
+            summary_path = os.path.join(summary_dir, f"run_{self.run_id}_{os.getpid()}.json")
+            tmp_path = f"{summary_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, summary_path)
+
+        return textfile or None, summary_path
+
+
+_default_metrics: Optional[MetricsRegistry] = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_default_metrics() -> MetricsRegistry:
+    """
+    获取进程内共享的指标注册表
+
+    Returns:
+        MetricsRegistry: 使用METRICS_CONFIG配置的注册表，默认关闭
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = MetricsRegistry()
+        return _default_metrics
+
+
+def set_default_metrics(metrics: Optional[MetricsRegistry]):
+    """
+    替换默认注册表
+
+    Args:
+        metrics: 新的默认注册表，为None时在下次获取时重新创建
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        _default_metrics = metrics
@@ -0,0 +1,284 @@
+"""
+列式新闻批次 - 以数组列保存大量新闻，便于按时间筛选和向量化计算
+"""
+
+import os
+import sys
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入模型
+from src.models import NewsItem, NewsScore, default_summary, format_publish_time, parse_publish_time
+
+
+class TextColumn:
+    """
+    文本列
+
+    所有字符串以UTF-8拼接在一个bytes中，offsets记录每个字符串的起止位置，
+    省去每个str对象约50字节的头部开销，非ASCII文本也不会被按UCS-2/UCS-4展开。
+    """
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: bytes, offsets: np.ndarray):
+        """
+        Args:
+            data: 拼接后的UTF-8字节
+            offsets: 长度为n+1的int64数组，第i个字符串为data[offsets[i]:offsets[i+1]]
+        """
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "TextColumn":
+        """从字符串序列创建文本列"""
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        data = self.data
+        bounds = self.offsets.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            yield data[start:end].decode("utf-8")
+
+    def take(self, indices: np.ndarray) -> "TextColumn":
+        """按下标取出子列"""
+        return TextColumn.from_strings(self[i] for i in indices.tolist())
+
+    @property
+    def nbytes(self) -> int:
+        """占用的字节数"""
+        return len(self.data) + self.offsets.nbytes
+
+
+class NewsBatch:
+    """
+    列式新闻批次
+
+    发布时间、情感分数和评分保存为NumPy数组，来源按字典编码为整数，
+    文本字段保存为TextColumn。可以与NewsItem列表无损互相转换。
+    未评分的新闻评分列为NaN。
+
+    用于批量排名（ScoringEngine.rank_batch）和按时间筛选大量历史新闻；获取、存储、去重和报告使用带__slots__的NewsItem列表。
+    """
+
+    _TEXT_COLUMNS = ("title", "original_title", "content", "url", "summary")
+    _NUMERIC_COLUMNS = ("publish_ts", "alpha_sentiment", "source_codes", "original_is_title",
+                        "summary_is_default", "sentiment_score", "impact_score", "relevance_score")
+
+    def __init__(self, publish_ts: np.ndarray, alpha_sentiment: np.ndarray, source_codes: np.ndarray,
+                 sources: List[str], title: TextColumn, original_title: TextColumn,
+                 original_is_title: np.ndarray, content: TextColumn, url: TextColumn, summary: TextColumn,
+                 summary_is_default: np.ndarray, sentiment_score: Optional[np.ndarray] = None,
+                 impact_score: Optional[np.ndarray] = None, relevance_score: Optional[np.ndarray] = None):
+        """
+        Args:
+            publish_ts: 发布时间戳（int64），见parse_publish_time，无法解析时为0
+            alpha_sentiment: Alpha Vantage情感分数（float64）
+            source_codes: 来源编码，对应sources中的下标
+            sources: 来源字典
+            title: 标题
+            original_title: 原始标题，与标题相同时为空字符串
+            original_is_title: 原始标题是否与标题相同（bool）
+            content: 内容
+            url: 链接
+            summary: 摘要，与默认摘要相同时为空字符串
+            summary_is_default: 摘要是否与default_summary(content)相同（bool）
+            sentiment_score: 情感评分（float64），未评分为NaN
+            impact_score: 影响评分（float64），未评分为NaN
+            relevance_score: 相关性评分（float64），未评分为NaN
+        """
+        count = len(publish_ts)
+        self.publish_ts = publish_ts
+        self.alpha_sentiment = alpha_sentiment
+        self.source_codes = source_codes
+        self.sources = sources
+        self.title = title
+        self.original_title = original_title
+        self.original_is_title = original_is_title
+        self.content = content
+        self.url = url
+        self.summary = summary
+        self.summary_is_default = summary_is_default
+        self.sentiment_score = sentiment_score if sentiment_score is not None else np.full(count, np.nan)
+        self.impact_score = impact_score if impact_score is not None else np.full(count, np.nan)
+        self.relevance_score = relevance_score if relevance_score is not None else np.full(count, np.nan)
+
+    @classmethod
+    def from_items(cls, news_items: Sequence[NewsItem],
+                   scores: Optional[Sequence[Optional[NewsScore]]] = None) -> "NewsBatch":
+        """
+        从新闻项列表创建批次
+
+        Args:
+            news_items: NewsItem列表
+            scores: 与news_items一一对应的评分，未评分的位置为None
+
+        Returns:
+            NewsBatch: 新闻批次
+        """
+        count = len(news_items)
+        publish_ts = np.zeros(count, dtype=np.int64)
+        source_index = {}
+        codes = []
+        for i, item in enumerate(news_items):
+            publish_ts[i] = item.publish_ts
+            codes.append(source_index.setdefault(item.source, len(source_index)))
+
+        original_is_title = np.fromiter(
+            (item.original_title == item.title for item in news_items), dtype=bool, count=count
+        )
+        summaries = [item.summary for item in news_items]
+        summary_is_default = np.fromiter(
+            (bool(summary) and summary == default_summary(item.content) for item, summary in zip(news_items, summaries)),
+            dtype=bool, count=count
+        )
+        batch = cls(
+            publish_ts=publish_ts,
+            alpha_sentiment=np.fromiter((item.alpha_sentiment for item in news_items), dtype=np.float64, count=count),
+            source_codes=np.array(codes, dtype=np.uint16 if len(source_index) <= 0xFFFF else np.uint32),
+            sources=list(source_index),
+            title=TextColumn.from_strings(item.title for item in news_items),
+            original_title=TextColumn.from_strings(
+                "" if same else item.original_title for item, same in zip(news_items, original_is_title.tolist())
+            ),
+            original_is_title=original_is_title,
+            content=TextColumn.from_strings(item.content for item in news_items),
+            url=TextColumn.from_strings(item.url for item in news_items),
+            summary=TextColumn.from_strings(
+                "" if is_default else summary for summary, is_default in zip(summaries, summary_is_default.tolist())
+            ),
+            summary_is_default=summary_is_default,
+        )
+        if scores is not None:
+            batch.set_scores(scores)
+        return batch
+
+    def set_scores(self, scores: Sequence[Optional[NewsScore]]):
+        """
+        写入评分
+
+        Args:
+            scores: 与批次中的新闻一一对应的评分，未评分的位置为None
+        """
+        if len(scores) != len(self):
+            raise ValueError(f"评分数量 {len(scores)} 与新闻数量 {len(self)} 不一致")
+        for i, score in enumerate(scores):
+            if score is not None:
+                self.sentiment_score[i] = score.sentiment_score
+                self.impact_score[i] = score.impact_score
+                self.relevance_score[i] = score.relevance_score
+
+    def __len__(self) -> int:
+        return len(self.publish_ts)
+
+    def __getitem__(self, index: int) -> NewsItem:
+        return NewsItem(
+            title=self.title[index],
+            original_title=self.title[index] if self.original_is_title[index] else self.original_title[index],
+            content=self.content[index],
+            publish_time=self.publish_time(index),
+            source=self.sources[self.source_codes[index]],
+            url=self.url[index],
+            alpha_sentiment=float(self.alpha_sentiment[index]),
+            summary=default_summary(self.content[index]) if self.summary_is_default[index] else self.summary[index],
+        )
+
+    def publish_time(self, index: int) -> str:
+        """第index条新闻的发布时间，格式为YYYYMMDDTHHMMSS"""
+        publish_ts = int(self.publish_ts[index])
+        return format_publish_time(publish_ts) if publish_ts else ""
+
+    def to_items(self) -> List[NewsItem]:
+        """转换为NewsItem列表"""
+        sources = [self.sources[code] for code in self.source_codes.tolist()]
+        return [
+            NewsItem(title, title if same else original, content,
+                     format_publish_time(publish_ts) if publish_ts else "", source, url, sentiment,
+                     default_summary(content) if is_default else summary)
+            for title, original, same, content, publish_ts, source, url, sentiment, summary, is_default in zip(
+                self.title, self.original_title, self.original_is_title.tolist(), self.content,
+                self.publish_ts.tolist(), sources, self.url, self.alpha_sentiment.tolist(), self.summary,
+                self.summary_is_default.tolist()
+            )
+        ]
+
+    def to_scores(self) -> List[Optional[NewsScore]]:
+        """转换为NewsScore列表，未评分的位置为None"""
+        return [
+            None if np.isnan(sentiment) else NewsScore(title, sentiment, impact, relevance)
+            for title, sentiment, impact, relevance in zip(
+                self.title, self.sentiment_score.tolist(), self.impact_score.tolist(), self.relevance_score.tolist()
+            )
+        ]
+
+    def take(self, indices: np.ndarray) -> "NewsBatch":
+        """
+        按下标或布尔掩码取出子批次
+
+        Args:
+            indices: 下标数组或与批次等长的布尔数组
+
+        Returns:
+            NewsBatch: 子批次，来源字典与原批次共享
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return NewsBatch(
+            publish_ts=self.publish_ts[indices],
+            alpha_sentiment=self.alpha_sentiment[indices],
+            source_codes=self.source_codes[indices],
+            sources=self.sources,
+            title=self.title.take(indices),
+            original_title=self.original_title.take(indices),
+            original_is_title=self.original_is_title[indices],
+            content=self.content.take(indices),
+            url=self.url.take(indices),
+            summary=self.summary.take(indices),
+            summary_is_default=self.summary_is_default[indices],
+            sentiment_score=self.sentiment_score[indices],
+            impact_score=self.impact_score[indices],
+            relevance_score=self.relevance_score[indices],
+        )
+
+    def between(self, start: Union[str, int, None] = None, end: Union[str, int, None] = None) -> "NewsBatch":
+        """
+        按发布时间筛选
+
+        Args:
+            start: 起始时间（包含），YYYYMMDDTHHMMSS字符串或时间戳
+            end: 结束时间（包含），格式同start
+
+        Returns:
+            NewsBatch: 子批次
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.publish_ts >= (parse_publish_time(start) if isinstance(start, str) else start)
+        if end is not None:
+            mask &= self.publish_ts <= (parse_publish_time(end) if isinstance(end, str) else end)
+        return self.take(mask)
+
+    def sort_by_time(self) -> "NewsBatch":
+        """按发布时间排序（稳定排序）"""
+        return self.take(np.argsort(self.publish_ts, kind="stable"))
+
+    @property
+    def nbytes(self) -> int:
+        """数组和文本列占用的字节数（不含来源字典）"""
+        total = sum(getattr(self, name).nbytes for name in self._NUMERIC_COLUMNS)
+        return total + sum(getattr(self, name).nbytes for name in self._TEXT_COLUMNS)
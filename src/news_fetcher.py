@@ -5,68 +5,616 @@
 import os
 import sys
 import json
+import time
 import logging
-import requests
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 # 添加项目根目录到系统路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入配置和模型
-from config.config import API_CONFIG, ASSET_CONFIG
-from src.models import NewsItem
+from config.config import API_CONFIG, ASSET_CONFIG, CLASSIFIER_CONFIG, FETCH_CONFIG, STORAGE_CONFIG, SYSTEM_CONFIG
+from src.models import NewsItem, parse_publish_time
+from src.http_client import HttpClient, get_default_client
+from src.feed_stream import CHUNK_SIZE, FeedStreamParser, iter_file_chunks
+from src.rate_limiter import QuotaScheduler, get_default_scheduler
+from src.response_cache import ResponseCache, get_default_cache
+from src.watermarks import WatermarkStore, get_default_watermarks
+from src.news_store import get_default_store
+from src.dedup import DedupIndex
+from src.keyword_matcher import KeywordMatcher, get_default_matcher
+from src.synthetic import SyntheticNewsGenerator
+from src.metrics import get_default_metrics
+from src.profiling import Profiler, get_default_profiler, set_default_profiler
+from src.logging_setup import echo, setup_logging
 
 
-def setup_logging(log_dir: str = "logs") -> logging.Logger:
+def parse_asset_list(asset_arg: str) -> List[str]:
     """
-    设置日志
+    解析资产参数
     
     Args:
-        log_dir: 日志目录
+        asset_arg: 资产参数，可以是单个资产、逗号分隔的多个资产或all
         
     Returns:
-        logging.Logger: 日志记录器
+        List[str]: 去重后的资产类型列表，保持输入顺序
     """
-    # 创建日志目录
-    os.makedirs(log_dir, exist_ok=True)
+    if asset_arg.strip().lower() == "all":
+        return list(ASSET_CONFIG.keys())
     
-    # 配置日志
-    logger = logging.getLogger("news_fetcher")
-    logger.setLevel(logging.INFO)
+    asset_types = []
+    for asset_type in asset_arg.split(","):
+        asset_type = asset_type.strip().lower()
+        if asset_type and asset_type not in asset_types:
+            asset_types.append(asset_type)
+    return asset_types
+
+
+def build_news_params(asset_type: str, time_from: Optional[str] = None, time_to: Optional[str] = None,
+                      sort: str = "RELEVANCE", limit: int = 50) -> Dict[str, Any]:
+    """
+    构建NEWS_SENTIMENT请求参数
+    
+    Args:
+        asset_type: 资产类型
+        time_from: 时间窗口起点，格式为YYYYMMDDTHHMM
+        time_to: 时间窗口终点，格式为YYYYMMDDTHHMM
+        sort: 排序方式，RELEVANCE、LATEST或EARLIEST
+        limit: 返回的最大条数
+        
+    Returns:
+        Dict[str, Any]: 请求参数
+    """
+    params = {
+        "function": "NEWS_SENTIMENT",
+        "apikey": API_CONFIG["alpha_vantage_api_key"],
+        "keywords": ASSET_CONFIG[asset_type]["keywords"],
+        "sort": sort,
+        "limit": limit
+    }
+    if time_from:
+        params["time_from"] = time_from
+    if time_to:
+        params["time_to"] = time_to
+    return params
+
+
+def build_broad_params(time_from: Optional[str] = None, time_to: Optional[str] = None,
+                       sort: str = "LATEST", limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    构建不限定关键词的宽泛NEWS_SENTIMENT请求参数，由本地分类器把新闻分配到各资产
+
+    Args:
+        time_from: 时间窗口起点，格式为YYYYMMDDTHHMM
+        time_to: 时间窗口终点，格式为YYYYMMDDTHHMM
+        sort: 排序方式，RELEVANCE、LATEST或EARLIEST
+        limit: 返回的最大条数，如果为None则使用CLASSIFIER_CONFIG中的limit
+
+    Returns:
+        Dict[str, Any]: 请求参数
+    """
+    params = {
+        "function": "NEWS_SENTIMENT",
+        "apikey": API_CONFIG["alpha_vantage_api_key"],
+        "sort": sort,
+        "limit": limit or CLASSIFIER_CONFIG["limit"]
+    }
+    if CLASSIFIER_CONFIG.get("topics"):
+        params["topics"] = CLASSIFIER_CONFIG["topics"]
+    if time_from:
+        params["time_from"] = time_from
+    if time_to:
+        params["time_to"] = time_to
+    return params
+
+
+def day_window(target_date: str) -> Tuple[str, str]:
+    """
+    获取某一天的请求时间窗口
+    
+    Args:
+        target_date: 日期，格式为YYYYMMDD
+        
+    Returns:
+        Tuple[str, str]: (time_from, time_to)，格式为YYYYMMDDTHHMM
+    """
+    return f"{target_date}T0000", f"{target_date}T2359"
+
+
+def open_news_feed(params: Dict[str, Any], client: HttpClient, scheduler: QuotaScheduler,
+                   cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                   refresh: bool = False, spool_path: Optional[str] = None) -> Tuple[FeedStreamParser, bool]:
+    """
+    请求NEWS_SENTIMENT接口并返回流式解析器，优先使用缓存
+    
+    响应体边下载边解析，原始字节同时写入缓存（或spool_path），
+    完整读取后才替换到目标位置，中途失败不会留下不完整的文件。
+    
+    Args:
+        params: 请求参数
+        client: HTTP客户端
+        scheduler: 配额调度器
+        cache: 响应缓存
+        use_cache: 是否使用响应缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        spool_path: 不使用缓存时原始响应的保存路径，为None时不保存
+        
+    Returns:
+        Tuple[FeedStreamParser, bool]: (已解析到feed开头的解析器, 是否来自缓存)；
+        parser.has_feed为False时parser.meta为完整的响应内容
+        
+    Raises:
+        QuotaExceededError: 当日配额已用尽
+        RateLimitError: 重试后仍被限流
+    """
+    use_cache = use_cache and cache is not None
+    metrics = get_default_metrics()
+    
+    if use_cache and not refresh:
+        f = cache.open(params)
+        metrics.inc("response_cache_requests_total", result="miss" if f is None else "hit")
+        if f is not None:
+            parser = FeedStreamParser(iter_file_chunks(f), closers=[f.close])
+            try:
+                parser.prime()
+            except BaseException:
+                parser.close()
+                raise
+            return parser, True
+    
+    def open_feed():
+        start = time.perf_counter()
+        try:
+            response = client.get("/query", params=params, stream=True)
+        except Exception:
+            metrics.inc("upstream_requests_total", status="error")
+            raise
+        metrics.observe("upstream_response_seconds", time.perf_counter() - start)
+        metrics.inc("upstream_requests_total", status=response.status_code)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        
+        # 写入临时文件，只有包含feed且完整读取的响应才保留
+        if use_cache:
+            tmp_path = cache.spool_path(params)
+        elif spool_path:
+            os.makedirs(os.path.dirname(spool_path) or ".", exist_ok=True)
+            tmp_path = f"{spool_path}.{threading.get_ident()}.tmp"
+        else:
+            tmp_path = None
+        
+        def finish(parser: FeedStreamParser):
+            if tmp_path is None:
+                return
+            if parser.complete and parser.has_feed:
+                if use_cache:
+                    cache.commit(params, tmp_path)
+                else:
+                    os.replace(tmp_path, spool_path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        parser = FeedStreamParser(
+            response.iter_content(CHUNK_SIZE),
+            spool=open(tmp_path, "wb") if tmp_path else None,
+            on_close=finish,
+            closers=[response.close]
+        )
+        try:
+            has_feed = parser.prime()
+        except BaseException:
+            # 响应体不完整或不是JSON：关闭连接并删除临时文件，再交给调度器重试
+            parser.close()
+            raise
+        if has_feed:
+            return parser
+        # 没有feed的响应很小，交给调度器判断是否为限流提示
+        parser.close()
+        return parser.meta
+    
+    # 发送请求，限流或网络错误时由调度器退避重试
+    result = scheduler.call(open_feed)
+    if isinstance(result, FeedStreamParser):
+        return result, False
+    
+    # 不是限流提示但也没有feed，例如参数错误
+    parser = FeedStreamParser([json.dumps(result).encode("utf-8")])
+    parser.prime()
+    return parser, False
+
+
+def iter_feed_items(feed: Iterable[Dict[str, Any]], target_date: Optional[str] = None,
+                    logger: Optional[logging.Logger] = None) -> Iterator[NewsItem]:
+    """
+    将feed中的条目逐条转换为NewsItem
+    
+    Args:
+        feed: 响应中的feed条目，可以是列表或流式解析器
+        target_date: 只保留该日期（YYYYMMDD）发布的新闻，为None时全部保留
+        logger: 日志记录器
+        
+    Yields:
+        NewsItem: 新闻项
+    """
+    for item in feed:
+        # 解析发布时间
+        time_published = item.get("time_published", "")
+        if not time_published:
+            if logger is not None:
+                logger.warning(f"丢弃缺少time_published的新闻: {item.get('title', '')!r} {item.get('url', '')}")
+            continue
+        try:
+            # 格式：YYYYMMDDTHHMMSS，格式无效时抛出ValueError
+            parse_publish_time(time_published)
+            
+            # 只有日期的发布时间补全为当天零点，保证按字符串比较和排序时落在当天范围内
+            if len(time_published) == 8:
+                time_published = f"{time_published}T000000"
+            
+            # 检查新闻日期是否匹配目标日期
+            if target_date is None or time_published[:8] == target_date:
+                # 创建NewsItem
+                yield NewsItem(
+                    title=item.get("title", ""),
+                    original_title=item.get("title", ""),
+                    content=item.get("summary", ""),
+                    publish_time=time_published,
+                    source=item.get("source", ""),
+                    url=item.get("url", ""),
+                    alpha_sentiment=float(item.get("overall_sentiment_score", 0.0))
+                )
+        except Exception as e:
+            if logger is not None:
+                logger.error(
+                    f"解析time_published时出错，丢弃新闻 {item.get('title', '')!r} {item.get('url', '')}: {str(e)}"
+                )
+            continue
+
+
+def parse_feed_items(feed: Iterable[Dict[str, Any]], target_date: Optional[str] = None,
+                     logger: Optional[logging.Logger] = None) -> List[NewsItem]:
+    """
+    将feed中的条目转换为NewsItem
+    
+    Args:
+        feed: 响应中的feed列表
+        target_date: 只保留该日期（YYYYMMDD）发布的新闻，为None时全部保留
+        logger: 日志记录器
+        
+    Returns:
+        List[NewsItem]: 新闻项列表
+    """
+    return list(iter_feed_items(feed, target_date, logger))
+
+
+def use_news_store() -> bool:
+    """是否使用SQLite新闻库保存新闻，否则使用按天的JSON文件"""
+    return STORAGE_CONFIG.get("backend") == "sqlite"
+
+
+def news_file_path(asset_type: str, target_date: str) -> str:
+    """获取资产某一天的新闻数据文件路径"""
+    data_dir = os.path.join("data", ASSET_CONFIG[asset_type]["data_dir"])
+    return os.path.join(data_dir, f"{asset_type}_news_{target_date}.json")
+
+
+def has_saved_news(asset_type: str, target_date: str) -> bool:
+    """资产在某一天是否已有保存的新闻"""
+    if use_news_store():
+        return get_default_store().has_news(asset_type, target_date, target_date)
+    return os.path.exists(news_file_path(asset_type, target_date))
+
+
+def load_news_items(asset_type: str, target_date: str) -> List[NewsItem]:
+    """
+    读取已保存的新闻数据
+    
+    Args:
+        asset_type: 资产类型
+        target_date: 日期，格式为YYYYMMDD
+        
+    Returns:
+        List[NewsItem]: 新闻项列表，文件不存在时返回空列表
+    """
+    metrics = get_default_metrics()
+    if use_news_store():
+        with metrics.time("news_load_seconds", backend="sqlite"):
+            return get_default_store().query(asset_type, target_date, target_date)
+    
+    news_file = news_file_path(asset_type, target_date)
+    if not os.path.exists(news_file):
+        return []
+    with metrics.time("news_load_seconds", backend="json"):
+        with open(news_file, "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+        with metrics.time("serialize_seconds", model="NewsItem", op="from_dict"):
+            return [NewsItem.from_dict(data) for data in json_data]
+
+
+def save_news_items(asset_type: str, target_date: str, news_items: List[NewsItem],
+                    merge: bool = False) -> str:
+    """
+    保存新闻数据
+    
+    Args:
+        asset_type: 资产类型
+        target_date: 日期，格式为YYYYMMDD
+        news_items: 新闻项列表
+        merge: 是否与已有文件按URL合并，为False时覆盖；SQLite新闻库始终按URL合并
+        
+    Returns:
+        str: 新闻数据文件路径
+    """
+    metrics = get_default_metrics()
+    if use_news_store():
+        store = get_default_store()
+        with metrics.time("file_write_seconds", kind="news", backend="sqlite"):
+            store.upsert(asset_type, news_items)
+        return store.path
+    
+    news_file = news_file_path(asset_type, target_date)
+    os.makedirs(os.path.dirname(news_file), exist_ok=True)
+    
+    if merge:
+        merged = {item.url: item for item in load_news_items(asset_type, target_date)}
+        for item in news_items:
+            merged[item.url] = item
+        news_items = sorted(merged.values(), key=lambda item: item.publish_time)
+    
+    with metrics.time("file_write_seconds", kind="news", backend="json"):
+        with metrics.time("serialize_seconds", model="NewsItem", op="to_dict"):
+            json_data = [item.to_dict() for item in news_items]
+        with open(news_file, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, ensure_ascii=False, indent=2)
+    
+    return news_file
+
+
+def append_news_items(asset_type: str, target_date: str, news_items: List[NewsItem]) -> str:
+    """
+    将新闻追加到已有的日文件末尾
+    
+    只改写文件末尾的"]"，不重写已保存的内容，输出格式与save_news_items一致。
+    
+    Args:
+        asset_type: 资产类型
+        target_date: 日期，格式为YYYYMMDD
+        news_items: 新闻项列表，发布时间应晚于文件中已有的新闻
+        
+    Returns:
+        str: 新闻数据文件路径
+    """
+    if use_news_store():
+        return save_news_items(asset_type, target_date, news_items, merge=True)
+    
+    news_file = news_file_path(asset_type, target_date)
+    if not os.path.exists(news_file) or os.path.getsize(news_file) == 0:
+        return save_news_items(asset_type, target_date, news_items)
+    if not news_items:
+        return news_file
+    
+    with get_default_metrics().time("file_write_seconds", kind="news", backend="json"), open(news_file, "r+b") as f:
+        # 从文件末尾向前找到数组的结束符
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail_size = min(size, 64)
+        f.seek(size - tail_size)
+        tail = f.read(tail_size)
+        end = tail.rfind(b"]")
+        if end < 0:
+            raise ValueError(f"新闻数据文件格式不正确: {news_file}")
+        is_empty = tail[:end].rstrip().endswith(b"[")
+        
+        entries = [
+            textwrap.indent(json.dumps(item.to_dict(), ensure_ascii=False, indent=2), "  ")
+            for item in news_items
+        ]
+        chunk = ",\n".join(entries) + "\n]"
+        if is_empty:
+            # 空数组"[]"：从"["之后开始写
+            f.seek(size - tail_size + tail[:end].rstrip().rfind(b"[") + 1)
+            chunk = "\n" + chunk
+        else:
+            f.seek(size - tail_size + len(tail[:end].rstrip()))
+            chunk = ",\n" + chunk
+        f.write(chunk.encode("utf-8"))
+        f.truncate()
+    
+    return news_file
+
+
+def incremental_since(asset_type: str, target_date: str, watermarks: WatermarkStore) -> Optional[str]:
+    """
+    判断能否增量获取
+    
+    Args:
+        asset_type: 资产类型
+        target_date: 目标日期，格式为YYYYMMDD
+        watermarks: 高水位存储
+        
+    Returns:
+        Optional[str]: 高水位在目标日期当天且已有保存的新闻时返回高水位，否则返回None
+    """
+    since = watermarks.get(asset_type)
+    if since and since[:8] == target_date and has_saved_news(asset_type, target_date):
+        return since
+    return None
+
+
+def fetch_news_iter(asset_type: str, target_date: Optional[str] = None, logger: Optional[logging.Logger] = None,
+                    client: Optional[HttpClient] = None, scheduler: Optional[QuotaScheduler] = None,
+                    cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                    refresh: bool = False, time_from: Optional[str] = None,
+                    time_to: Optional[str] = None, sort: str = "EARLIEST",
+                    limit: Optional[int] = None) -> Iterator[NewsItem]:
+    """
+    流式获取特定资产类型的新闻
+    
+    从响应流中增量解析feed数组，每解析出一条新闻就产出一条，峰值内存与响应大小无关。
+    原始响应按收到的字节写入响应缓存；不使用缓存时写入资产数据目录下的
+    alpha_vantage_response_YYYYMMDD.json，便于调试。本函数不保存新闻，也不做去重。
+    
+    Args:
+        asset_type: 资产类型，如'oil', 'gold', 'stock', 'crypto', 'forex'
+        target_date: 目标日期，格式为YYYYMMDD，如果为None则使用当前日期
+        logger: 日志记录器，如果为None则创建新的
+        client: HTTP客户端，如果为None则使用共享的默认客户端
+        scheduler: 配额调度器，如果为None则使用共享的默认调度器
+        cache: 响应缓存，如果为None则使用共享的默认缓存
+        use_cache: 是否使用响应缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        time_from: 时间窗口起点，格式为YYYYMMDDTHHMM，默认为目标日期零点
+        time_to: 时间窗口终点，格式为YYYYMMDDTHHMM，默认为目标日期23:59
+        sort: 排序方式，RELEVANCE、LATEST或EARLIEST
+        limit: 返回的最大条数，如果为None则使用FETCH_CONFIG中的limit
+        
+    Yields:
+        NewsItem: 目标日期发布的新闻项
+        
+    Raises:
+        ValueError: 资产类型无效或响应中没有feed
+        QuotaExceededError: 当日配额已用尽
+        RateLimitError: 重试后仍被限流
+    """
+    if logger is None:
+        logger = setup_logging()
+    
+    if target_date is None:
+        target_date = datetime.now().strftime("%Y%m%d")
+    
+    if client is None:
+        client = get_default_client()
     
-    # 创建文件处理器
-    file_handler = logging.FileHandler(
-        os.path.join(log_dir, f'news_fetcher_{datetime.now().strftime("%Y%m%d")}.log'),
-        encoding='utf-8'
+    if scheduler is None:
+        scheduler = get_default_scheduler()
+    
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    
+    if asset_type not in ASSET_CONFIG:
+        raise ValueError(f"无效的资产类型: {asset_type}")
+    
+    asset_conf = ASSET_CONFIG[asset_type]
+    day_from, day_to = day_window(target_date)
+    params = build_news_params(asset_type, time_from or day_from, time_to or day_to,
+                               sort=sort, limit=limit or FETCH_CONFIG["limit"])
+    spool_path = os.path.join(
+        "data", asset_conf["data_dir"], f"alpha_vantage_response_{datetime.now().strftime('%Y%m%d')}.json"
     )
     
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
+    parser, from_cache = open_news_feed(params, client, scheduler, cache, use_cache, refresh, spool_path)
+    kept = 0
+    try:
+        with parser:
+            if from_cache:
+                logger.info(f"使用缓存的{asset_conf['asset_name']}新闻响应")
+            
+            # 检查响应是否包含feed
+            if not parser.has_feed:
+                raise ValueError(f"响应中没有feed，可能是API密钥限制或关键词问题: {str(parser.meta)[:100]}")
+            
+            for item in iter_feed_items(parser, target_date, logger):
+                kept += 1
+                yield item
+    finally:
+        # 解析时间 ≈ fetch_stream_seconds - feed_read_seconds - feed_spool_seconds
+        metrics = get_default_metrics()
+        source = "cache" if from_cache else "upstream"
+        metrics.inc("feed_bytes_total", parser.bytes_read, source=source)
+        metrics.observe("feed_read_seconds", parser.read_seconds, source=source)
+        if not from_cache:
+            metrics.observe("feed_spool_seconds", parser.spool_seconds)
+        metrics.inc("feed_items_parsed_total", parser.count, asset=asset_type)
+        metrics.inc("feed_items_kept_total", kept, asset=asset_type)
+
+
+def fetch_news_pages(asset_type: str, target_date: str, logger: logging.Logger, client: HttpClient,
+                     scheduler: QuotaScheduler, cache: Optional[ResponseCache], use_cache: bool,
+                     refresh: bool, time_from: str, time_to: str) -> List[NewsItem]:
+    """
+    按发布时间从早到晚分页获取时间窗口内的新闻
     
-    # 设置格式
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    每页按EARLIEST排序请求FETCH_CONFIG["limit"]条，返回条数达到上限时从本页最新新闻所在的分钟继续请求。
+    达到最大页数时只返回完整获取的部分（下一页起点之前的新闻），之后的新闻留到下次获取，
+    高水位不会越过没有获取到的新闻。
     
-    # 添加处理器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    Args:
+        asset_type: 资产类型
+        target_date: 目标日期，格式为YYYYMMDD
+        logger: 日志记录器
+        client: HTTP客户端
+        scheduler: 配额调度器
+        cache: 响应缓存
+        use_cache: 是否使用响应缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        time_from: 时间窗口起点，格式为YYYYMMDDTHHMM
+        time_to: 时间窗口终点，格式为YYYYMMDDTHHMM
+        
+    Returns:
+        List[NewsItem]: 按URL去掉分页重叠部分后的新闻项
+    """
+    limit = FETCH_CONFIG["limit"]
+    news_items: List[NewsItem] = []
+    seen = set()
+    page_from = time_from
+    for _ in range(FETCH_CONFIG["max_pages"]):
+        page = list(fetch_news_iter(asset_type, target_date, logger, client, scheduler, cache, use_cache,
+                                    refresh, page_from, time_to, sort="EARLIEST", limit=limit))
+        for item in page:
+            if item.url not in seen:
+                seen.add(item.url)
+                news_items.append(item)
+        if len(page) < limit:
+            return news_items
+        
+        # 相邻两页在同一分钟内重叠，重叠部分按URL去掉
+        next_from = max(item.publish_time for item in page)[:13]
+        if next_from <= page_from:
+            logger.warning(f"{asset_type} {page_from} 一分钟内的新闻超过 {limit} 条，部分新闻可能未被获取")
+            return news_items
+        page_from = next_from
     
-    return logger
+    logger.warning(f"{asset_type} 达到最大页数 {FETCH_CONFIG['max_pages']}，{page_from} 及之后的新闻留到下次获取")
+    return [item for item in news_items if item.publish_time[:13] < page_from]
 
 
-def fetch_news(asset_type: str, target_date: Optional[str] = None, logger: Optional[logging.Logger] = None) -> List[NewsItem]:
+def fetch_news(asset_type: str, target_date: Optional[str] = None, logger: Optional[logging.Logger] = None,
+               client: Optional[HttpClient] = None, scheduler: Optional[QuotaScheduler] = None,
+               cache: Optional[ResponseCache] = None, use_cache: bool = True,
+               refresh: bool = False, incremental: bool = True,
+               watermarks: Optional[WatermarkStore] = None,
+               dedup: Optional[DedupIndex] = None) -> List[NewsItem]:
     """
     获取特定资产类型的新闻
     
+    请求限定在目标日期的时间窗口内，因此历史日期同样可以获取到当天的新闻。
+    增量模式下，如果该资产的高水位落在目标日期当天，只请求高水位之后的新闻并追加到日文件，
+    请求、解析和写入的开销只与新增新闻数量相关。
+    所有新闻都会经过去重索引，同一资产下重复或近似重复的报道只保留一篇；
+    跨资产的同一报道在各资产中都会保留，需要调用方按索引中的规范报道合并后再评分。
+    
     Args:
         asset_type: 资产类型，如'oil', 'gold', 'stock', 'crypto', 'forex'
         target_date: 目标日期，格式为YYYYMMDD，如果为None则使用当前日期
         logger: 日志记录器，如果为None则创建新的
+        client: HTTP客户端，如果为None则使用共享的默认客户端
+        scheduler: 配额调度器，如果为None则使用共享的默认调度器
+        cache: 响应缓存，如果为None则使用共享的默认缓存
+        use_cache: 是否使用响应缓存，为False时既不读取也不写入缓存
+        refresh: 是否忽略已有缓存强制重新请求，新响应仍会写入缓存
+        incremental: 是否按高水位增量获取
+        watermarks: 高水位存储，如果为None则使用共享的默认存储
+        dedup: 去重索引，如果为None则只在本次调用内去重
         
     Returns:
-        List[NewsItem]: 新闻项列表
+        List[NewsItem]: 目标日期的全部新闻项（包括之前已保存的）
     """
     # 如果未提供日志记录器，创建一个
     if logger is None:
@@ -76,98 +624,285 @@ def fetch_news(asset_type: str, target_date: Optional[str] = None, logger: Optio
     if target_date is None:
         target_date = datetime.now().strftime("%Y%m%d")
     
+    # 如果未提供客户端，使用共享的连接池
+    if client is None:
+        client = get_default_client()
+    
+    # 如果未提供调度器，使用共享的配额
+    if scheduler is None:
+        scheduler = get_default_scheduler()
+    
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    
+    if watermarks is None:
+        watermarks = get_default_watermarks()
+    
+    if dedup is None:
+        dedup = DedupIndex()
+    
     # 检查资产类型是否有效
     if asset_type not in ASSET_CONFIG:
         logger.error(f"无效的资产类型: {asset_type}")
         return []
     
+    since = incremental_since(asset_type, target_date, watermarks) if incremental else None
+    
     # 获取资产配置
     asset_conf = ASSET_CONFIG[asset_type]
-    keywords = asset_conf["keywords"]
     data_dir = os.path.join("data", asset_conf["data_dir"])
     asset_name = asset_conf["asset_name"]
     
-    logger.info(f"获取{asset_name}相关新闻，日期: {target_date}")
-    print(f"获取{asset_name}相关新闻，日期: {target_date}")
+    echo(logger, f"获取{asset_name}相关新闻，日期: {target_date}")
     
     # 创建数据目录
     os.makedirs(data_dir, exist_ok=True)
     
-    api_key = API_CONFIG["alpha_vantage_api_key"]
-    
-    # 准备请求参数
-    params = {
-        "function": "NEWS_SENTIMENT",
-        "apikey": api_key,
-        "keywords": keywords,
-        "sort": "RELEVANCE",
-        "limit": 50
-    }
+    # 准备请求参数，增量模式从高水位所在的分钟开始
+    time_from, time_to = day_window(target_date)
+    if since:
+        time_from = since[:13]
+        logger.info(f"增量获取{asset_name}新闻，高水位: {since}")
     
-    url = "https://www.alphavantage.co/query"
+    metrics = get_default_metrics()
     
     try:
-        # 发送请求
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        # 保存原始响应用于调试
-        with open(os.path.join(data_dir, f"alpha_vantage_response_{datetime.now().strftime('%Y%m%d')}.json"), "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 流式获取并去重，增量请求的窗口仍在变化，不读取缓存
+        with metrics.time("fetch_stream_seconds", asset=asset_type):
+            fetched = fetch_news_pages(asset_type, target_date, logger, client, scheduler, cache, use_cache,
+                                       refresh or bool(since), time_from, time_to)
+        with metrics.time("dedup_seconds"):
+            news_items = dedup.filter(fetched, asset_type)
+        metrics.inc("dedup_dropped_total", len(fetched) - len(news_items), asset=asset_type)
         
-        # 检查响应是否包含feed
-        if "feed" not in data:
-            logger.warning(f"响应中没有feed，可能是API密钥限制或关键词问题")
-            print(f"响应中没有feed，可能是API密钥限制或关键词问题")
-            return []
+        if since:
+            # 去掉高水位及之前已保存的新闻
+            boundary = set(watermarks.boundary_urls(asset_type))
+            new_items = sorted(
+                (item for item in news_items
+                 if item.publish_time > since or (item.publish_time == since and item.url not in boundary)),
+                key=lambda item: item.publish_time
+            )
+            news_file = append_news_items(asset_type, target_date, new_items)
+            watermarks.advance(asset_type, [(item.publish_time, item.url) for item in new_items])
+            news_items = load_news_items(asset_type, target_date)
+            
+            echo(logger, f"新增 {len(new_items)} 条{asset_name}相关新闻，{target_date} 共 {len(news_items)} 条")
+        else:
+            echo(logger, f"找到 {len(news_items)} 条日期为 {target_date} 的{asset_name}相关新闻")
+            
+            # 保存新闻数据，与已有文件合并，避免覆盖回填或之前获取的新闻
+            news_file = save_news_items(asset_type, target_date, news_items, merge=True)
+            watermarks.advance(asset_type, [(item.publish_time, item.url) for item in news_items])
         
-        # 提取新闻项
-        news_items = []
-        target_date_obj = datetime.strptime(target_date, "%Y%m%d")
-        
-        for item in data["feed"]:
-            # 解析发布时间
-            time_published = item.get("time_published", "")
-            if time_published:
-                try:
-                    # 格式：YYYYMMDDTHHMMSS
-                    news_date = datetime.strptime(time_published[:8], "%Y%m%d")
-                    
-                    # 检查新闻日期是否匹配目标日期
-                    if news_date.date() == target_date_obj.date():
-                        # 创建NewsItem
-                        news_item = NewsItem(
-                            title=item.get("title", ""),
-                            original_title=item.get("title", ""),
-                            content=item.get("summary", ""),
-                            publish_time=time_published,
-                            source=item.get("source", ""),
-                            url=item.get("url", ""),
-                            alpha_sentiment=float(item.get("overall_sentiment_score", 0.0))
-                        )
-                        news_items.append(news_item)
-                except Exception as e:
-                    logger.error(f"解析time_published时出错: {str(e)}")
-                    continue
-        
-        logger.info(f"找到 {len(news_items)} 条日期为 {target_date} 的{asset_name}相关新闻")
-        print(f"找到 {len(news_items)} 条日期为 {target_date} 的{asset_name}相关新闻")
-        
-        # 保存新闻数据
-        news_file = os.path.join(data_dir, f"{asset_type}_news_{target_date}.json")
-        with open(news_file, "w", encoding="utf-8") as f:
-            json_data = [item.to_dict() for item in news_items]
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"新闻数据已保存到 {news_file}")
-        print(f"新闻数据已保存到 {news_file}")
+        echo(logger, f"新闻数据已保存到 {news_file}")
         
         return news_items
     
     except Exception as e:
         logger.error(f"获取{asset_name}新闻时出错: {str(e)}")
-        print(f"获取{asset_name}新闻时出错: {str(e)}")
-        return []
+        return load_news_items(asset_type, target_date) if since else []
+
+
+def fetch_news_multi(asset_types: List[str], target_date: Optional[str] = None,
+                     logger: Optional[logging.Logger] = None,
+                     max_workers: Optional[int] = None,
+                     client: Optional[HttpClient] = None,
+                     scheduler: Optional[QuotaScheduler] = None,
+                     cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                     refresh: bool = False, incremental: bool = True,
+                     watermarks: Optional[WatermarkStore] = None,
+                     dedup: Optional[DedupIndex] = None) -> Dict[str, List[NewsItem]]:
+    """
+    并发获取多个资产类型的新闻
+
+    每个资产在独立的工作线程中调用fetch_news，各自的数据仍写入对应的data_dir，
+    总耗时接近最慢的单个资产，而不是所有资产耗时之和。
+
+    Args:
+        asset_types: 资产类型列表
+        target_date: 目标日期，格式为YYYYMMDD，如果为None则使用当前日期
+        logger: 日志记录器，如果为None则创建新的
+        max_workers: 最大并发线程数，如果为None则使用SYSTEM_CONFIG中的max_workers
+        client: HTTP客户端，所有线程共享同一个连接池
+        scheduler: 配额调度器，所有线程共享同一份配额
+        cache: 响应缓存，如果为None则使用共享的默认缓存
+        use_cache: 是否使用响应缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        incremental: 是否按高水位增量获取
+        watermarks: 高水位存储，如果为None则使用共享的默认存储
+        dedup: 去重索引，所有资产共享，用于识别跨资产的同一报道；如果为None则只在本次调用内去重
+
+    Returns:
+        Dict[str, List[NewsItem]]: 资产类型到新闻项列表的映射，顺序与asset_types一致
+    """
+    if logger is None:
+        logger = setup_logging()
+
+    if target_date is None:
+        target_date = datetime.now().strftime("%Y%m%d")
+
+    if client is None:
+        client = get_default_client()
+
+    if scheduler is None:
+        scheduler = get_default_scheduler()
+
+    if cache is None and use_cache:
+        cache = get_default_cache()
+
+    if watermarks is None:
+        watermarks = get_default_watermarks()
+
+    if dedup is None:
+        dedup = DedupIndex()
+
+    # 命中缓存的资产不消耗配额，其余资产中超出当日剩余配额的不再发送请求
+    cached = []
+    if use_cache and not refresh:
+        cached = [
+            asset_type for asset_type in asset_types
+            if not (incremental and incremental_since(asset_type, target_date, watermarks))
+            and cache.contains(build_news_params(asset_type, *day_window(target_date)))
+        ]
+    scheduled, deferred = scheduler.plan(
+        [asset_type for asset_type in asset_types if asset_type not in cached],
+        key=lambda asset_type: tuple(sorted(build_news_params(asset_type, *day_window(target_date)).items()))
+    )
+    scheduled = cached + scheduled
+    if deferred:
+        logger.warning(f"当日配额不足，跳过: {', '.join(deferred)}")
+
+    if max_workers is None:
+        max_workers = SYSTEM_CONFIG.get("max_workers", 5)
+    max_workers = max(1, min(max_workers, len(scheduled) or 1))
+
+    logger.info(f"并发获取 {len(scheduled)} 个资产的新闻，线程数: {max_workers}")
+
+    # 跳过的资产返回已保存的数据
+    results: Dict[str, List[NewsItem]] = {
+        asset_type: load_news_items(asset_type, target_date) for asset_type in deferred
+    }
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as executor:
+        futures = {
+            executor.submit(fetch_news, asset_type, target_date, logger, client, scheduler,
+                            cache, use_cache, refresh, incremental, watermarks, dedup): asset_type
+            for asset_type in scheduled
+        }
+        for future in as_completed(futures):
+            asset_type = futures[future]
+            try:
+                results[asset_type] = future.result()
+            except Exception as e:
+                # fetch_news内部已捕获请求异常，这里只兜底意外错误
+                logger.error(f"获取{asset_type}新闻时出错: {str(e)}")
+                results[asset_type] = []
+
+    return {asset_type: results[asset_type] for asset_type in asset_types}
+
+
+def fetch_news_broad(asset_types: List[str], target_date: Optional[str] = None,
+                     logger: Optional[logging.Logger] = None,
+                     client: Optional[HttpClient] = None,
+                     scheduler: Optional[QuotaScheduler] = None,
+                     cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                     refresh: bool = False,
+                     watermarks: Optional[WatermarkStore] = None,
+                     dedup: Optional[DedupIndex] = None,
+                     matcher: Optional[KeywordMatcher] = None) -> Dict[str, List[NewsItem]]:
+    """
+    只发送一次宽泛请求，在本地按关键词把新闻分配到多个资产
+
+    各资产的关键词请求返回的新闻大量重叠，这里改为不带关键词请求当天的新闻，
+    再用关键词匹配器对标题和摘要扫描一遍，API调用次数从资产个数降为1。
+    一条新闻可以同时归入多个资产，各资产的数据仍写入对应的data_dir。
+
+    Args:
+        asset_types: 资产类型列表
+        target_date: 目标日期，格式为YYYYMMDD，如果为None则使用当前日期
+        logger: 日志记录器，如果为None则创建新的
+        client: HTTP客户端，如果为None则使用共享的默认客户端
+        scheduler: 配额调度器，如果为None则使用共享的默认调度器
+        cache: 响应缓存，如果为None则使用共享的默认缓存
+        use_cache: 是否使用响应缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        watermarks: 高水位存储，如果为None则使用共享的默认存储
+        dedup: 去重索引，如果为None则只在本次调用内去重
+        matcher: 关键词匹配器，如果为None则使用共享的默认匹配器
+
+    Returns:
+        Dict[str, List[NewsItem]]: 资产类型到新闻项列表的映射，顺序与asset_types一致；
+        请求失败时返回已保存的数据
+    """
+    if logger is None:
+        logger = setup_logging()
+
+    if target_date is None:
+        target_date = datetime.now().strftime("%Y%m%d")
+
+    if client is None:
+        client = get_default_client()
+
+    if scheduler is None:
+        scheduler = get_default_scheduler()
+
+    if cache is None and use_cache:
+        cache = get_default_cache()
+
+    if watermarks is None:
+        watermarks = get_default_watermarks()
+
+    if dedup is None:
+        dedup = DedupIndex()
+
+    if matcher is None:
+        matcher = get_default_matcher()
+
+    echo(logger, f"单次请求获取 {len(asset_types)} 个资产的新闻，日期: {target_date}")
+
+    params = build_broad_params(*day_window(target_date))
+
+    try:
+        parser, from_cache = open_news_feed(params, client, scheduler, cache, use_cache, refresh)
+        with parser:
+            if from_cache:
+                logger.info("使用缓存的新闻响应")
+
+            if not parser.has_feed:
+                raise ValueError(f"响应中没有feed，可能是API密钥限制: {str(parser.meta)[:100]}")
+
+            # 边解析边分类，一次扫描统计所有资产的关键词命中
+            classified = matcher.classify(
+                iter_feed_items(parser, target_date, logger), CLASSIFIER_CONFIG.get("min_keyword_hits", 1), asset_types
+            )
+    except Exception as e:
+        logger.error(f"获取新闻时出错: {str(e)}")
+        return {asset_type: load_news_items(asset_type, target_date) for asset_type in asset_types}
+
+    truncated = parser.count >= params["limit"]
+    if truncated:
+        logger.warning(f"返回条数达到上限 {params['limit']}，部分新闻可能未被获取，可使用回填按更小的时间窗口补齐；"
+                       f"本次不推进高水位")
+    logger.info(f"共 {parser.count} 条新闻，分类后归入资产 {sum(len(items) for items in classified.values())} 次")
+
+    results: Dict[str, List[NewsItem]] = {}
+    for asset_type in asset_types:
+        asset_name = ASSET_CONFIG[asset_type]["asset_name"]
+        asset_items = dedup.filter(classified[asset_type], asset_type)
+        try:
+            news_file = save_news_items(asset_type, target_date, asset_items, merge=True)
+            # 结果被截断时（按LATEST排序）较早的新闻没有获取到，推进高水位会让增量获取跳过它们
+            if not truncated:
+                watermarks.advance(asset_type, [(item.publish_time, item.url) for item in asset_items])
+        except Exception as e:
+            logger.error(f"保存{asset_name}新闻时出错: {str(e)}")
+            results[asset_type] = asset_items
+            continue
+
+        echo(logger, f"找到 {len(asset_items)} 条日期为 {target_date} 的{asset_name}相关新闻，已保存到 {news_file}")
+        results[asset_type] = asset_items
+
+    return results
 
 
 def generate_test_news(asset_type: str, count: int = 3) -> List[NewsItem]:
@@ -176,7 +911,7 @@ def generate_test_news(asset_type: str, count: int = 3) -> List[NewsItem]:
     
     Args:
         asset_type: 资产类型，如'oil', 'gold', 'stock', 'crypto', 'forex'
-        count: 生成的新闻数量
+        count: 生成的新闻数量，超出模板数量的部分由合成新闻补足
         
     Returns:
         List[NewsItem]: 新闻项列表
@@ -324,20 +1059,49 @@ def generate_test_news(asset_type: str, count: int = 3) -> List[NewsItem]:
         )
         news_items.append(news_item)
     
+    # 模板不够时用合成新闻补足，发布时间在当天零点到现在之间
+    if count > len(news_items):
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        news_items.extend(SyntheticNewsGenerator().iter_news_items(
+            count - len(news_items), day_start, max(now, day_start + timedelta(minutes=1)), asset_type
+        ))
+    
     print(f"已生成 {len(news_items)} 条{asset_name}测试新闻数据")
     return news_items
 
 
 def main():
-    """主函数"""
+    """主函数，参数为[资产类型] [日期]，加上--profile时记录性能分析结果"""
+    if "--profile" not in sys.argv[1:]:
+        run_fetch_cli(sys.argv[1:])
+        return
+    
+    argv = [arg for arg in sys.argv[1:] if arg != "--profile"]
+    profiler = Profiler()
+    set_default_profiler(profiler)
+    try:
+        with profiler:
+            run_fetch_cli(argv)
+    finally:
+        set_default_profiler(None)
+        print(f"性能分析结果已保存到 {profiler.out_dir}")
+
+
+def run_fetch_cli(argv: List[str]):
+    """
+    命令行获取新闻
+    
+    Args:
+        argv: 命令行参数（不含程序名），依次为资产类型和日期，都可以省略
+    """
     # 设置日志
     logger = setup_logging()
     
     # 检查命令行参数
-    if len(sys.argv) > 2:
+    if len(argv) > 1:
         # 如果提供了资产类型和日期参数
-        asset_type = sys.argv[1].lower()
-        target_date = sys.argv[2]
+        asset_type = argv[0].lower()
+        target_date = argv[1]
         
         # 验证日期格式
         try:
@@ -347,9 +1111,9 @@ def main():
             print(f"错误：日期格式不正确，应为YYYYMMDD，例如20250307")
             print(f"使用当前日期代替...")
             target_date = datetime.now().strftime("%Y%m%d")
-    elif len(sys.argv) > 1:
+    elif argv:
         # 如果只提供了资产类型参数
-        asset_type = sys.argv[1].lower()
+        asset_type = argv[0].lower()
         target_date = datetime.now().strftime("%Y%m%d")
         print(f"使用指定资产类型: {asset_type}, 当前日期: {target_date}")
     else:
@@ -367,28 +1131,25 @@ def main():
     # 获取资产名称
     asset_name = ASSET_CONFIG[asset_type]["asset_name"]
     
-    print(f"开始获取{asset_name}相关新闻...")
-    logger.info(f"开始获取{asset_name}相关新闻...")
+    echo(logger, f"开始获取{asset_name}相关新闻...")
     
     # 获取新闻数据
-    news_items = fetch_news(asset_type, target_date, logger)
+    with get_default_profiler().stage("fetch"):
+        news_items = fetch_news(asset_type, target_date, logger, dedup=DedupIndex())
     
     # 如果没有找到新闻，使用测试数据
     if not news_items:
-        print(f"没有找到真实新闻，使用测试数据")
         logger.warning(f"没有找到真实新闻，使用测试数据")
         news_items = generate_test_news(asset_type)
     
-    print(f"新闻项数量: {len(news_items)}")
-    logger.info(f"新闻项数量: {len(news_items)}")
+    echo(logger, f"新闻项数量: {len(news_items)}")
     
     # 显示新闻标题
     print(f"\n获取到的{asset_name}相关新闻标题:")
     for i, item in enumerate(news_items, 1):
         print(f"{i}. {item.title} (来源: {item.source}, 情感分数: {item.alpha_sentiment:.2f})")
     
-    print(f"\n{asset_name}新闻获取完成")
-    logger.info(f"{asset_name}新闻获取完成")
+    echo(logger, f"\n{asset_name}新闻获取完成")
 
 
 if __name__ == "__main__":
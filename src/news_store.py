@@ -0,0 +1,325 @@
+"""
+新闻存储模块 - 基于SQLite的带索引新闻库，替代按天保存的JSON文件
+"""
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import logging
+import sqlite3
+import argparse
+import threading
+import contextlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import ASSET_CONFIG, DATA_DIR, STORAGE_CONFIG
+from src.models import NewsItem
+
+logger = logging.getLogger("news_fetcher.news_store")
+
+# 新闻字段，顺序与NewsItem的构造参数一致，查询结果可以直接按位置构造NewsItem
+NEWS_COLUMNS = (
+    "title", "original_title", "content", "publish_time", "source", "url", "alpha_sentiment", "summary"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    url_hash INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    original_title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    publish_time TEXT NOT NULL,
+    source TEXT NOT NULL,
+    alpha_sentiment REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS news_assets (
+    asset TEXT NOT NULL,
+    publish_time TEXT NOT NULL,
+    url_hash INTEGER NOT NULL,
+    PRIMARY KEY (asset, url_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_news_assets_time ON news_assets (asset, publish_time);
+"""
+
+
+def url_hash(url: str) -> int:
+    """
+    计算URL的64位哈希，作为新闻主键
+
+    Args:
+        url: 新闻URL
+
+    Returns:
+        int: 有符号64位整数，可直接作为SQLite的INTEGER PRIMARY KEY
+    """
+    digest = hashlib.sha1(url.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _time_bound(value: Optional[str], upper: bool) -> Optional[str]:
+    """把YYYYMMDD或YYYYMMDDTHHMM补全为YYYYMMDDTHHMMSS，便于按字符串比较"""
+    if not value:
+        return None
+    if len(value) == 8:
+        return f"{value}T235959" if upper else f"{value}T000000"
+    if upper:
+        return value.ljust(15, "9")
+    return value.ljust(15, "0")
+
+
+class NewsStore:
+    """
+    SQLite新闻库
+
+    news表以URL哈希为主键保存每条新闻一次；news_assets表记录新闻所属的资产，
+    在(asset, publish_time)上建有索引，按资产和时间范围查询无需扫描全部数据。
+    每个线程使用独立的连接，开启WAL以支持多线程和多进程并发读写；
+    内存数据库（":memory:"）只能由所有线程共用一个连接。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 数据库文件路径，默认使用STORAGE_CONFIG中的sqlite_path
+        """
+        self.path = path or STORAGE_CONFIG["sqlite_path"]
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # 内存数据库只存在于创建它的连接中，所有线程共用一个连接，写事务需要串行
+        self._write_lock = threading.RLock() if self.path == ":memory:" else contextlib.nullcontext()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                if self.path == ":memory:" and self._connections:
+                    # 每个新连接都会打开一个空的内存数据库，其他线程复用第一个连接（sqlite3可跨线程使用同一连接）
+                    conn = self._connections[0]
+                else:
+                    conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, asset_type: str, news_items: Iterable[NewsItem]) -> int:
+        """
+        批量写入新闻，URL相同的新闻覆盖旧内容
+
+        Args:
+            asset_type: 资产类型
+            news_items: 新闻项
+
+        Returns:
+            int: 写入的条数
+        """
+        news_rows = []
+        asset_rows = []
+        for item in news_items:
+            key = url_hash(item.url)
+            news_rows.append((
+                key, item.url, item.title, item.original_title, item.content, item.summary,
+                item.publish_time, item.source, item.alpha_sentiment
+            ))
+            asset_rows.append((asset_type, item.publish_time, key))
+
+        if not news_rows:
+            return 0
+
+        conn = self.connection
+        with self._write_lock, conn:
+            conn.executemany(
+                """
+                INSERT INTO news (url_hash, url, title, original_title, content, summary,
+                                  publish_time, source, alpha_sentiment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_hash) DO UPDATE SET
+                    title=excluded.title, original_title=excluded.original_title,
+                    content=excluded.content, summary=excluded.summary,
+                    publish_time=excluded.publish_time, source=excluded.source,
+                    alpha_sentiment=excluded.alpha_sentiment
+                """,
+                news_rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO news_assets (asset, publish_time, url_hash) VALUES (?, ?, ?)",
+                asset_rows
+            )
+        return len(news_rows)
+
+    def _range_query(self, select: str, asset_type: Optional[str], start: Optional[str],
+                     end: Optional[str], limit: Optional[int]):
+        conditions = []
+        params: List[Any] = []
+        if asset_type is not None:
+            conditions.append("a.asset = ?")
+            params.append(asset_type)
+        if start:
+            conditions.append("a.publish_time >= ?")
+            params.append(_time_bound(start, upper=False))
+        if end:
+            conditions.append("a.publish_time <= ?")
+            params.append(_time_bound(end, upper=True))
+
+        sql = f"SELECT {select} FROM news_assets a JOIN news n ON n.url_hash = a.url_hash"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if asset_type is None:
+            # 一条新闻可能属于多个资产，不指定资产时只返回一次
+            sql += " GROUP BY n.url_hash"
+        sql += " ORDER BY a.publish_time"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.connection.execute(sql, params)
+
+    def query(self, asset_type: Optional[str] = None, start: Optional[str] = None,
+              end: Optional[str] = None, limit: Optional[int] = None) -> List[NewsItem]:
+        """
+        按资产和发布时间范围查询新闻
+
+        Args:
+            asset_type: 资产类型，为None时查询全部资产
+            start: 起始时间（包含），格式为YYYYMMDD或YYYYMMDDTHHMMSS
+            end: 结束时间（包含），格式同start
+            limit: 最大返回条数
+
+        Returns:
+            List[NewsItem]: 按发布时间排序的新闻项
+        """
+        select = ", ".join(f"n.{column}" for column in NEWS_COLUMNS)
+        return [NewsItem(*row) for row in self._range_query(select, asset_type, start, end, limit)]
+
+    def query_columns(self, columns: Sequence[str] = ("publish_time", "alpha_sentiment"),
+                      asset_type: Optional[str] = None, start: Optional[str] = None,
+                      end: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, list]:
+        """
+        按列返回查询结果，只读取需要的字段
+
+        Args:
+            columns: 需要的列名，取值见NEWS_COLUMNS
+            asset_type: 资产类型，为None时查询全部资产
+            start: 起始时间（包含）
+            end: 结束时间（包含）
+            limit: 最大返回条数
+
+        Returns:
+            Dict[str, list]: 列名到值列表的映射
+        """
+        invalid = [column for column in columns if column not in NEWS_COLUMNS]
+        if invalid:
+            raise ValueError(f"无效的列名: {', '.join(invalid)}")
+        select = ", ".join(f"n.{column}" for column in columns)
+        rows = self._range_query(select, asset_type, start, end, limit).fetchall()
+        return {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+
+    def has_news(self, asset_type: str, start: Optional[str] = None, end: Optional[str] = None) -> bool:
+        """指定资产和时间范围内是否有新闻"""
+        return bool(self._range_query("1", asset_type, start, end, 1).fetchone())
+
+    def count(self, asset_type: Optional[str] = None) -> int:
+        """新闻条数，不指定资产时按唯一新闻计数"""
+        if asset_type is None:
+            return self.connection.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM news_assets WHERE asset = ?", (asset_type,)
+        ).fetchone()[0]
+
+    def assets_of(self, url: str) -> List[str]:
+        """新闻所属的资产"""
+        rows = self.connection.execute(
+            "SELECT asset FROM news_assets WHERE url_hash = ? ORDER BY asset", (url_hash(url),)
+        )
+        return [row[0] for row in rows]
+
+    def import_json_dir(self, data_root: str = DATA_DIR, batch_size: int = 5000) -> int:
+        """
+        一次性导入已有的按天JSON文件
+
+        Args:
+            data_root: 数据根目录，其下为各资产的data_dir
+            batch_size: 每批写入的条数
+
+        Returns:
+            int: 导入的条数
+        """
+        total = 0
+        for asset_type, asset_conf in ASSET_CONFIG.items():
+            pattern = os.path.join(data_root, asset_conf["data_dir"], f"{asset_type}_news_*.json")
+            batch: List[NewsItem] = []
+            for path in sorted(glob.glob(pattern)):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        batch.extend(NewsItem.from_dict(data) for data in json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"跳过无法解析的文件 {path}: {str(e)}")
+                    continue
+                if len(batch) >= batch_size:
+                    total += self.upsert(asset_type, batch)
+                    batch = []
+            total += self.upsert(asset_type, batch)
+            logger.info(f"已导入{asset_conf['asset_name']}新闻，累计 {total} 条")
+        return total
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def __enter__(self) -> "NewsStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_store: Optional[NewsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store() -> NewsStore:
+    """
+    获取进程内共享的新闻库
+
+    Returns:
+        NewsStore: 使用STORAGE_CONFIG配置的新闻库
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = NewsStore()
+        return _default_store
+
+
+def main():
+    """主函数：导入已有的JSON新闻文件"""
+    parser = argparse.ArgumentParser(description="新闻库工具 - 导入已有的按天JSON新闻文件")
+    parser.add_argument("--db", type=str, default=STORAGE_CONFIG["sqlite_path"], help="数据库文件路径")
+    parser.add_argument("--data-root", type=str, default=DATA_DIR, help="数据根目录")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    with NewsStore(args.db) as store:
+        total = store.import_json_dir(args.data_root)
+        print(f"导入完成，共 {total} 条，新闻库中唯一新闻 {store.count()} 条")
+
+
+if __name__ == "__main__":
+    main()
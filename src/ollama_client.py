@@ -0,0 +1,318 @@
+"""
+Ollama评分模块 - 调用本地Ollama兼容接口为新闻生成NewsScore
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import MODEL_CONFIG, SYSTEM_CONFIG
+from src.models import NewsItem, NewsScore
+from src.http_client import HttpClient
+from src.score_cache import ScoreCache, get_default_score_cache, score_key
+
+logger = logging.getLogger("news_fetcher.ollama_client")
+
+# 提示词只包含标题和正文，与资产无关，同一篇报道出现在多个资产下时只需推理一次
+PROMPT_TEMPLATE = """You are a financial news analyst. Rate the following news.
+Respond with a single JSON object and nothing else:
+{{"sentiment": <float from -1 (very bearish) to 1 (very bullish)>,
+ "impact": <float from 0 (no market impact) to 100 (major market-moving event)>,
+ "relevance": <float from 0 (unrelated to financial markets) to 1 (directly about financial markets)>,
+ "summary": "<用一句中文概括这条新闻>"}}
+
+Title: {title}
+Content: {content}"""
+
+# 提示词版本，由PROMPT_TEMPLATE的哈希得到，修改提示词后评分缓存中的旧结果自动失效
+PROMPT_VERSION = hashlib.sha256(PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+
+
+class ScoreParseError(ValueError):
+    """模型输出无法解析为评分"""
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def parse_score_response(text: str, title: str) -> NewsScore:
+    """
+    把模型输出解析为NewsScore
+
+    接受sentiment/impact/relevance或带_score后缀的字段名，数值超出范围时截断到有效区间。
+
+    Args:
+        text: 模型输出，应为JSON对象，允许前后有多余文字
+        title: 新闻标题
+
+    Returns:
+        NewsScore: 评分
+
+    Raises:
+        ScoreParseError: 找不到JSON对象或缺少情绪、重要性字段
+    """
+    match = _JSON_OBJECT.search(text)
+    if not match:
+        raise ScoreParseError(f"模型输出中没有JSON对象: {text[:100]!r}")
+    try:
+        data = json.loads(match.group())
+    except ValueError as e:
+        raise ScoreParseError(f"模型输出不是有效的JSON: {str(e)}")
+    if not isinstance(data, dict):
+        raise ScoreParseError(f"模型输出不是JSON对象: {text[:100]!r}")
+
+    def number(*keys: str) -> Optional[float]:
+        for key in keys:
+            if key in data:
+                try:
+                    return float(data[key])
+                except (TypeError, ValueError):
+                    raise ScoreParseError(f"字段{key}不是数字: {data[key]!r}")
+        return None
+
+    sentiment = number("sentiment", "sentiment_score")
+    impact = number("impact", "impact_score")
+    if sentiment is None or impact is None:
+        raise ScoreParseError(f"模型输出缺少sentiment或impact字段: {text[:100]!r}")
+    relevance = number("relevance", "relevance_score")
+
+    return NewsScore(
+        title=title,
+        sentiment_score=_clamp(sentiment, -1.0, 1.0),
+        impact_score=_clamp(impact, 0.0, 100.0),
+        relevance_score=0.8 if relevance is None else _clamp(relevance, 0.0, 1.0),
+        summary=str(data.get("summary", "")),
+    )
+
+
+class OllamaScorer:
+    """
+    Ollama新闻评分器
+
+    通过/api/generate接口逐条请求评分，批量评分时最多concurrency条同时在途，
+    复用同一个连接池。每条新闻从开始请求起有独立的截止时间，超时或输出无法解析的新闻返回None，
+    不影响同一批次的其他新闻。
+    评分前先查评分缓存，内容相同的新闻（包括同一批次内的转载）只请求一次。
+    """
+
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                 client: Optional[HttpClient] = None, cache: Optional[ScoreCache] = None,
+                 use_cache: bool = True):
+        """
+        Args:
+            base_url: Ollama服务地址，默认使用MODEL_CONFIG中的ollama_url
+            model: 模型名称，默认使用MODEL_CONFIG中的ollama_model
+            concurrency: 最大并发请求数，默认使用SYSTEM_CONFIG中的batch_size
+            timeout: 每条新闻的截止时间（秒），默认使用SYSTEM_CONFIG中的news_timeout
+            temperature: 采样温度，默认使用finGPT_params中的temperature
+            max_tokens: 每条新闻最多生成的token数，默认使用MODEL_CONFIG中的ollama_max_tokens
+            client: HTTP客户端，如果为None则创建指向base_url的客户端
+            cache: 评分缓存，如果为None则使用默认缓存
+            use_cache: 是否使用评分缓存
+        """
+        self.base_url = base_url or MODEL_CONFIG.get("ollama_url", "http://localhost:11434")
+        self.model = model or MODEL_CONFIG.get("ollama_model", "fingpt")
+        self.concurrency = max(1, concurrency or SYSTEM_CONFIG.get("batch_size", 8))
+        self.timeout = timeout if timeout is not None else SYSTEM_CONFIG.get("news_timeout", 30)
+        self.temperature = (
+            temperature if temperature is not None else MODEL_CONFIG["finGPT_params"].get("temperature", 0.2)
+        )
+        self.max_tokens = max_tokens or MODEL_CONFIG.get("ollama_max_tokens", 256)
+        self.client = client or HttpClient(self.base_url, timeout=self.timeout, pool_size=self.concurrency)
+        if not use_cache:
+            self.cache = None
+        else:
+            self.cache = cache if cache is not None else get_default_score_cache()
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.parse_errors = 0
+        self.skipped = 0
+        self.total_latency = 0.0
+
+    def build_prompt(self, item: NewsItem) -> str:
+        """
+        构建评分提示词
+
+        Args:
+            item: 新闻项
+
+        Returns:
+            str: 提示词
+        """
+        return PROMPT_TEMPLATE.format(title=item.title, content=item.content)
+
+    def cache_key(self, item: NewsItem) -> str:
+        """新闻在当前模型、提示词、温度和最大生成token数下的评分缓存键"""
+        return score_key(item, self.model, PROMPT_VERSION, self.temperature, {"num_predict": self.max_tokens})
+
+    def _count(self, name: str, latency: Optional[float] = None):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if latency is not None:
+                self.total_latency += latency
+
+    def _request(self, item: NewsItem, deadline: Optional[float] = None) -> Optional[NewsScore]:
+        """
+        请求模型为单条新闻评分，不经过缓存
+
+        Args:
+            item: 新闻项
+            deadline: 整批的截止时间（time.monotonic()），到期后未开始的新闻不再请求，计入skipped
+
+        Returns:
+            Optional[NewsScore]: 评分，失败、超时或无法解析时返回None
+        """
+        start = time.monotonic()
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - start)
+            if timeout <= 0:
+                self._count("skipped")
+                return None
+
+        payload = {
+            "model": self.model,
+            "prompt": self.build_prompt(item),
+            "stream": False,
+            "format": "json",
+            "options": {"temperature": self.temperature, "num_predict": self.max_tokens},
+        }
+        self._count("requests")
+        try:
+            response = self.client.post("/api/generate", json=payload, timeout=(self.client.timeout[0], timeout))
+            response.raise_for_status()
+            text = response.json().get("response", "")
+        except requests.Timeout:
+            self._count("timeouts")
+            logger.warning(f"评分超时（{timeout:.1f}秒）: {item.title[:50]}")
+            return None
+        except Exception as e:
+            self._count("failures")
+            logger.warning(f"评分请求失败: {str(e)[:100]}")
+            return None
+
+        latency = time.monotonic() - start
+        if latency > timeout:
+            self._count("timeouts", latency)
+            return None
+
+        try:
+            score = parse_score_response(text, item.title)
+        except ScoreParseError as e:
+            self._count("parse_errors", latency)
+            logger.warning(f"无法解析评分: {str(e)}")
+            return None
+        with self._lock:
+            self.total_latency += latency
+        return score
+
+    def score(self, item: NewsItem, deadline: Optional[float] = None) -> Optional[NewsScore]:
+        """
+        为单条新闻评分
+
+        Args:
+            item: 新闻项
+            deadline: 截止时间（time.monotonic()）
+
+        Returns:
+            Optional[NewsScore]: 评分，失败、超时或无法解析时返回None
+        """
+        return self.score_batch([item], deadline)[0]
+
+    def score_batch(self, news_items: Sequence[NewsItem],
+                    deadline: Optional[float] = None) -> List[Optional[NewsScore]]:
+        """
+        并发为一批新闻评分
+
+        Args:
+            news_items: 新闻项
+            deadline: 整批的截止时间（time.monotonic()），为None时只受每条新闻的超时限制
+
+        Returns:
+            List[Optional[NewsScore]]: 与news_items一一对应的评分，失败的位置为None
+        """
+        if not news_items:
+            return []
+        keys = [self.cache_key(item) for item in news_items]
+        if self.cache is not None:
+            results = self.cache.get_many(keys, [item.title for item in news_items])
+        else:
+            results = [None] * len(news_items)
+
+        # 未命中的新闻按缓存键去重，每个键只请求一次
+        pending: Dict[str, List[int]] = {}
+        for index, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                pending.setdefault(key, []).append(index)
+        if not pending:
+            return results
+
+        requested = [news_items[indices[0]] for indices in pending.values()]
+        workers = min(self.concurrency, len(requested))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ollama") as executor:
+            scores = list(executor.map(lambda item: self._request(item, deadline), requested))
+
+        for (key, indices), score in zip(pending.items(), scores):
+            if score is None:
+                continue
+            for index in indices:
+                results[index] = NewsScore(news_items[index].title, score.sentiment_score, score.impact_score,
+                                           score.relevance_score, score.summary)
+        if self.cache is not None:
+            self.cache.put_many(
+                ((key, score) for key, score in zip(pending, scores) if score is not None),
+                self.model, PROMPT_VERSION,
+            )
+        return results
+
+    def available(self) -> bool:
+        """服务是否可用"""
+        try:
+            return self.client.get("/api/tags", timeout=(self.client.timeout[0], 5)).status_code == 200
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """请求统计"""
+        with self._lock:
+            succeeded = self.requests - self.failures - self.timeouts - self.parse_errors
+            return {
+                "requests": self.requests,
+                "succeeded": succeeded,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "parse_errors": self.parse_errors,
+                "skipped": self.skipped,
+                "avg_latency": self.total_latency / max(1, self.requests - self.failures),
+            }
+
+    def close(self):
+        """关闭连接池"""
+        self.client.close()
+
+    def __enter__(self) -> "OllamaScorer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
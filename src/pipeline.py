@@ -0,0 +1,354 @@
+"""
+流水线模块 - 由有界队列连接的多阶段线程池，让获取、评分和报告互相重叠
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模块
+from config.config import PIPELINE_CONFIG
+from src.models import NewsItem
+from src.news_fetcher import fetch_news, generate_test_news, setup_logging
+from src.dedup import DedupIndex
+from src.prerank import PreRanker
+from src.scoring import ScoringEngine, scores_to_arrays
+from src.local_inference import create_scorer
+from src.report import RankedNews, build_report, save_report
+from src.metrics import get_default_metrics
+
+logger = logging.getLogger("news_fetcher.pipeline")
+
+# 队列中的结束标记：上游全部处理完毕
+_DONE = object()
+
+# 阻塞的入队、出队每隔多久检查一次是否已取消（秒）
+_POLL_INTERVAL = 0.1
+
+
+class Stage:
+    """
+    流水线阶段
+
+    func对每个输入返回一个输出，返回None表示丢弃该输入；抛出的异常计入errors，不影响其他输入。
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        """
+        Args:
+            name: 阶段名称
+            func: 处理函数
+            workers: 线程数
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._depth_sum = 0
+        self._depth_samples = 0
+        self._active = self.workers
+        self._lock = threading.Lock()
+
+    def sample_depth(self, depth: int):
+        """记录一次输入队列深度"""
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """阶段统计：吞吐量按第一条输入开始到最后一个线程结束的时间计算"""
+        elapsed = (self.finished or time.monotonic()) - self.started if self.started else 0.0
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "busy_seconds": self.busy,
+            "elapsed_seconds": elapsed,
+            "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+            "utilization": self.busy / (elapsed * self.workers) if elapsed > 0 else 0.0,
+            "max_queue_depth": self.max_depth,
+            "avg_queue_depth": self._depth_sum / self._depth_samples if self._depth_samples else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    多阶段流水线
+
+    相邻阶段之间是有界队列：下游处理不过来时上游的入队会阻塞，内存中的在途数据不超过各队列容量之和，
+    而下游只要拿到第一条输入就开始工作，不必等上游全部完成。
+    到达截止时间或调用cancel()后，各线程在当前输入处理完后退出，run()返回已完成的结果。
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: Optional[int] = None,
+                 deadline: Optional[float] = None):
+        """
+        Args:
+            stages: 按顺序排列的阶段
+            queue_size: 阶段之间队列的最大长度，默认使用PIPELINE_CONFIG中的queue_size
+            deadline: 截止时间（time.monotonic()），为None时不限制
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = list(stages)
+        self.queue_size = queue_size or PIPELINE_CONFIG.get("queue_size", 4)
+        self.deadline = deadline
+        self.cancelled = threading.Event()
+        self.timed_out = False
+        self._queues: List[queue.Queue] = []
+
+    def cancel(self):
+        """取消流水线"""
+        self.cancelled.set()
+
+    def _get(self, source: queue.Queue) -> Any:
+        while not self.cancelled.is_set():
+            try:
+                return source.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _put(self, target: queue.Queue, value: Any) -> bool:
+        while not self.cancelled.is_set():
+            try:
+                target.put(value, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _finish_worker(self, index: int):
+        """线程退出时调用，阶段的最后一个线程负责通知下游"""
+        stage = self.stages[index]
+        with stage._lock:
+            stage._active -= 1
+            last = stage._active == 0
+            if last:
+                stage.finished = time.monotonic()
+        if last:
+            downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for _ in range(downstream):
+                self._put(self._queues[index + 1], _DONE)
+
+    def _worker(self, index: int):
+        stage = self.stages[index]
+        source = self._queues[index]
+        target = self._queues[index + 1]
+        metrics = get_default_metrics()
+        try:
+            while True:
+                value = self._get(source)
+                if value is _DONE or self.cancelled.is_set():
+                    return
+                start = time.monotonic()
+                with stage._lock:
+                    if stage.started is None:
+                        stage.started = start
+                try:
+                    output = stage.func(value)
+                except Exception as e:
+                    output = None
+                    with stage._lock:
+                        stage.errors += 1
+                    logger.error(f"流水线阶段{stage.name}处理失败: {str(e)}")
+                elapsed = time.monotonic() - start
+                metrics.observe("stage_seconds", elapsed, stage=stage.name)
+                with stage._lock:
+                    stage.processed += 1
+                    stage.busy += elapsed
+                    if output is not None:
+                        stage.emitted += 1
+                if output is not None and not self._put(target, output):
+                    return
+        finally:
+            self._finish_worker(index)
+
+    def _feed(self, inputs: Iterable[Any]):
+        try:
+            for value in inputs:
+                if not self._put(self._queues[0], value):
+                    return
+        finally:
+            for _ in range(self.stages[0].workers):
+                self._put(self._queues[0], _DONE)
+
+    def run(self, inputs: Iterable[Any], on_result: Optional[Callable[[Any], None]] = None) -> List[Any]:
+        """
+        运行流水线
+
+        Args:
+            inputs: 第一个阶段的输入
+            on_result: 每得到一个最终结果就在调用线程中回调一次
+
+        Returns:
+            List[Any]: 最后一个阶段的输出，按完成顺序排列
+        """
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        # 最终结果由调用线程及时取走，不限制长度
+        self._queues.append(queue.Queue())
+        threads = [threading.Thread(target=self._feed, args=(inputs,), name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=self._worker, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        results = []
+        output = self._queues[-1]
+        while True:
+            if self.deadline is not None and time.monotonic() >= self.deadline and not self.cancelled.is_set():
+                self.timed_out = True
+                logger.warning("流水线到达截止时间，取消剩余任务")
+                self.cancel()
+            for stage, stage_queue in zip(self.stages, self._queues):
+                stage.sample_depth(stage_queue.qsize())
+            try:
+                value = output.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self.cancelled.is_set():
+                    break
+                continue
+            if value is _DONE:
+                break
+            results.append(value)
+            if on_result is not None:
+                on_result(value)
+
+        for thread in threads:
+            # 取消时正在执行的任务（例如网络请求）无法中断，不无限等待
+            thread.join(timeout=None if not self.cancelled.is_set() else _POLL_INTERVAL)
+        return results
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """各阶段统计"""
+        return [stage.stats() for stage in self.stages]
+
+
+def score_candidates(candidates: List[NewsItem], scorer, engine: ScoringEngine,
+                     deadline: Optional[float] = None) -> Tuple[RankedNews, int]:
+    """
+    为候选新闻评分并按综合分数排名
+
+    Args:
+        candidates: 预排序后的候选新闻
+        scorer: 评分器
+        engine: 评分引擎
+        deadline: 截止时间（time.monotonic()），为None时不限制
+
+    Returns:
+        Tuple[RankedNews, int]: (排名靠前的新闻及评分, 评分成功的新闻数)
+    """
+    scores = scorer.score_batch(candidates, deadline) if candidates else []
+    scored = [(item, result) for item, result in zip(candidates, scores) if result is not None]
+    indices, values = engine.rank_arrays(*scores_to_arrays([result for _, result in scored]))
+    return [(*scored[i], value) for i, value in zip(indices.tolist(), values.tolist())], len(scored)
+
+
+def run_analysis_pipeline(asset_types: List[str], target_date: str, logger: Optional[logging.Logger] = None,
+                          scorer=None, use_cache: bool = True, refresh: bool = False, incremental: bool = True,
+                          test: bool = False, top_m: Optional[int] = None, deadline: Optional[float] = None,
+                          on_report: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    以流水线方式获取、评分并生成各资产的报告
+
+    阶段依次为：获取（流式解析、资产内去重并保存）、预排序、模型评分、生成报告。
+    每个资产作为一条输入在各阶段间流动，先获取完的资产先评分、先出报告。
+
+    Args:
+        asset_types: 资产类型列表
+        target_date: 目标日期，格式为YYYYMMDD
+        logger: 日志记录器，如果为None则创建新的
+        scorer: 评分器，如果为None则按MODEL_CONFIG创建
+        use_cache: 是否使用响应缓存和评分缓存
+        refresh: 是否忽略已有缓存强制重新请求
+        incremental: 是否按高水位增量获取
+        test: 是否使用测试数据
+        top_m: 送入模型评分的候选条数，默认使用PRERANK_CONFIG中的top_m
+        deadline: 最长运行时间（秒），默认使用PIPELINE_CONFIG中的deadline，0表示不限制
+        on_report: 每生成一份报告就回调一次，参数为该资产的结果
+
+    Returns:
+        Dict[str, Any]: reports为各资产的结果列表，stages为各阶段统计，timed_out表示是否超时
+    """
+    if logger is None:
+        logger = setup_logging()
+    own_scorer = scorer is None
+    if scorer is None:
+        scorer = create_scorer(use_cache=use_cache)
+    if deadline is None:
+        deadline = PIPELINE_CONFIG.get("deadline", 0)
+    deadline_at = time.monotonic() + deadline if deadline else None
+
+    dedup = DedupIndex()
+    ranker = PreRanker()
+    engine = ScoringEngine()
+    start = time.monotonic()
+
+    def fetch(asset_type: str) -> Dict[str, Any]:
+        if test:
+            news_items = dedup.filter(generate_test_news(asset_type), asset_type)
+        else:
+            news_items = fetch_news(asset_type, target_date, logger, use_cache=use_cache, refresh=refresh,
+                                    incremental=incremental, dedup=dedup)
+        return {"asset_type": asset_type, "news_items": news_items}
+
+    def prerank(job: Dict[str, Any]) -> Dict[str, Any]:
+        job["candidates"] = ranker.select(job["news_items"], job["asset_type"], top_m)
+        return job
+
+    def score(job: Dict[str, Any]) -> Dict[str, Any]:
+        job["ranked"], job["scored_count"] = score_candidates(job["candidates"], scorer, engine, deadline_at)
+        return job
+
+    def report(job: Dict[str, Any]) -> Dict[str, Any]:
+        asset_type = job["asset_type"]
+        analysis = build_report(asset_type, target_date, job["news_items"], job["ranked"], job["scored_count"])
+        return {
+            "asset_type": asset_type,
+            "news_count": len(job["news_items"]),
+            "scored_count": job["scored_count"],
+            "path": save_report(analysis, asset_type, target_date),
+            "elapsed": time.monotonic() - start,
+        }
+
+    pipeline = Pipeline([
+        Stage("fetch", fetch, PIPELINE_CONFIG.get("fetch_workers", 5)),
+        Stage("prerank", prerank, 1),
+        Stage("score", score, PIPELINE_CONFIG.get("score_workers", 1)),
+        Stage("report", report, PIPELINE_CONFIG.get("report_workers", 1)),
+    ], deadline=deadline_at)
+    try:
+        reports = pipeline.run(asset_types, on_report)
+    finally:
+        if own_scorer:
+            scorer.close()
+
+    return {"reports": reports, "stages": pipeline.stats(), "timed_out": pipeline.timed_out,
+            "elapsed": time.monotonic() - start}
+
+
+def print_pipeline_stats(stages: List[Dict[str, Any]]):
+    """打印各阶段统计"""
+    print(f"{'阶段':<8} {'线程':>4} {'处理':>6} {'错误':>4} {'忙碌秒':>8} {'条/秒':>8} {'利用率':>7} {'最大队列':>8} {'平均队列':>8}")
+    for stage in stages:
+        print(f"{stage['name']:<10} {stage['workers']:>4} {stage['processed']:>6} {stage['errors']:>4} "
+              f"{stage['busy_seconds']:>9.2f} {stage['throughput']:>9.2f} {stage['utilization']:>8.0%} "
+              f"{stage['max_queue_depth']:>10} {stage['avg_queue_depth']:>10.2f}")
@@ -0,0 +1,148 @@
+"""
+预排序模块 - 用本地特征为新闻打分，只把排名靠前的候选新闻送入模型评分
+"""
+
+import os
+import sys
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import PRERANK_CONFIG
+from src.models import NewsItem
+from src.keyword_matcher import KeywordMatcher, get_default_matcher
+from src.scoring import top_indices
+
+# 预排序特征名称，与features()返回的列顺序一致
+FEATURE_NAMES = ("sentiment", "keyword", "source", "recency")
+
+
+def _publish_ts(item: NewsItem) -> float:
+    return float(item.publish_ts) if item.publish_ts else math.nan
+
+
+class PreRanker:
+    """
+    预排序器
+
+    每条新闻的预排序分数为四个0到1之间特征的加权和：
+    Alpha Vantage情绪分数的绝对值、资产关键词命中密度、来源权重和按半衰期衰减的时效性。
+    只用已有字段和一次关键词扫描，不需要下载模型，每秒可处理数万条新闻。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, matcher: Optional[KeywordMatcher] = None):
+        """
+        Args:
+            config: 预排序配置，默认使用PRERANK_CONFIG，缺少的键取PRERANK_CONFIG中的值
+            matcher: 关键词匹配器，默认使用ASSET_CONFIG中的关键词
+        """
+        config = {**PRERANK_CONFIG, **(config or {})}
+        self.top_m = int(config["top_m"])
+        self.weights = np.array([
+            config["sentiment_weight"], config["keyword_weight"],
+            config["source_weight"], config["recency_weight"],
+        ], dtype=np.float64)
+        self.sentiment_saturation = float(config["sentiment_saturation"])
+        self.keyword_saturation = float(config["keyword_saturation"])
+        self.half_life = float(config["recency_half_life_hours"]) * 3600
+        self.default_source_weight = float(config["default_source_weight"])
+        self.source_weights = {name.lower(): float(weight) for name, weight in config["source_weights"].items()}
+        self.matcher = matcher or get_default_matcher()
+
+    def features(self, news_items: Sequence[NewsItem], asset_type: Optional[str] = None,
+                 now: Optional[float] = None) -> np.ndarray:
+        """
+        计算特征矩阵
+
+        Args:
+            news_items: 新闻项
+            asset_type: 资产类型，只统计该资产的关键词；为None时统计所有资产的关键词
+            now: 时效性的基准时间（UTC纪元秒），默认使用批次中最新的发布时间
+
+        Returns:
+            np.ndarray: 形状为(条数, 4)的特征矩阵，列顺序见FEATURE_NAMES
+        """
+        count = len(news_items)
+        sentiment = np.fromiter((item.alpha_sentiment for item in news_items), dtype=np.float64, count=count)
+        keyword_hits = np.fromiter(
+            (self._keyword_hits(item, asset_type) for item in news_items), dtype=np.float64, count=count
+        )
+        source = np.fromiter(
+            (self.source_weights.get(item.source.lower(), self.default_source_weight) for item in news_items),
+            dtype=np.float64, count=count,
+        )
+        publish_ts = np.fromiter((_publish_ts(item) for item in news_items), dtype=np.float64, count=count)
+
+        result = np.empty((count, len(FEATURE_NAMES)), dtype=np.float64)
+        result[:, 0] = np.minimum(np.abs(sentiment) / self.sentiment_saturation, 1.0)
+        result[:, 1] = np.minimum(keyword_hits / self.keyword_saturation, 1.0)
+        result[:, 2] = source
+        if count and now is None and not np.isnan(publish_ts).all():
+            now = float(np.nanmax(publish_ts))
+        if now is None:
+            result[:, 3] = 0.0
+        else:
+            age = np.maximum(now - publish_ts, 0.0)
+            # 发布时间未知的新闻时效性记0
+            result[:, 3] = np.nan_to_num(np.exp2(-age / self.half_life), nan=0.0)
+        return result
+
+    def _keyword_hits(self, item: NewsItem, asset_type: Optional[str]) -> int:
+        hits = self.matcher.match_item(item)
+        return hits.get(asset_type, 0) if asset_type else sum(hits.values())
+
+    def score(self, news_items: Sequence[NewsItem], asset_type: Optional[str] = None,
+              now: Optional[float] = None) -> np.ndarray:
+        """
+        计算预排序分数
+
+        Args:
+            news_items: 新闻项
+            asset_type: 资产类型
+            now: 时效性的基准时间（UTC纪元秒）
+
+        Returns:
+            np.ndarray: 预排序分数
+        """
+        if not news_items:
+            return np.empty(0, dtype=np.float64)
+        return self.features(news_items, asset_type, now) @ self.weights
+
+    def rank_indices(self, news_items: Sequence[NewsItem], asset_type: Optional[str] = None,
+                     top_m: Optional[int] = None, now: Optional[float] = None) -> np.ndarray:
+        """
+        预排序分数最高的top_m条新闻的下标
+
+        Args:
+            news_items: 新闻项
+            asset_type: 资产类型
+            top_m: 保留的条数，默认使用配置中的top_m，0表示全部保留
+            now: 时效性的基准时间（UTC纪元秒）
+
+        Returns:
+            np.ndarray: 下标，按预排序分数降序
+        """
+        top_m = self.top_m if top_m is None else top_m
+        scores = self.score(news_items, asset_type, now)
+        return top_indices(scores, top_m if top_m > 0 else len(scores))
+
+    def select(self, news_items: Sequence[NewsItem], asset_type: Optional[str] = None,
+               top_m: Optional[int] = None, now: Optional[float] = None) -> List[NewsItem]:
+        """
+        筛选送入模型评分的候选新闻
+
+        Args:
+            news_items: 新闻项
+            asset_type: 资产类型
+            top_m: 保留的条数，默认使用配置中的top_m，0表示全部保留
+            now: 时效性的基准时间（UTC纪元秒）
+
+        Returns:
+            List[NewsItem]: 候选新闻，按预排序分数降序
+        """
+        return [news_items[i] for i in self.rank_indices(news_items, asset_type, top_m, now).tolist()]
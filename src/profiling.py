@@ -0,0 +1,230 @@
+"""
+性能分析模块 - 运行期间记录cProfile统计、各线程的采样调用栈和各阶段的内存分配，保存到logs下带时间戳的目录
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+import threading
+import contextlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import LOGS_DIR, PROFILE_CONFIG
+
+# 内存分配统计中忽略的文件：分析器、tracemalloc自身和模块导入
+_ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _thread_group(name: str) -> str:
+    """线程池中的线程按名称前缀合并，如pipeline-fetch-0、pipeline-fetch-1合并为pipeline-fetch"""
+    return name.rstrip("0123456789").rstrip("-_") or name
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class Profiler:
+    """
+    运行期性能分析器
+
+    - cProfile：记录启动分析的线程（主线程）中每个函数的调用次数和耗时，保存为profile.pstats
+    - 采样：后台线程按固定间隔采集所有线程的调用栈，以线程名为根合并成折叠栈文件stacks.collapsed，
+      可直接交给flamegraph.pl或speedscope生成火焰图；流水线各阶段的线程名不同，因此各阶段的栈互不混合
+    - tracemalloc：stage()包住的每个阶段结束时记录内存增量最大的分配位置和阶段内的内存峰值
+    """
+
+    def __init__(self, out_dir: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            out_dir: 结果目录，默认为LOGS_DIR下的profile_<时间>
+            config: 分析配置，默认使用PROFILE_CONFIG
+        """
+        self.config = {**PROFILE_CONFIG, **(config or {})}
+        self.out_dir = out_dir or os.path.join(LOGS_DIR, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.enabled = True
+        self.stages: List[Dict[str, Any]] = []
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._profile = cProfile.Profile()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def start(self):
+        """开始记录"""
+        tracemalloc.start(self.config["tracemalloc_frames"])
+        self._started = time.perf_counter()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        self._profile.enable()
+
+    def _sample_loop(self):
+        interval = self.config["sample_interval"]
+        max_depth = self.config["max_stack_depth"]
+        own = threading.get_ident()
+        while not self._stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(_thread_group(names.get(ident, str(ident))))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        记录一个阶段的耗时和内存分配
+
+        阶段应在同一线程中依次执行；同时运行的多个阶段的内存分配会互相计入。
+
+        Args:
+            name: 阶段名称
+        """
+        with self._lock:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+            current_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+                top = after.compare_to(before, "lineno")[:self.config["top_allocators"]]
+                self.stages.append({
+                    "name": name,
+                    "elapsed": elapsed,
+                    "memory_delta_bytes": current - current_before,
+                    "peak_bytes": peak,
+                    "top_allocators": [
+                        {
+                            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                            "size_diff": stat.size_diff,
+                            "size": stat.size,
+                            "count_diff": stat.count_diff,
+                        }
+                        for stat in top
+                    ],
+                })
+
+    def stop(self) -> str:
+        """
+        停止记录并写入结果
+
+        Returns:
+            str: 结果目录
+        """
+        self._profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._elapsed = time.perf_counter() - self._started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._profile.dump_stats(os.path.join(self.out_dir, "profile.pstats"))
+        with open(os.path.join(self.out_dir, "profile.txt"), "w", encoding="utf-8") as f:
+            stats = pstats.Stats(self._profile, stream=f)
+            stats.sort_stats("cumulative").print_stats(self.config["top_functions"])
+            stats.sort_stats("tottime").print_stats(self.config["top_functions"])
+
+        with open(os.path.join(self.out_dir, "stacks.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        with open(os.path.join(self.out_dir, "memory.txt"), "w", encoding="utf-8") as f:
+            for stage in self.stages:
+                f.write(f"== {stage['name']}: {stage['elapsed']:.3f} 秒，内存增量 "
+                        f"{stage['memory_delta_bytes'] / 1024:.1f} KiB，峰值 {stage['peak_bytes'] / 1024:.1f} KiB\n")
+                for allocator in stage["top_allocators"]:
+                    f.write(f"{allocator['size_diff'] / 1024:>+12.1f} KiB {allocator['count_diff']:>+9} 个  "
+                            f"{allocator['location']}\n")
+                f.write("\n")
+
+        summary = {
+            "elapsed": self._elapsed,
+            "argv": sys.argv,
+            "sample_interval": self.config["sample_interval"],
+            "samples": self.sample_count,
+            "traced_memory_bytes": current,
+            "traced_peak_bytes": peak,
+            "stages": self.stages,
+        }
+        with open(os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return self.out_dir
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class _DisabledProfiler:
+    """未开启性能分析时使用，stage()不做任何记录"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return contextlib.nullcontext()
+
+
+_default_profiler = None
+_default_profiler_lock = threading.Lock()
+
+
+def get_default_profiler():
+    """
+    获取当前的性能分析器
+
+    Returns:
+        未开启时返回不做记录的分析器，调用点可以直接使用stage()
+    """
+    global _default_profiler
+    with _default_profiler_lock:
+        if _default_profiler is None:
+            _default_profiler = _DisabledProfiler()
+        return _default_profiler
+
+
+def set_default_profiler(profiler: Optional[Profiler]):
+    """
+    替换当前的性能分析器
+
+    Args:
+        profiler: 新的分析器，为None时恢复为不做记录的分析器
+    """
+    global _default_profiler
+    with _default_profiler_lock:
+        _default_profiler = profiler
@@ -0,0 +1,312 @@
+"""
+请求调度模块 - 按Alpha Vantage配额调度请求，并在限流时退避重试
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+import requests
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import RATE_LIMIT_CONFIG, SYSTEM_CONFIG
+
+logger = logging.getLogger("news_fetcher.rate_limiter")
+
+T = TypeVar("T")
+
+
+class RateLimitError(Exception):
+    """API返回限流提示（Note/Information）而不是数据"""
+
+
+class QuotaExceededError(Exception):
+    """当日配额已用尽"""
+
+
+# 限流提示中的措辞；无效或demo密钥、付费接口等提示同样放在"Information"中，但重试不会成功
+_RATE_LIMIT_PHRASES = ("rate limit", "call frequency", "spreading out", "per second", "per minute", "per day")
+
+
+def is_rate_limited(data: Any) -> bool:
+    """
+    判断响应是否为限流提示
+
+    Alpha Vantage在超出频率或每日配额时仍返回HTTP 200，
+    响应体只包含"Note"或"Information"字段而没有"feed"。
+    这两个字段也用于无效密钥、demo密钥和付费接口等提示，只有提示内容是频率或每日配额时才视为限流。
+
+    Args:
+        data: 解析后的响应JSON
+
+    Returns:
+        bool: 是否为限流响应
+    """
+    if not isinstance(data, dict) or "feed" in data:
+        return False
+    message = str(data.get("Note") or data.get("Information") or "").lower()
+    return any(phrase in message for phrase in _RATE_LIMIT_PHRASES)
+
+
+def is_retryable(error: Exception) -> bool:
+    """限流和网络错误可以重试；除429外的4xx响应（参数或密钥错误）重试也不会成功"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or not 400 <= status < 500
+    return True
+
+
+def is_daily_limit(data: Dict[str, Any]) -> bool:
+    """判断限流提示是否为每日配额耗尽"""
+    message = str(data.get("Note") or data.get("Information") or "").lower()
+    return "per day" in message or "daily" in message
+
+
+class SlidingWindowLimiter:
+    """
+    线程安全的滑动窗口限流器
+
+    记录最近window秒内每次放行的时间，任意window秒内放行的次数都不超过limit，
+    不会像容量等于配额的令牌桶那样在突发之后又按补充速率放行，导致一分钟内接近两倍配额。
+    """
+
+    def __init__(self, limit: int, window: float = 60.0):
+        """
+        Args:
+            limit: 窗口内最多放行的次数，0表示不限制
+            window: 窗口长度（秒）
+        """
+        self.limit = limit
+        self.window = window
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """登记一次调用，窗口内次数已满时阻塞等待最早的一次移出窗口"""
+        if self.limit <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.limit:
+                    self._calls.append(now)
+                    return
+                wait = self._calls[0] + self.window - now
+            time.sleep(wait)
+
+
+class QuotaScheduler:
+    """
+    配额调度器
+
+    用滑动窗口保证任意60秒内的请求数不超过每分钟配额，并在状态文件中记录当日已用次数，
+    使多次运行共享同一个每日配额。遇到限流响应或网络错误时按带抖动的指数退避重试。
+    """
+
+    def __init__(self, per_minute: Optional[int] = None, per_day: Optional[int] = None,
+                 retry_count: Optional[int] = None, retry_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, state_file: Optional[str] = None):
+        """
+        Args:
+            per_minute: 每分钟最大请求数
+            per_day: 每日最大请求数，0表示不限制
+            retry_count: 最大重试次数，默认使用SYSTEM_CONFIG中的retry_count
+            retry_delay: 首次重试的基础间隔（秒），默认使用SYSTEM_CONFIG中的retry_delay
+            max_delay: 单次退避的最大间隔（秒）
+            state_file: 每日用量状态文件，为None时不持久化
+        """
+        self.per_minute = per_minute if per_minute is not None else RATE_LIMIT_CONFIG["requests_per_minute"]
+        self.per_day = per_day if per_day is not None else RATE_LIMIT_CONFIG["requests_per_day"]
+        self.retry_count = retry_count if retry_count is not None else SYSTEM_CONFIG["retry_count"]
+        self.retry_delay = retry_delay if retry_delay is not None else SYSTEM_CONFIG["retry_delay"]
+        self.max_delay = max_delay if max_delay is not None else RATE_LIMIT_CONFIG["max_backoff"]
+        self.state_file = state_file
+
+        # 窗口多留1秒，抵消各请求到达服务端的延迟差异
+        self.limiter = SlidingWindowLimiter(self.per_minute, 61.0)
+        self._lock = threading.Lock()
+        self._day, self._used = self._load_state()
+        self.rate_limited = 0
+        self.retries = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+    def _load_state(self) -> Tuple[str, int]:
+        today = self._today()
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                if state.get("date") == today:
+                    return today, int(state.get("used", 0))
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取配额状态文件失败: {str(e)}")
+        return today, 0
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump({"date": self._day, "used": self._used}, f)
+
+    @property
+    def used_today(self) -> int:
+        """当日已用请求数"""
+        with self._lock:
+            if self._day != self._today():
+                self._day, self._used = self._today(), 0
+            return self._used
+
+    def remaining_today(self) -> Optional[int]:
+        """当日剩余请求数，不限制时返回None"""
+        if not self.per_day:
+            return None
+        return max(0, self.per_day - self.used_today)
+
+    def acquire(self, count_daily: bool = True):
+        """
+        为一次请求占用配额
+
+        Args:
+            count_daily: 是否计入当日用量；同一次调用的重试只占用每分钟配额
+
+        Raises:
+            QuotaExceededError: 当日配额已用尽
+        """
+        if count_daily:
+            with self._lock:
+                if self._day != self._today():
+                    self._day, self._used = self._today(), 0
+                if self.per_day and self._used >= self.per_day:
+                    raise QuotaExceededError(f"当日配额已用尽 ({self._used}/{self.per_day})")
+                self._used += 1
+                self._save_state()
+        self.limiter.acquire()
+
+    def exhaust_today(self):
+        """服务端提示每日配额用尽时，同步本地计数"""
+        with self._lock:
+            if self.per_day:
+                self._used = max(self._used, self.per_day)
+                self._save_state()
+
+    def backoff(self, attempt: int) -> float:
+        """第attempt次重试前的等待时间（指数退避，带±50%抖动）"""
+        delay = min(self.max_delay, self.retry_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        在配额限制下调用func，限流、网络错误、429或5xx响应时重试，其他4xx响应直接抛出
+
+        Args:
+            func: 发送请求并返回解析后JSON的函数
+
+        Returns:
+            func的返回值
+
+        Raises:
+            QuotaExceededError: 当日配额已用尽
+            RateLimitError: 重试次数用尽后仍被限流
+            requests.RequestException: 重试次数用尽后仍出现网络错误
+        """
+        attempt = 0
+        while True:
+            self.acquire(count_daily=attempt == 0)
+            try:
+                result = func()
+                if is_rate_limited(result):
+                    with self._lock:
+                        self.rate_limited += 1
+                    if is_daily_limit(result):
+                        self.exhaust_today()
+                        raise QuotaExceededError(str(result.get("Note") or result.get("Information")))
+                    raise RateLimitError(str(result.get("Note") or result.get("Information")))
+                return result
+            except (RateLimitError, requests.RequestException) as e:
+                if attempt >= self.retry_count or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"请求失败({str(e)[:80]})，{delay:.1f}秒后第{attempt}次重试")
+                time.sleep(delay)
+
+    def plan(self, jobs: List[T], key: Callable[[T], Hashable],
+             priority: Optional[Callable[[T], Any]] = None) -> Tuple[List[T], List[T]]:
+        """
+        整理待发送的请求队列
+
+        去掉参数相同的重复请求，按优先级排序，并把超出当日剩余配额的请求推迟，
+        避免发出注定被限流的调用。
+
+        Args:
+            jobs: 待发送的请求
+            key: 返回请求去重键的函数，通常为规范化后的请求参数
+            priority: 排序键函数，值越小越先发送；为None时保持原顺序
+
+        Returns:
+            Tuple[List, List]: (本次发送的请求, 推迟的请求)
+        """
+        seen = set()
+        unique = []
+        for job in jobs:
+            job_key = key(job)
+            if job_key in seen:
+                continue
+            seen.add(job_key)
+            unique.append(job)
+
+        if priority is not None:
+            unique.sort(key=priority)
+
+        remaining = self.remaining_today()
+        if remaining is None:
+            return unique, []
+        return unique[:remaining], unique[remaining:]
+
+
+_default_scheduler: Optional[QuotaScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> QuotaScheduler:
+    """
+    获取进程内共享的调度器
+
+    Returns:
+        QuotaScheduler: 使用RATE_LIMIT_CONFIG配置的调度器
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = QuotaScheduler(state_file=RATE_LIMIT_CONFIG.get("state_file"))
+        return _default_scheduler
+
+
+def set_default_scheduler(scheduler: Optional[QuotaScheduler]):
+    """
+    替换默认调度器
+
+    Args:
+        scheduler: 新的默认调度器，为None时在下次获取时重新创建
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        _default_scheduler = scheduler
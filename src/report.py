@@ -0,0 +1,128 @@
+"""
+报告模块 - 根据新闻和模型评分生成分析报告并保存到REPORTS_DIR
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import ASSET_CONFIG, REPORTS_DIR
+from src.models import AnalysisReport, NewsItem, NewsScore
+from src.metrics import get_default_metrics
+
+# (新闻, 模型评分, 综合分数)，按综合分数降序
+RankedNews = List[Tuple[NewsItem, NewsScore, float]]
+
+# 模型情绪分数超过该值视为利好，低于其相反数视为利空
+SENTIMENT_NEUTRAL_BAND = 0.1
+
+
+def _sentiment_label(value: float) -> str:
+    if value > SENTIMENT_NEUTRAL_BAND:
+        return "利好"
+    if value < -SENTIMENT_NEUTRAL_BAND:
+        return "利空"
+    return "中性"
+
+
+def build_report(asset_type: str, target_date: str, news_items: Sequence[NewsItem],
+                 ranked: RankedNews, scored_count: int) -> AnalysisReport:
+    """
+    生成分析报告
+
+    Args:
+        asset_type: 资产类型
+        target_date: 日期，格式为YYYYMMDD
+        news_items: 当天的全部新闻
+        ranked: 排名靠前的新闻及评分
+        scored_count: 模型评分成功的新闻数
+
+    Returns:
+        AnalysisReport: 分析报告
+    """
+    asset_name = ASSET_CONFIG[asset_type]["asset_name"]
+    date = datetime.strptime(target_date, "%Y%m%d").strftime("%Y-%m-%d")
+
+    labels = [_sentiment_label(item.alpha_sentiment) for item in news_items]
+    avg_alpha = sum(item.alpha_sentiment for item in news_items) / len(news_items) if news_items else 0.0
+    market_overview = (
+        f"{date}共获取{len(news_items)}条{asset_name}相关新闻，Alpha Vantage平均情绪分数{avg_alpha:.2f}，"
+        f"其中利好{labels.count('利好')}条、利空{labels.count('利空')}条、中性{labels.count('中性')}条。"
+        f"模型评分{scored_count}条，{len(ranked)}条进入重要新闻排名。"
+    )
+
+    if ranked:
+        lines = []
+        for i, (item, score, value) in enumerate(ranked, 1):
+            lines.append(f"{i}. **{item.title}**（{item.source}，{item.publish_time}）  ")
+            lines.append(f"   情绪 {score.sentiment_score:+.2f}，重要性 {score.impact_score:.0f}，综合 {value:.1f}。"
+                         f"{score.summary}")
+        news_summary = "\n".join(lines)
+    else:
+        news_summary = "暂无达到重要性阈值的新闻。"
+
+    total_impact = sum(score.impact_score for _, score, _ in ranked)
+    weighted = (
+        sum(score.sentiment_score * score.impact_score for _, score, _ in ranked) / total_impact
+        if total_impact else 0.0
+    )
+    ranked_labels = [_sentiment_label(score.sentiment_score) for _, score, _ in ranked]
+    market_analysis = (
+        f"重要新闻中利好{ranked_labels.count('利好')}条、利空{ranked_labels.count('利空')}条、"
+        f"中性{ranked_labels.count('中性')}条，按重要性加权的平均情绪为{weighted:+.2f}。"
+    )
+
+    if not ranked:
+        conclusion = f"{date}{asset_name}市场缺少重要新闻，建议维持原有判断。"
+    elif weighted > 2 * SENTIMENT_NEUTRAL_BAND:
+        conclusion = f"{date}{asset_name}市场新闻面整体偏多。"
+    elif weighted < -2 * SENTIMENT_NEUTRAL_BAND:
+        conclusion = f"{date}{asset_name}市场新闻面整体偏空。"
+    else:
+        conclusion = f"{date}{asset_name}市场新闻面多空交织，整体中性。"
+
+    return AnalysisReport(
+        title=f"{asset_name}市场新闻分析 {date}",
+        date=date,
+        asset_name=asset_name,
+        market_overview=market_overview,
+        news_summary=news_summary,
+        market_analysis=market_analysis,
+        conclusion=conclusion,
+    )
+
+
+def report_path(asset_type: str, target_date: str, reports_dir: str = REPORTS_DIR) -> str:
+    """报告文件路径：REPORTS_DIR/<report_prefix>_<日期>.md"""
+    return os.path.join(reports_dir, f"{ASSET_CONFIG[asset_type]['report_prefix']}_{target_date}.md")
+
+
+def save_report(report: AnalysisReport, asset_type: str, target_date: str, reports_dir: str = REPORTS_DIR) -> str:
+    """
+    保存报告为Markdown文件
+
+    Args:
+        report: 分析报告
+        asset_type: 资产类型
+        target_date: 日期，格式为YYYYMMDD
+        reports_dir: 报告目录
+
+    Returns:
+        str: 报告文件路径
+    """
+    metrics = get_default_metrics()
+    os.makedirs(reports_dir, exist_ok=True)
+    path = report_path(asset_type, target_date, reports_dir)
+    tmp_path = f"{path}.tmp"
+    with metrics.time("serialize_seconds", model="AnalysisReport", op="to_markdown"):
+        text = report.to_markdown()
+    with metrics.time("file_write_seconds", kind="report"):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,337 @@
+"""
+响应缓存模块 - 按规范化请求参数缓存Alpha Vantage原始响应
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Optional
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import CACHE_CONFIG
+
+logger = logging.getLogger("news_fetcher.response_cache")
+
+# 参与缓存键计算的请求参数，apikey等与结果无关的参数不参与
+CACHE_KEY_PARAMS = ("function", "keywords", "tickers", "topics", "sort", "limit", "time_from", "time_to")
+
+# put()未指定ttl时的占位值，与None（永久有效）区分
+_AUTO_TTL = object()
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    规范化请求参数
+
+    关键词顺序和大小写不影响结果，因此排序并转为小写；其他参数统一转为字符串。
+
+    Args:
+        params: 原始请求参数
+
+    Returns:
+        Dict[str, str]: 规范化后的参数
+    """
+    normalized = {}
+    for name in CACHE_KEY_PARAMS:
+        value = params.get(name)
+        if value is None or value == "":
+            continue
+        if name in ("keywords", "tickers", "topics"):
+            parts = {part.strip().lower() for part in str(value).split(",") if part.strip()}
+            value = ",".join(sorted(parts))
+        normalized[name] = str(value)
+    return normalized
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """计算请求参数的缓存键"""
+    payload = json.dumps(normalize_params(params), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ttl_for_params(params: Dict[str, Any], default_ttl: Optional[float]) -> Optional[float]:
+    """
+    计算缓存有效期
+
+    时间窗口在今天（UTC）之前结束的查询结果不会再变化，永久缓存。
+
+    Args:
+        params: 请求参数
+        default_ttl: 默认有效期（秒）
+
+    Returns:
+        Optional[float]: 有效期（秒），None表示永久有效
+    """
+    time_to = params.get("time_to")
+    if time_to:
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        if str(time_to)[:8] < today:
+            return None
+    return default_ttl
+
+
+class ResponseCache:
+    """
+    基于文件的响应缓存
+
+    每个条目由原始响应体<key>.json和元数据<key>.meta组成，按缓存键前两位分目录存放。
+    命中时更新文件修改时间，总大小超过上限时按最近最少使用淘汰。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            default_ttl: 默认有效期（秒）
+        """
+        self.cache_dir = cache_dir or CACHE_CONFIG["response_cache_dir"]
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_CONFIG["response_cache_max_mb"] * 1024 * 1024
+        self.default_ttl = default_ttl if default_ttl is not None else CACHE_CONFIG["response_cache_ttl"]
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = self._scan_size()
+
+    def _paths(self, key: str):
+        subdir = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(subdir, f"{key}.json"), os.path.join(subdir, f"{key}.meta")
+
+    def _scan_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    total += os.path.getsize(os.path.join(root, name))
+        return total
+
+    def _read_meta(self, meta_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def path_for(self, params: Dict[str, Any]) -> Optional[str]:
+        """
+        获取未过期条目的响应体文件路径
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            Optional[str]: 响应体文件路径，不存在或已过期时返回None
+        """
+        body_path, meta_path = self._paths(cache_key(params))
+        meta = self._read_meta(meta_path)
+        if meta is None or not os.path.exists(body_path):
+            return None
+        expires = meta.get("expires")
+        if expires is not None and expires < time.time():
+            self._remove(body_path, meta_path)
+            return None
+        return body_path
+
+    def contains(self, params: Dict[str, Any]) -> bool:
+        """是否存在未过期的条目"""
+        return self.path_for(params) is not None
+
+    def open(self, params: Dict[str, Any]) -> Optional[BinaryIO]:
+        """
+        打开缓存的响应体，供流式读取
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            Optional[BinaryIO]: 以二进制模式打开的响应体文件，未命中时返回None
+        """
+        body_path = self.path_for(params)
+        if body_path is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            f = open(body_path, "rb")
+            # 更新修改时间，作为LRU的访问时间
+            os.utime(body_path, None)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return f
+
+    def get(self, params: Dict[str, Any]) -> Optional[bytes]:
+        """
+        读取缓存的响应体
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            Optional[bytes]: 原始响应体，未命中时返回None
+        """
+        f = self.open(params)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def spool_path(self, params: Dict[str, Any]) -> str:
+        """
+        获取与缓存条目位于同一目录的临时文件路径
+
+        响应体可以边下载边写入该文件，完成后由commit原子地替换到缓存中，无需在内存中保留完整响应体。
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            str: 临时文件路径
+        """
+        body_path, _ = self._paths(cache_key(params))
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        return f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def put(self, params: Dict[str, Any], body: bytes, ttl: Any = _AUTO_TTL):
+        """
+        写入缓存
+
+        Args:
+            params: 请求参数
+            body: 原始响应体
+            ttl: 有效期（秒），None表示永久有效，默认按ttl_for_params计算
+        """
+        # 先写临时文件再替换，避免并发读取到不完整的内容
+        tmp_path = self.spool_path(params)
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        self.commit(params, tmp_path, ttl)
+
+    def commit(self, params: Dict[str, Any], tmp_path: str, ttl: Any = _AUTO_TTL):
+        """
+        把已写完的临时文件作为缓存条目
+
+        Args:
+            params: 请求参数
+            tmp_path: spool_path返回的临时文件路径
+            ttl: 有效期（秒），None表示永久有效，默认按ttl_for_params计算
+        """
+        if ttl is _AUTO_TTL:
+            ttl = ttl_for_params(params, self.default_ttl)
+        body_path, meta_path = self._paths(cache_key(params))
+
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+        size = os.path.getsize(tmp_path)
+        now = time.time()
+        meta = {
+            "params": normalize_params(params),
+            "created": now,
+            "expires": None if ttl is None else now + ttl,
+            "size": size,
+        }
+
+        os.replace(tmp_path, body_path)
+        meta_tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_tmp, meta_path)
+
+        with self._lock:
+            self._total_bytes += size - old_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _remove(self, body_path: str, meta_path: str):
+        size = 0
+        try:
+            size = os.path.getsize(body_path)
+            os.remove(body_path)
+        except OSError:
+            pass
+        try:
+            os.remove(meta_path)
+        except OSError:
+            pass
+        with self._lock:
+            self._total_bytes -= size
+
+    def evict(self):
+        """按最近最少使用淘汰条目，直到总大小低于上限"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path))
+        entries.sort()
+
+        for _, body_path in entries:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes:
+                    break
+            meta_path = body_path[:-len(".json")] + ".meta"
+            self._remove(body_path, meta_path)
+            logger.debug(f"淘汰缓存条目: {body_path}")
+
+    def clear(self):
+        """清空缓存"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith((".json", ".meta")):
+                    os.remove(os.path.join(root, name))
+        with self._lock:
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """当前缓存总大小（字节）"""
+        with self._lock:
+            return self._total_bytes
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """
+    获取进程内共享的响应缓存
+
+    Returns:
+        ResponseCache: 使用CACHE_CONFIG配置的缓存
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def set_default_cache(cache: Optional[ResponseCache]):
+    """
+    替换默认缓存
+
+    Args:
+        cache: 新的默认缓存，为None时在下次获取时重新创建
+    """
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -0,0 +1,293 @@
+"""
+评分缓存模块 - 按新闻内容、模型和提示词版本缓存模型评分，避免重复推理
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import contextlib
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import SCORE_CACHE_CONFIG
+from src.models import NewsItem, NewsScore
+
+logger = logging.getLogger("news_fetcher.score_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    key TEXT PRIMARY KEY,
+    sentiment_score REAL NOT NULL,
+    impact_score REAL NOT NULL,
+    relevance_score REAL NOT NULL,
+    summary TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_accessed ON scores (accessed);
+"""
+
+# 每写入多少条检查一次是否超出容量
+_EVICT_CHECK_INTERVAL = 1000
+
+# SQLite单条语句的参数个数上限较低，按块查询
+_QUERY_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化新闻文本：NFKC、忽略大小写，标点、符号和连续空白替换为一个空格
+
+    所有文字的字母、数字和组合符号都原样保留，不同语言的不同报道不会得到相同的结果。
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join("".join(ch if unicodedata.category(ch)[0] in "LMN" else " " for ch in text).split())
+
+
+def score_key(item: NewsItem, model: str, prompt_version: str, temperature: float,
+              generation: Optional[Dict[str, Any]] = None) -> str:
+    """
+    计算评分缓存键
+
+    标题和正文规范化后参与哈希，大小写、标点和空白不同的转载得到相同的键；
+    模型、提示词、温度或生成参数变化时键随之变化，旧评分自然失效。
+
+    Args:
+        item: 新闻项
+        model: 模型名称
+        prompt_version: 提示词版本，应由提示词模板的哈希得到
+        temperature: 采样温度
+        generation: 影响输出的其他生成参数，如最大生成token数和推理精度
+
+    Returns:
+        str: 十六进制SHA-256
+    """
+    text = normalize_text(f"{item.title}\n{item.content}")
+    payload = json.dumps([text, model, prompt_version, round(float(temperature), 4), generation or {}],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    基于SQLite的评分缓存
+
+    以内容键为主键保存情绪、重要性、相关度和摘要，不保存标题，取出时使用调用方新闻的标题。
+    开启WAL，多个线程和进程可以同时读写（内存数据库由所有线程共用一个连接）；条数超过上限时按最近访问时间淘汰最旧的10%。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            path: 数据库文件路径，默认使用SCORE_CACHE_CONFIG中的path
+            max_entries: 最多缓存的条数，默认使用SCORE_CACHE_CONFIG中的max_entries
+        """
+        self.path = path or SCORE_CACHE_CONFIG["path"]
+        self.max_entries = max_entries if max_entries is not None else SCORE_CACHE_CONFIG["max_entries"]
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes_since_check = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # 内存数据库只存在于创建它的连接中，所有线程共用一个连接，写事务需要串行
+        self._write_lock = threading.RLock() if self.path == ":memory:" else contextlib.nullcontext()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                if self.path == ":memory:" and self._connections:
+                    # 每个新连接都会打开一个空的内存数据库，其他线程复用第一个连接（sqlite3可跨线程使用同一连接）
+                    conn = self._connections[0]
+                else:
+                    conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Sequence[str], titles: Sequence[str]) -> List[Optional[NewsScore]]:
+        """
+        批量查询评分
+
+        Args:
+            keys: 缓存键
+            titles: 与键一一对应的新闻标题
+
+        Returns:
+            List[Optional[NewsScore]]: 与keys一一对应的评分，未命中的位置为None
+        """
+        if not keys:
+            return []
+        unique = list(dict.fromkeys(keys))
+        rows: Dict[str, Tuple[float, float, float, str]] = {}
+        conn = self.connection
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            chunk = unique[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, *values in conn.execute(
+                f"SELECT key, sentiment_score, impact_score, relevance_score, summary "
+                f"FROM scores WHERE key IN ({placeholders})", chunk
+            ):
+                rows[key] = tuple(values)
+
+        if rows:
+            now = time.time()
+            with self._write_lock, conn:
+                conn.executemany("UPDATE scores SET accessed = ? WHERE key = ?", [(now, key) for key in rows])
+
+        results = []
+        for key, title in zip(keys, titles):
+            row = rows.get(key)
+            results.append(None if row is None else NewsScore(title, *row))
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def get(self, key: str, title: str) -> Optional[NewsScore]:
+        """查询单条评分，未命中时返回None"""
+        return self.get_many([key], [title])[0]
+
+    def put_many(self, entries: Iterable[Tuple[str, NewsScore]], model: str, prompt_version: str) -> int:
+        """
+        批量写入评分，键相同时覆盖
+
+        Args:
+            entries: (缓存键, 评分)
+            model: 模型名称
+            prompt_version: 提示词版本
+
+        Returns:
+            int: 写入的条数
+        """
+        now = time.time()
+        rows = [
+            (key, score.sentiment_score, score.impact_score, score.relevance_score, score.summary,
+             model, prompt_version, now, now)
+            for key, score in entries
+        ]
+        if not rows:
+            return 0
+        conn = self.connection
+        with self._write_lock, conn:
+            conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        with self._lock:
+            self._writes_since_check += len(rows)
+            check = self._writes_since_check >= _EVICT_CHECK_INTERVAL
+            if check:
+                self._writes_since_check = 0
+        if check:
+            self.evict()
+        return len(rows)
+
+    def put(self, key: str, score: NewsScore, model: str, prompt_version: str):
+        """写入单条评分"""
+        self.put_many([(key, score)], model, prompt_version)
+
+    def evict(self) -> int:
+        """
+        条数超过上限时淘汰最近最少访问的条目，降到上限的90%
+
+        Returns:
+            int: 淘汰的条数
+        """
+        conn = self.connection
+        count = len(self)
+        if count <= self.max_entries:
+            return 0
+        excess = count - int(self.max_entries * 0.9)
+        with self._write_lock, conn:
+            conn.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY accessed LIMIT ?)", (excess,)
+            )
+        with self._lock:
+            self.evictions += excess
+        logger.info(f"评分缓存超过 {self.max_entries} 条，淘汰 {excess} 条最久未使用的评分")
+        return excess
+
+    def clear(self):
+        """清空缓存"""
+        conn = self.connection
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM scores")
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def __enter__(self) -> "ScoreCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_score_cache: Optional[ScoreCache] = None
+_default_score_cache_lock = threading.Lock()
+
+
+def get_default_score_cache() -> ScoreCache:
+    """
+    获取进程内共享的评分缓存
+
+    Returns:
+        ScoreCache: 使用SCORE_CACHE_CONFIG配置的缓存
+    """
+    global _default_score_cache
+    with _default_score_cache_lock:
+        if _default_score_cache is None:
+            _default_score_cache = ScoreCache()
+        return _default_score_cache
+
+
+def set_default_score_cache(cache: Optional[ScoreCache]):
+    """
+    替换默认评分缓存
+
+    Args:
+        cache: 新的默认缓存，为None时在下次获取时重新创建
+    """
+    global _default_score_cache
+    with _default_score_cache_lock:
+        _default_score_cache = cache
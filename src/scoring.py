@@ -0,0 +1,263 @@
+"""
+评分模块 - 按SCORING_CONFIG计算综合分数、过滤低重要性新闻并选出排名靠前的新闻
+"""
+
+import os
+import sys
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import SCORING_CONFIG
+from src.models import NewsScore
+from src.news_batch import NewsBatch
+
+# 分块排名时每块的条数，两列float64约1MB，能放进L2缓存
+RANK_BLOCK_SIZE = 1 << 16
+
+
+def scores_to_arrays(scores: Sequence[NewsScore]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把NewsScore列表转换为情绪分数和重要性分数数组
+
+    Args:
+        scores: 评分列表
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (情绪分数, 重要性分数)，float64
+    """
+    count = len(scores)
+    sentiment = np.fromiter((score.sentiment_score for score in scores), dtype=np.float64, count=count)
+    impact = np.fromiter((score.impact_score for score in scores), dtype=np.float64, count=count)
+    return sentiment, impact
+
+
+def top_indices(values: np.ndarray, k: int, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    取值最大的k个元素的下标，按值从大到小排列
+
+    先用argpartition在O(n)内找出前k个，只对这k个排序。
+
+    Args:
+        values: 数值数组
+        k: 数量
+        candidates: 候选下标，为None时考虑全部元素
+
+    Returns:
+        np.ndarray: 下标数组，值相同时下标小的在前
+    """
+    if candidates is None:
+        candidates = np.arange(len(values))
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    selected = values[candidates]
+    if len(candidates) > k:
+        # 第k大的值；与它相等的元素全部保留，排序后再截断，保证并列时下标小的在前
+        kth = selected[np.argpartition(-selected, k - 1)[k - 1]]
+        keep = selected >= kth
+        candidates = candidates[keep]
+        selected = selected[keep]
+    # 按值降序、下标升序排列
+    order = np.lexsort((candidates, -selected))[:k]
+    return candidates[order]
+
+
+class ScoringEngine:
+    """
+    评分引擎
+
+    综合分数 = sentiment_weight * |情绪分数| * sentiment_scale + importance_weight * 重要性分数，
+    情绪方向不影响排名，强烈利好和强烈利空同样重要。
+    重要性分数低于min_importance_threshold或尚未评分（NaN）的新闻不参与排名。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 评分配置，默认使用SCORING_CONFIG，缺少的键取SCORING_CONFIG中的值
+        """
+        config = {**SCORING_CONFIG, **(config or {})}
+        self.sentiment_weight = float(config["sentiment_weight"])
+        self.importance_weight = float(config["importance_weight"])
+        self.min_importance = float(config["min_importance_threshold"])
+        self.top_n = int(config["top_news_count"])
+        self.sentiment_scale = float(config.get("sentiment_scale", 100.0))
+
+    def composite(self, sentiment: np.ndarray, impact: np.ndarray) -> np.ndarray:
+        """
+        计算综合分数
+
+        Args:
+            sentiment: 情绪分数数组
+            impact: 重要性分数数组
+
+        Returns:
+            np.ndarray: 综合分数
+        """
+        result = np.abs(sentiment)
+        result *= self.sentiment_weight * self.sentiment_scale
+        result += self.importance_weight * impact
+        return result
+
+    def passing(self, impact: np.ndarray) -> np.ndarray:
+        """重要性达到阈值的下标（NaN不满足比较条件，自动排除）"""
+        return np.flatnonzero(impact >= self.min_importance)
+
+    def _rank_block(self, sentiment: np.ndarray, impact: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+        candidates = self.passing(impact)
+        composite = self.composite(sentiment[candidates], impact[candidates])
+        order = top_indices(composite, top_n)
+        return candidates[order], composite[order]
+
+    def rank_arrays(self, sentiment: np.ndarray, impact: np.ndarray,
+                    top_n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        对数组形式的评分排名
+
+        大数组按能放进CPU缓存的块分别取前top_n条，再在各块的结果中取最终的前top_n条，
+        比一次处理整个数组少了大量内存往返。
+
+        Args:
+            sentiment: 情绪分数数组
+            impact: 重要性分数数组
+            top_n: 返回的数量，默认使用top_news_count
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (排名靠前的下标, 对应的综合分数)，按综合分数降序
+        """
+        top_n = self.top_n if top_n is None else top_n
+        if len(impact) <= RANK_BLOCK_SIZE:
+            return self._rank_block(sentiment, impact, top_n)
+
+        block_indices = []
+        block_values = []
+        for start in range(0, len(impact), RANK_BLOCK_SIZE):
+            end = start + RANK_BLOCK_SIZE
+            indices, values = self._rank_block(sentiment[start:end], impact[start:end], top_n)
+            block_indices.append(indices + start)
+            block_values.append(values)
+        indices = np.concatenate(block_indices)
+        values = np.concatenate(block_values)
+        # 各块结果按下标递增拼接，top_indices在分数相同时仍保持下标小的在前
+        order = top_indices(values, top_n)
+        return indices[order], values[order]
+
+    def rank(self, scores: Sequence[NewsScore], top_n: Optional[int] = None) -> List[Tuple[NewsScore, float]]:
+        """
+        对NewsScore列表排名
+
+        Args:
+            scores: 评分列表
+            top_n: 返回的数量，默认使用top_news_count
+
+        Returns:
+            List[Tuple[NewsScore, float]]: (评分, 综合分数)列表，按综合分数降序
+        """
+        indices, composite = self.rank_arrays(*scores_to_arrays(scores), top_n)
+        return [(scores[i], value) for i, value in zip(indices.tolist(), composite.tolist())]
+
+    def rank_batch(self, batch: NewsBatch, top_n: Optional[int] = None) -> NewsBatch:
+        """
+        对列式批次排名
+
+        Args:
+            batch: 已写入评分的新闻批次
+            top_n: 返回的数量，默认使用top_news_count
+
+        Returns:
+            NewsBatch: 排名靠前的新闻，按综合分数降序
+        """
+        indices, _ = self.rank_arrays(batch.sentiment_score, batch.impact_score, top_n)
+        return batch.take(indices)
+
+
+class StreamingTopK:
+    """
+    流式Top-K
+
+    用大小为k的最小堆保存目前综合分数最高的k条，内存占用与输入总量无关。
+    批量加入时先用堆顶分数向量化过滤，绝大多数低分条目不会进入Python层的堆操作。
+    """
+
+    def __init__(self, k: Optional[int] = None, engine: Optional[ScoringEngine] = None):
+        """
+        Args:
+            k: 保留的数量，默认使用引擎的top_news_count
+            engine: 评分引擎，默认按SCORING_CONFIG创建
+        """
+        self.engine = engine or ScoringEngine()
+        self.k = self.engine.top_n if k is None else k
+        # (综合分数, -序号, 条目)，分数相同时先到的排在前面
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+        self.seen = 0
+
+    @property
+    def threshold(self) -> float:
+        """进入Top-K所需的最低综合分数，堆未满时为负无穷"""
+        return self._heap[0][0] if len(self._heap) >= self.k else float("-inf")
+
+    def _offer(self, value: float, item: Any):
+        entry = (value, -next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def push(self, score: NewsScore, item: Any = None):
+        """
+        加入一条评分
+
+        Args:
+            score: 评分
+            item: 与评分一起保存的对象，默认保存评分本身
+        """
+        self.seen += 1
+        if self.k <= 0 or not score.impact_score >= self.engine.min_importance:
+            return
+        value = float(self.engine.composite(np.float64(score.sentiment_score), np.float64(score.impact_score)))
+        self._offer(value, score if item is None else item)
+
+    def push_arrays(self, sentiment: np.ndarray, impact: np.ndarray, items: Optional[Sequence[Any]] = None):
+        """
+        批量加入数组形式的评分
+
+        Args:
+            sentiment: 情绪分数数组
+            impact: 重要性分数数组
+            items: 与分数一一对应的对象，为None时保存本批次的下标
+        """
+        self.seen += len(impact)
+        if self.k <= 0:
+            return
+        candidates = self.engine.passing(impact)
+        composite = self.engine.composite(sentiment[candidates], impact[candidates])
+        # 只有超过当前堆顶的条目才可能进入Top-K，本批次内最多也只需要前k条
+        keep = np.flatnonzero(composite >= self.threshold)
+        if len(keep) > self.k:
+            keep = top_indices(composite, self.k, keep)
+        for position in sorted(keep.tolist()):
+            index = int(candidates[position])
+            self._offer(float(composite[position]), index if items is None else items[index])
+
+    def push_many(self, scores: Sequence[NewsScore]):
+        """批量加入NewsScore"""
+        self.push_arrays(*scores_to_arrays(scores), items=scores)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def results(self) -> List[Tuple[Any, float]]:
+        """
+        获取当前的Top-K
+
+        Returns:
+            List[Tuple[Any, float]]: (条目, 综合分数)列表，按综合分数降序
+        """
+        return [(item, value) for value, _, item in sorted(self._heap, reverse=True)]
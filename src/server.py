@@ -0,0 +1,413 @@
+"""
+服务模块 - 基于asyncio的轻量HTTP服务，提供新闻获取和分析接口，相同的并发请求只调用一次上游
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模块
+from config.config import ASSET_CONFIG, SERVER_CONFIG
+from src.news_fetcher import fetch_news, generate_test_news, setup_logging
+from src.dedup import DedupIndex
+from src.prerank import PreRanker
+from src.scoring import ScoringEngine
+from src.local_inference import create_scorer
+from src.pipeline import score_candidates
+from src.report import build_report, save_report
+from src.rate_limiter import get_default_scheduler
+from src.response_cache import get_default_cache
+
+logger = logging.getLogger("news_fetcher.server")
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class SingleFlight:
+    """
+    请求合并
+
+    同一个键同时只有一次调用在执行，期间到达的相同请求等待这次调用的结果；
+    完成的结果再保留ttl秒，期间的相同请求直接返回。异常同样传给所有等待者，但不保留。
+    只能在事件循环线程中使用，不需要加锁。
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, ttl: float = 0):
+        """
+        Args:
+            executor: 执行调用的线程池
+            ttl: 结果保留时间（秒），0表示不保留
+        """
+        self.executor = executor
+        self.ttl = ttl
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+        self.memo_hits = 0
+        self.errors = 0
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            self.errors += 1
+            return
+        if self.ttl > 0:
+            now = time.monotonic()
+            for expired in [k for k, (expires, _) in self._results.items() if expires <= now]:
+                del self._results[expired]
+            self._results[key] = (now + self.ttl, future.result())
+
+    async def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        执行或等待调用
+
+        Args:
+            key: 请求键，键相同的请求视为同一个请求
+            func: 在线程池中执行的无参函数
+
+        Returns:
+            Any: func的返回值
+        """
+        self.calls += 1
+        cached = self._results.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.memo_hits += 1
+            return cached[1]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.upstream += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, func)
+            future.add_done_callback(lambda done: self._finish(key, done))
+            self._inflight[key] = future
+        # 某个客户端断开时不取消其他客户端共享的调用
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计"""
+        return {
+            "calls": self.calls,
+            "upstream": self.upstream,
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+        }
+
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class NewsService:
+    """
+    新闻服务
+
+    新闻接口按(资产, 日期, 是否刷新)合并请求，分析接口在此基础上再按候选条数合并；
+    上游请求照常经过响应缓存和配额调度器，已结束的日期不再消耗配额。
+    结果在工作线程中编码为JSON，同一份结果无论有多少客户端请求只编码一次。
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, config: Optional[Dict[str, Any]] = None,
+                 scorer=None, use_cache: bool = True, test: bool = False):
+        """
+        Args:
+            logger: 日志记录器，如果为None则创建新的
+            config: 服务配置，默认使用SERVER_CONFIG，缺少的键取SERVER_CONFIG中的值
+            scorer: 评分器，如果为None则在第一次分析请求时按MODEL_CONFIG创建
+            use_cache: 是否使用响应缓存和评分缓存
+            test: 是否使用测试数据
+        """
+        config = {**SERVER_CONFIG, **(config or {})}
+        self.logger = logger or setup_logging()
+        self.use_cache = use_cache
+        self.test = test
+        self.scorer = scorer
+        self._own_scorer = scorer is None
+        self._scorer_lock = threading.Lock()
+        self.ranker = PreRanker()
+        self.engine = ScoringEngine()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, config["workers"]), thread_name_prefix="server")
+        self.flight = SingleFlight(self.executor, config["result_ttl"])
+
+    def _fetch(self, asset_type: str, target_date: str, refresh: bool) -> Dict[str, Any]:
+        if self.test:
+            news_items = generate_test_news(asset_type)
+        else:
+            # 每次上游调用使用独立的去重索引，同一天重复获取时不会把已见过的新闻当作重复报道去掉
+            news_items = fetch_news(asset_type, target_date, self.logger, use_cache=self.use_cache,
+                                    refresh=refresh, incremental=False, dedup=DedupIndex())
+        body = _encode({
+            "asset": asset_type,
+            "date": target_date,
+            "count": len(news_items),
+            "items": [item.to_dict() for item in news_items],
+        })
+        return {"news_items": news_items, "body": body}
+
+    def _analyze(self, asset_type: str, target_date: str, news: Dict[str, Any],
+                 top_m: Optional[int]) -> Dict[str, Any]:
+        with self._scorer_lock:
+            if self.scorer is None:
+                self.scorer = create_scorer(use_cache=self.use_cache)
+        news_items = news["news_items"]
+        candidates = self.ranker.select(news_items, asset_type, top_m)
+        ranked, scored_count = score_candidates(candidates, self.scorer, self.engine)
+        report = build_report(asset_type, target_date, news_items, ranked, scored_count)
+        body = _encode({
+            "asset": asset_type,
+            "date": target_date,
+            "news_count": len(news_items),
+            "scored_count": scored_count,
+            "path": save_report(report, asset_type, target_date),
+            "ranked": [
+                {"title": item.title, "url": item.url, "score": value, **score.to_dict()}
+                for item, score, value in ranked
+            ],
+            "report": report.to_markdown(),
+        })
+        return {"body": body}
+
+    async def news(self, asset_type: str, target_date: str, refresh: bool = False) -> Dict[str, Any]:
+        """获取某个资产某一天的新闻，返回news_items和编码后的body"""
+        return await self.flight.do(("news", asset_type, target_date, refresh),
+                                    lambda: self._fetch(asset_type, target_date, refresh))
+
+    async def analysis(self, asset_type: str, target_date: str, top_m: Optional[int] = None,
+                       refresh: bool = False) -> Dict[str, Any]:
+        """分析某个资产某一天的新闻并生成报告，返回编码后的body"""
+        news = await self.news(asset_type, target_date, refresh)
+        return await self.flight.do(("analysis", asset_type, target_date, top_m, refresh),
+                                    lambda: self._analyze(asset_type, target_date, news, top_m))
+
+    def stats(self) -> Dict[str, Any]:
+        """服务统计"""
+        scheduler = get_default_scheduler()
+        result = {
+            "flight": self.flight.stats(),
+            "quota_used_today": scheduler.used_today,
+            "quota_remaining_today": scheduler.remaining_today(),
+        }
+        if self.use_cache:
+            cache = get_default_cache()
+            result["response_cache"] = {"hits": cache.hits, "misses": cache.misses}
+        if self.scorer is not None:
+            result["scorer"] = self.scorer.stats()
+        return result
+
+    def close(self):
+        """等待进行中的调用完成并释放资源"""
+        self.executor.shutdown(wait=True)
+        if self._own_scorer and self.scorer is not None:
+            self.scorer.close()
+
+
+def _parse_query(query: str) -> Dict[str, str]:
+    return {key: values[-1] for key, values in parse_qs(query).items()}
+
+
+def _parse_request_args(params: Dict[str, str]) -> Tuple[str, str, bool]:
+    """
+    解析资产、日期和是否刷新
+
+    Raises:
+        ValueError: 参数无效
+    """
+    asset_type = params.get("asset", "")
+    if asset_type not in ASSET_CONFIG:
+        raise ValueError(f"无效的资产类型: {asset_type}，有效的资产类型: {', '.join(ASSET_CONFIG.keys())}")
+    target_date = params.get("date") or datetime.now().strftime("%Y%m%d")
+    datetime.strptime(target_date, "%Y%m%d")
+    refresh = params.get("refresh", "").lower() in ("1", "true", "yes")
+    return asset_type, target_date, refresh
+
+
+class NewsServer:
+    """
+    HTTP服务器
+
+    基于asyncio.start_server实现HTTP/1.1长连接，每个连接只占用一个协程，数百个并发客户端不需要数百个线程。
+    接口：
+        GET /news?asset=oil&date=YYYYMMDD[&refresh=1]
+        GET /analysis?asset=oil&date=YYYYMMDD[&top_m=30][&refresh=1]
+        GET /stats
+        GET /health
+    """
+
+    def __init__(self, service: NewsService, host: Optional[str] = None, port: Optional[int] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            service: 新闻服务
+            host: 监听地址，默认使用SERVER_CONFIG中的host
+            port: 端口，默认使用SERVER_CONFIG中的port，0表示随机端口
+            config: 服务配置，默认使用SERVER_CONFIG，缺少的键取SERVER_CONFIG中的值
+        """
+        config = {**SERVER_CONFIG, **(config or {})}
+        self.service = service
+        self.host = host or config["host"]
+        self.port = port if port is not None else config["port"]
+        self.backlog = config["backlog"]
+        self.keepalive_timeout = config["keepalive_timeout"]
+        self.max_header_bytes = config["max_header_bytes"]
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def _route(self, method: str, target: str) -> Tuple[int, bytes]:
+        if method not in ("GET", "HEAD"):
+            return 405, _encode({"error": "只支持GET请求"})
+        url = urlsplit(target)
+        params = _parse_query(url.query)
+        if url.path == "/health":
+            return 200, _encode({"status": "ok"})
+        if url.path == "/stats":
+            return 200, _encode({"connections": self.connections, "requests": self.requests,
+                                 **self.service.stats()})
+        if url.path not in ("/news", "/analysis"):
+            return 404, _encode({"error": f"未知的路径: {url.path}"})
+
+        try:
+            asset_type, target_date, refresh = _parse_request_args(params)
+            top_m = int(params["top_m"]) if params.get("top_m") else None
+        except ValueError as e:
+            return 400, _encode({"error": str(e)})
+
+        try:
+            if url.path == "/news":
+                result = await self.service.news(asset_type, target_date, refresh)
+            else:
+                result = await self.service.analysis(asset_type, target_date, top_m, refresh)
+        except Exception as e:
+            logger.error(f"处理请求 {target} 时出错: {str(e)}")
+            return 500, _encode({"error": str(e)})
+        return 200, result["body"]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(431, _encode({"error": "请求头过长"}), False))
+                    await writer.drain()
+                    return
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                # GET请求不应带请求体，有的话读出丢弃，保持连接上的请求边界
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    writer.write(self._response(400, _encode({"error": "Content-Length无效"}), False))
+                    await writer.drain()
+                    return
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                self.requests += 1
+                status, body = await self._route(method, target)
+                writer.write(self._response(status, body if method != "HEAD" else b"", keep_alive, len(body)))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    @staticmethod
+    def _response(status: int, body: bytes, keep_alive: bool, length: Optional[int] = None) -> bytes:
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body) if length is None else length}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    async def serve(self, on_started: Optional[Callable[["NewsServer"], None]] = None):
+        """
+        运行服务器，直到stop()被调用
+
+        Args:
+            on_started: 开始监听后回调一次，参数为服务器本身，此时port为实际端口
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=self.backlog,
+                                                  limit=self.max_header_bytes)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"新闻服务运行在 http://{self.host}:{self.port}")
+        if on_started is not None:
+            on_started(self)
+        try:
+            await self._stopping.wait()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stop(self):
+        """停止服务器，可以在任意线程中调用"""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+
+def run_server(logger: Optional[logging.Logger] = None, host: Optional[str] = None, port: Optional[int] = None,
+               use_cache: bool = True, test: bool = False):
+    """
+    运行新闻服务，按Ctrl+C停止
+
+    Args:
+        logger: 日志记录器，如果为None则创建新的
+        host: 监听地址，默认使用SERVER_CONFIG中的host
+        port: 端口，默认使用SERVER_CONFIG中的port
+        use_cache: 是否使用响应缓存和评分缓存
+        test: 是否使用测试数据
+    """
+    service = NewsService(logger, use_cache=use_cache, test=test)
+    server = NewsServer(service, host, port)
+    try:
+        asyncio.run(server.serve(
+            lambda started: print(f"新闻服务运行在 http://{started.host}:{started.port}，按Ctrl+C停止")
+        ))
+    except KeyboardInterrupt:
+        print("\n新闻服务已停止")
+    finally:
+        service.close()
@@ -0,0 +1,377 @@
+"""
+合成新闻模块 - 按种子生成可复现的大量新闻，用于压力测试和基准测试
+
+发布时间、来源、情绪、正文长度、语言以及重复和近似重复的比例都可以通过SYNTHETIC_CONFIG控制。
+新闻逐条生成，按发布时间有序产出，生成一千万条也不需要把它们同时放在内存中。
+"""
+
+import os
+import sys
+import json
+import math
+import bisect
+import random
+import argparse
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置和模型
+from config.config import ASSET_CONFIG, SYNTHETIC_CONFIG
+from src.models import NewsItem
+
+# 英文新闻的词汇：中性词，以及情绪明显时混入的利好、利空词
+EN_WORDS = (
+    "market prices demand supply rates policy outlook investors growth inflation analysts traders "
+    "report data quarter earnings revenue forecast guidance central bank federal reserve economy "
+    "output production exports imports inventory futures contract session trading volume index "
+    "sector shares yields bonds treasury dollar currency commodity global regional government "
+    "officials statement meeting decision expectations estimates consensus survey week month year "
+    "monday tuesday wednesday thursday friday morning afternoon close open level range support "
+    "resistance trend momentum risk sentiment flows funds institutional retail capital spending "
+    "consumer industrial manufacturing services employment jobs wages housing credit lending "
+    "liquidity volatility hedge position exposure margin spread premium discount benchmark"
+).split()
+EN_POSITIVE = "surge rally gain rise jump beat strong record upgrade boost rebound optimism".split()
+EN_NEGATIVE = "slump fall drop plunge miss weak cut downgrade concern fear selloff pressure".split()
+
+# 中文新闻的词汇
+ZH_WORDS = (
+    "市场 价格 需求 供应 利率 政策 前景 投资者 增长 通胀 分析师 交易员 报告 数据 季度 盈利 收入 预测 "
+    "央行 美联储 经济 产量 出口 进口 库存 期货 合约 交易 成交量 指数 板块 股票 收益率 债券 美元 货币 "
+    "大宗商品 全球 政府 官员 声明 会议 决定 预期 共识 调查 本周 本月 今年 水平 区间 支撑 阻力 趋势 "
+    "风险 情绪 资金 机构 散户 资本 消费 工业 制造业 服务业 就业 工资 房地产 信贷 流动性 波动 头寸"
+).split()
+ZH_POSITIVE = "上涨 大涨 走强 创新高 超预期 回升 利好 提振 反弹 乐观".split()
+ZH_NEGATIVE = "下跌 大跌 走弱 创新低 不及预期 承压 利空 拖累 抛售 担忧".split()
+
+# intraday分布下各小时（UTC）的相对新闻量：亚洲时段较少，美股交易时段（13:30-20:00 UTC）最多
+HOURLY_PROFILE = (
+    0.3, 0.3, 0.4, 0.4, 0.5, 0.5, 0.6, 0.8, 1.0, 1.0, 1.1, 1.2,
+    1.5, 2.0, 2.4, 2.4, 2.2, 2.0, 1.8, 1.8, 1.4, 0.8, 0.5, 0.4,
+)
+
+# 每种语言和情绪倾向预先生成的随机词序列长度，正文从中随机位置截取，不必逐词抽样
+TAPE_SIZE = 1 << 17
+
+# 近似重复报道改写的词语比例
+NEAR_DUPLICATE_EDIT_RATIO = 0.1
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total = float(sum(weights))
+    result, running = [], 0.0
+    for weight in weights:
+        running += weight / total
+        result.append(running)
+    result[-1] = 1.0
+    return result
+
+
+def sentiment_label(score: float) -> str:
+    """与Alpha Vantage一致的情绪标签"""
+    if score <= -0.35:
+        return "Bearish"
+    if score <= -0.15:
+        return "Somewhat-Bearish"
+    if score < 0.15:
+        return "Neutral"
+    if score < 0.35:
+        return "Somewhat-Bullish"
+    return "Bullish"
+
+
+class SyntheticNewsGenerator:
+    """
+    合成新闻生成器
+
+    发布时间按有序均匀样本（逐个递推，不需要先生成再排序）经分布的逆函数变换得到，因此天然有序；
+    正文和标题从预先生成的随机词序列中随机位置截取；
+    重复报道只从最近duplicate_window条新闻中挑选原文，内存占用与生成条数无关。
+    相同的种子、资产、时间范围和条数总是生成完全相同的新闻。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            config: 合成新闻配置，默认使用SYNTHETIC_CONFIG，缺少的键取SYNTHETIC_CONFIG中的值
+            seed: 随机种子，默认使用配置中的seed
+        """
+        self.config = {**SYNTHETIC_CONFIG, **(config or {})}
+        self.seed = seed if seed is not None else self.config["seed"]
+        sources = self.config["sources"]
+        self.sources = list(sources.keys())
+        self._source_cdf = _cumulative(list(sources.values()))
+        languages = self.config["languages"]
+        self.languages = list(languages.keys())
+        self._language_cdf = _cumulative(list(languages.values()))
+        self._tapes: Dict[Any, List[str]] = {}
+
+    def _time_mapper(self, start: datetime, end: datetime):
+        """返回把[0, 1)单调映射到[start, end)内发布时间（相对start的秒数）的函数"""
+        span = max(1.0, (end - start).total_seconds())
+        intraday = self.config["time_profile"] == "intraday"
+        weekend = self.config["weekend_weight"]
+
+        # 按整点切分时间范围，每段的新闻量正比于段长乘该小时的相对新闻量
+        bounds, weights = [0.0], []
+        hour_start = start.replace(minute=0, second=0, microsecond=0)
+        while bounds[-1] < span:
+            hour_start += timedelta(hours=1)
+            low = bounds[-1]
+            high = min(span, (hour_start - start).total_seconds())
+            weight = high - low
+            if intraday:
+                moment = start + timedelta(seconds=low)
+                weight *= HOURLY_PROFILE[moment.hour] * (weekend if moment.weekday() >= 5 else 1.0)
+            bounds.append(high)
+            weights.append(weight)
+        cdf = _cumulative(weights)
+
+        def to_seconds(u: float) -> float:
+            segment = min(bisect.bisect_right(cdf, u), len(cdf) - 1)
+            low = cdf[segment - 1] if segment else 0.0
+            fraction = (u - low) / (cdf[segment] - low) if cdf[segment] > low else 0.0
+            return min(span - 1, bounds[segment] + fraction * (bounds[segment + 1] - bounds[segment]))
+
+        return to_seconds
+
+    def _choose(self, rng: random.Random, values: List[str], cdf: List[float]) -> str:
+        return values[min(bisect.bisect_right(cdf, rng.random()), len(values) - 1)]
+
+    def _tape(self, language: str, polarity: int) -> List[str]:
+        key = (language, polarity)
+        tape = self._tapes.get(key)
+        if tape is None:
+            if language == "zh":
+                vocabulary, positive, negative = ZH_WORDS, ZH_POSITIVE, ZH_NEGATIVE
+            else:
+                vocabulary, positive, negative = EN_WORDS, EN_POSITIVE, EN_NEGATIVE
+            if polarity > 0:
+                vocabulary = vocabulary + positive * 4
+            elif polarity < 0:
+                vocabulary = vocabulary + negative * 4
+            rng = random.Random(f"{self.seed}|{language}|{polarity}")
+            tape = rng.choices(vocabulary, k=TAPE_SIZE)
+            # 末尾接上开头一段，任意起点都能直接切出最长的正文
+            tape += tape[:self.config["content_words_max"] + 16]
+            self._tapes[key] = tape
+        return tape
+
+    def _text(self, rng: random.Random, language: str, words: int, sentiment: float) -> List[str]:
+        polarity = 1 if sentiment >= 0.15 else -1 if sentiment <= -0.15 else 0
+        offset = rng.randrange(TAPE_SIZE)
+        return self._tape(language, polarity)[offset:offset + words]
+
+    @staticmethod
+    def _join(words: List[str], language: str) -> str:
+        return "".join(words) if language == "zh" else " ".join(words)
+
+    def iter_feed_entries(self, count: int, start: datetime, end: datetime, asset_type: Optional[str] = None,
+                          keywords: Optional[Sequence[str]] = None, descending: bool = False
+                          ) -> Iterator[Dict[str, Any]]:
+        """
+        逐条生成NEWS_SENTIMENT格式的feed条目
+
+        Args:
+            count: 条数
+            start: 发布时间起点（包含）
+            end: 发布时间终点（不包含）
+            asset_type: 资产类型，标题中的关键词取自该资产的keywords
+            keywords: 直接指定关键词，优先于asset_type
+            descending: 是否按发布时间从新到旧产出（Alpha Vantage默认的LATEST排序）
+
+        Yields:
+            Dict[str, Any]: feed条目
+        """
+        config = self.config
+        if keywords is None:
+            keywords = ASSET_CONFIG[asset_type]["keywords"].split(",") if asset_type else ["market"]
+        keywords = [keyword.strip() for keyword in keywords if keyword.strip()] or ["market"]
+        rng = random.Random(f"{self.seed}|{asset_type}|{','.join(keywords)}|{start:%Y%m%d%H%M%S}|"
+                            f"{end:%Y%m%d%H%M%S}|{count}")
+        to_seconds = self._time_mapper(start, end)
+        path = asset_type or keywords[0].replace(" ", "-")
+        recent: deque = deque(maxlen=max(1, config["duplicate_window"]))
+        duplicate_rate = config["duplicate_rate"]
+        near_rate = duplicate_rate + config["near_duplicate_rate"]
+        median, sigma = config["content_words_median"], config["content_words_sigma"]
+        max_words = config["content_words_max"]
+
+        # 逐个递推有序均匀样本：剩下n个样本中最小值的分布为1-(1-u)^(1/n)
+        position = 0.0
+        for index, remaining in enumerate(range(count, 0, -1)):
+            position = 1.0 - (1.0 - position) * rng.random() ** (1.0 / remaining)
+            offset = to_seconds(1.0 - position if descending else position)
+            published = start + timedelta(seconds=int(offset))
+            source = self._choose(rng, self.sources, self._source_cdf)
+            host = source.lower().replace(" ", "") + ".com"
+            url = f"https://{host}/{path}/{published:%Y/%m/%d}/{self.seed}-{index}"
+
+            roll = rng.random()
+            if recent and roll < near_rate:
+                language, title_words, content_words, sentiment = recent[rng.randrange(len(recent))]
+                if roll >= duplicate_rate:
+                    # 近似重复：改写标题中的一个词和正文中少量词语
+                    title_words, content_words = list(title_words), list(content_words)
+                    edit = self._text(rng, language, 1 + int(len(content_words) * NEAR_DUPLICATE_EDIT_RATIO),
+                                      sentiment)
+                    title_words[rng.randrange(len(title_words))] = edit[0]
+                    for word in edit[1:]:
+                        content_words[rng.randrange(len(content_words))] = word
+            else:
+                language = self._choose(rng, self.languages, self._language_cdf)
+                sentiment = max(-1.0, min(1.0, rng.gauss(config["sentiment_mean"], config["sentiment_std"])))
+                words = max(5, min(max_words, int(median * math.exp(rng.gauss(0.0, sigma)))))
+                title_words = self._text(rng, language, rng.randint(6, 14), sentiment)
+                if rng.random() < config["keyword_rate"]:
+                    title_words[rng.randrange(len(title_words))] = rng.choice(keywords)
+                content_words = self._text(rng, language, words, sentiment)
+                recent.append((language, title_words, content_words, sentiment))
+
+            yield {
+                "title": self._join(title_words, language),
+                "url": url,
+                "time_published": published.strftime("%Y%m%dT%H%M%S"),
+                "authors": [],
+                "summary": self._join(content_words, language),
+                "source": source,
+                "overall_sentiment_score": round(sentiment, 6),
+                "overall_sentiment_label": sentiment_label(sentiment),
+            }
+
+    def iter_news_items(self, count: int, start: datetime, end: datetime, asset_type: Optional[str] = None,
+                        keywords: Optional[Sequence[str]] = None, descending: bool = False) -> Iterator[NewsItem]:
+        """
+        逐条生成NewsItem，参数同iter_feed_entries
+
+        Yields:
+            NewsItem: 新闻项，与从Alpha Vantage响应解析得到的字段一致
+        """
+        for entry in self.iter_feed_entries(count, start, end, asset_type, keywords, descending):
+            yield NewsItem(
+                title=entry["title"],
+                original_title=entry["title"],
+                content=entry["summary"],
+                publish_time=entry["time_published"],
+                source=entry["source"],
+                url=entry["url"],
+                alpha_sentiment=entry["overall_sentiment_score"],
+            )
+
+
+def write_feed(out: TextIO, entries: Iterator[Dict[str, Any]], count: int) -> int:
+    """
+    以NEWS_SENTIMENT响应格式逐条写出feed
+
+    Args:
+        out: 输出文件
+        entries: feed条目
+        count: 条目数，写入响应的items字段
+
+    Returns:
+        int: 实际写出的条数
+    """
+    out.write(f'{{"items": "{count}", "feed": [')
+    written = 0
+    for entry in entries:
+        out.write(("," if written else "") + json.dumps(entry, ensure_ascii=False))
+        written += 1
+    out.write("]}\n")
+    return written
+
+
+def write_json_lines(out: TextIO, items: Iterator[NewsItem]) -> int:
+    """
+    每行写出一条NewsItem.to_dict()
+
+    Returns:
+        int: 写出的条数
+    """
+    written = 0
+    for item in items:
+        out.write(json.dumps(item.to_dict(), ensure_ascii=False) + "\n")
+        written += 1
+    return written
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    """解析en=0.8,zh=0.2形式的占比"""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="合成新闻 - 按种子生成可复现的大量新闻")
+    parser.add_argument("-a", "--asset", type=str, default="oil", help="资产类型，all或逗号分隔的多个资产")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="每个资产生成的条数")
+    parser.add_argument("--start", type=str, default=None, help="开始日期，格式为YYYYMMDD，默认为昨天")
+    parser.add_argument("--end", type=str, default=None, help="结束日期（包含），格式为YYYYMMDD，默认与开始日期相同")
+    parser.add_argument("--format", choices=["feed", "jsonl"], default="jsonl",
+                        help="feed：NEWS_SENTIMENT响应格式（每个资产一个响应）；jsonl：每行一条NewsItem")
+    parser.add_argument("-o", "--output", type=str, default=None, help="输出文件，默认输出到标准输出")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--time-profile", choices=["uniform", "intraday"], default=None, help="发布时间分布")
+    parser.add_argument("--languages", type=str, default=None, help="语言占比，例如en=0.7,zh=0.3")
+    parser.add_argument("--duplicate-rate", type=float, default=None, help="完全相同的转载的比例")
+    parser.add_argument("--near-duplicate-rate", type=float, default=None, help="近似重复报道的比例")
+    parser.add_argument("--sentiment-mean", type=float, default=None, help="情绪分数的均值")
+    parser.add_argument("--content-words", type=int, default=None, help="正文词数的中位数")
+    parser.add_argument("--latest-first", action="store_true", help="按发布时间从新到旧输出")
+    args = parser.parse_args()
+
+    asset_types = list(ASSET_CONFIG.keys()) if args.asset.lower() == "all" else \
+        [asset_type.strip().lower() for asset_type in args.asset.split(",") if asset_type.strip()]
+    invalid_assets = [asset_type for asset_type in asset_types if asset_type not in ASSET_CONFIG]
+    if not asset_types or invalid_assets:
+        print(f"错误：无效的资产类型: {', '.join(invalid_assets) or args.asset}", file=sys.stderr)
+        print(f"有效的资产类型: {', '.join(ASSET_CONFIG.keys())}", file=sys.stderr)
+        return
+
+    try:
+        start = datetime.strptime(args.start, "%Y%m%d") if args.start else \
+            datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+        end = datetime.strptime(args.end, "%Y%m%d") if args.end else start
+    except ValueError:
+        print(f"错误：日期格式不正确，应为YYYYMMDD，例如20250307", file=sys.stderr)
+        return
+    if start > end:
+        print(f"错误：开始日期不能晚于结束日期", file=sys.stderr)
+        return
+
+    overrides = {
+        "time_profile": args.time_profile,
+        "languages": _parse_weights(args.languages) if args.languages else None,
+        "duplicate_rate": args.duplicate_rate,
+        "near_duplicate_rate": args.near_duplicate_rate,
+        "sentiment_mean": args.sentiment_mean,
+        "content_words_median": args.content_words,
+    }
+    generator = SyntheticNewsGenerator({key: value for key, value in overrides.items() if value is not None},
+                                       args.seed)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    written = 0
+    try:
+        for asset_type in asset_types:
+            window = (args.count, start, end + timedelta(days=1), asset_type)
+            if args.format == "feed":
+                written += write_feed(out, generator.iter_feed_entries(*window, descending=args.latest_first),
+                                      args.count)
+            else:
+                written += write_json_lines(out, generator.iter_news_items(*window, descending=args.latest_first))
+    finally:
+        if args.output:
+            out.close()
+    print(f"已生成 {written} 条合成新闻（{', '.join(asset_types)}，{start:%Y%m%d} 至 {end:%Y%m%d}）", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
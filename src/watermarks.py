@@ -0,0 +1,126 @@
+"""
+高水位模块 - 记录每个资产已保存新闻的最新发布时间
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入配置
+from config.config import DATA_DIR
+
+logger = logging.getLogger("news_fetcher.watermarks")
+
+
+class WatermarkStore:
+    """
+    资产高水位存储
+
+    每个资产记录已保存新闻中最新的time_published，以及发布时间恰好等于该时间的URL，
+    下次请求只需从高水位所在的分钟开始，并据此去掉边界上已保存的新闻。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 高水位文件路径，默认为data/watermarks.json
+        """
+        self.path = path or os.path.join(DATA_DIR, "watermarks.json")
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取高水位文件失败，将重新全量获取: {str(e)}")
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._marks, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, asset_type: str) -> Optional[str]:
+        """
+        获取资产的高水位
+
+        Args:
+            asset_type: 资产类型
+
+        Returns:
+            Optional[str]: 最新的time_published，格式为YYYYMMDDTHHMMSS；没有记录时返回None
+        """
+        with self._lock:
+            mark = self._marks.get(asset_type)
+            return mark["time"] if mark else None
+
+    def boundary_urls(self, asset_type: str) -> List[str]:
+        """发布时间等于高水位的已保存新闻URL"""
+        with self._lock:
+            mark = self._marks.get(asset_type)
+            return list(mark["urls"]) if mark else []
+
+    def advance(self, asset_type: str, publish_times_and_urls: List[tuple]):
+        """
+        用新保存的新闻推进高水位
+
+        Args:
+            asset_type: 资产类型
+            publish_times_and_urls: 新保存新闻的(time_published, url)列表
+        """
+        if not publish_times_and_urls:
+            return
+        newest = max(publish_time for publish_time, _ in publish_times_and_urls)
+        with self._lock:
+            mark = self._marks.get(asset_type)
+            if mark and mark["time"] > newest:
+                return
+            urls = {url for publish_time, url in publish_times_and_urls if publish_time == newest}
+            if mark and mark["time"] == newest:
+                urls.update(mark["urls"])
+            self._marks[asset_type] = {"time": newest, "urls": sorted(urls)}
+            self._save()
+
+    def reset(self, asset_type: Optional[str] = None):
+        """
+        清除高水位
+
+        Args:
+            asset_type: 资产类型，为None时清除全部
+        """
+        with self._lock:
+            if asset_type is None:
+                self._marks = {}
+            else:
+                self._marks.pop(asset_type, None)
+            self._save()
+
+
+_default_store: Optional[WatermarkStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_watermarks() -> WatermarkStore:
+    """
+    获取进程内共享的高水位存储
+
+    Returns:
+        WatermarkStore: 默认高水位存储
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = WatermarkStore()
+        return _default_store